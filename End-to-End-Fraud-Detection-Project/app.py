@@ -2,14 +2,6 @@
 # Enables UI components like sliders, buttons, file uploads, and real-time updates
 import streamlit as st
 
-# Import time — provides time-related functions
-# Useful for simulating loading delays or measuring execution time
-import time
-
-# Import pickle — used for loading serialized models or data objects
-# Essential for deploying pre-trained models in your app
-import pickle
-
 # Import numpy — foundational library for numerical operations
 # Often used for array manipulation and feeding data into models
 import numpy as np
@@ -22,19 +14,41 @@ import pandas as pd
 # Useful for showing logos, visualizations, or uploaded images in the app
 from PIL import Image
 
-# Load the trained logistic regression model
-# This allows you to reuse the model for predictions in a Streamlit app or other deployment context
+# Import the vectorized scoring helpers shared with batch and service callers
+from src.scoring import predict_batch
+
+# Import the online feature store — per-card velocity features kept in memory
+from src.feature_store import FeatureStore
+
+# Import the process-wide model cache — unpickles once and hot-reloads when the file changes
+from src.model_cache import ModelCache
+
+# Import the schema error — raised with the name of the field that could not be parsed
+from src.schema import SchemaError
 
 # Define the path to the saved model file
 model_path = "models/logistic_regression_model.pkl"
 
-# Open the model file in binary read mode
-# 'rb' stands for "read binary" — required for loading pickle files
-with open(model_path, "rb") as model_file:
+# Share one cache across every session and rerun of this Streamlit process
+# st.cache_resource keeps the object alive, ModelCache picks up newly trained models by mtime
+@st.cache_resource
+def get_model_cache(path):
+    return ModelCache(path)
+
+# Define the path of the feature store snapshot written by the training pipeline
+feature_store_path = "models/feature_store.pkl"
 
-    # Load the serialized model object using pickle
-    # This restores the trained LogisticRegression instance for inference
-    model = pickle.load(model_file)
+# Share one feature store across every session, restored from the last snapshot
+# Velocity features are then a dictionary lookup instead of a database round-trip per decision
+@st.cache_resource
+def get_feature_store(path):
+    return FeatureStore.restore(path)
+
+feature_store = get_feature_store(feature_store_path)
+
+# Fetch the current model with its feature schema and operating threshold as one snapshot
+# A few stat() calls unless a new model was written; the threshold is chosen for the review cost (0.5 if none was saved)
+model, schema, threshold = get_model_cache(model_path).get()
 
 # App Title — sets the main heading at the top of the Streamlit interface
 st.title("💳 Welcome to CC Fraud Detection Platform")
@@ -42,86 +56,93 @@ st.title("💳 Welcome to CC Fraud Detection Platform")
 # Subheading — prompts users to enter transaction details for fraud prediction
 st.subheader("🔍 Enter your transaction details")
 
-# Define user-friendly field names for input features
-# These replace abstract names like V1, V2 with more intuitive labels
-field_names = [
-    "Amount", "Transaction Time", "Location Score", "Merchant Type", "Card Usage", 
-    "Risk Factor", "Account Age", "Spending Pattern", "Alert Count"
-]
+# Render exactly the features the model was trained on, in training order
+# The card ID and velocity features are not typed in; they come from the feature store
+model_features = schema.names if schema is not None else list(model.feature_names_in_)
+field_names = [name for name in model_features
+               if name != "card_id" and name not in feature_store.feature_names]
 
 # Initialize default values for each input field
-# These will be used to populate sliders or number inputs with a starting value of 0
-default_values = {name: 0 for name in field_names}
-
-user_inputs = {}
-cols = st.columns(3)
-for idx , name in enumerate(field_names):
-    with cols[idx % 3]:
-        user_inputs[name] = st.text_input(name, value=str(default_values[name]))
-
-
-# Create a dictionary to store user inputs
-user_inputs = {}
-
-# Arrange input fields into 3 columns for a cleaner, more organized layout
-cols = st.columns(3)
-
-# Loop through each field name and create a text input widget
-# Loop through each field name and create a text input widget
-for idx, name in enumerate(field_names):
-    # Distribute fields evenly across the 3 columns using modulo indexing
-    with cols[idx % 3]:
-        # Create a text input for each field with a default value of "0"
-        # Assign a unique key to avoid StreamlitDuplicateElementId errors
-        # Store the input as a string in the user_inputs dictionary
-        user_inputs[name] = st.text_input(
-            label=name,
-            value=str(default_values[name]),
-            key=f"text_input_{idx}_{name}"  # Unique key using index and name
-        )
-
+# The schema's defaults are the training medians, so untouched fields score as a typical transaction
+if schema is not None:
+    default_values = {name: f"{schema.defaults[schema.names.index(name)]:g}" for name in field_names}
+else:
+    default_values = {name: 0 for name in field_names}
+
+# Seed each field's value in session state once per session
+# Reset runs before the widgets are created, so cleared values show up in this same run
+reset_requested = st.session_state.pop("reset_requested", False)
+for name in field_names:
+    if reset_requested or f"text_input_{name}" not in st.session_state:
+        st.session_state[f"text_input_{name}"] = str(default_values[name])
+if reset_requested:
+    st.session_state["text_input_card_id"] = ""
+
+# Build the input grid once inside a form
+# Typing into a field no longer reruns the script; only the form buttons do
+with st.form("transaction_form"):
+    # Card identifier — keys the per-card velocity features in the feature store
+    card_id = st.text_input(label="Card ID", key="text_input_card_id")
+
+    # Create a dictionary to store user inputs
+    user_inputs = {}
+
+    # Arrange input fields into 3 columns for a cleaner, more organized layout
+    cols = st.columns(3)
+
+    # Loop through each field name and create a text input widget
+    for idx, name in enumerate(field_names):
+        # Distribute fields evenly across the 3 columns using modulo indexing
+        with cols[idx % 3]:
+            # Create a text input for each field, seeded with its default value
+            # The session-state key keeps the value across reruns and lets Reset clear it
+            user_inputs[name] = st.text_input(label=name, key=f"text_input_{name}")
+
+    # Create two columns for side-by-side buttons
+    col1, col2 = st.columns([1, 1])
+
+    # Button to trigger fraud prediction
+    with col1:
+        predict_button = st.form_submit_button("🚀 Predict Transaction")
+
+    # Button to reset all input fields
+    with col2:
+        reset_button = st.form_submit_button("🔄 Reset Fields")
 
 # Prediction function — takes user inputs and returns a fraud prediction
-def predict_fraud(inputs):
-    # Convert the dictionary of user inputs into a NumPy array
-    # Ensure all values are cast to float for compatibility with the model
-    input_array = np.array([float(inputs[name]) for name in field_names]).reshape(1, -1)
-
-    # Use the trained logistic regression model to make a prediction
-    # The model returns 1 for fraud and 0 for non-fraud
-    prediction = model.predict(input_array)
+def predict_fraud(inputs, card_id=None):
+    # Record the transaction in the feature store and add the card's velocity features
+    # The features include this transaction, exactly like the offline features used in training
+    if card_id:
+        event_time, amount = (schema.coerce(inputs, columns=["Time", "Amount"])[0] if schema is not None
+                              else (float(inputs["Time"]), float(inputs["Amount"])))
+        inputs = {**inputs, **feature_store.update(card_id, event_time, amount)}
+
+        # Persist the store now and then, so a restart keeps recent card activity
+        feature_store.snapshot(feature_store_path, min_interval=60)
+
+    # Score the dictionary of user inputs as a batch of one, in the model's own column order
+    # The schema parses every field in one pass, fills gaps with training medians and names any bad field
+    # The model returns 1 for fraud and 0 for non-fraud, at the saved operating threshold
+    prediction = predict_batch(model, inputs, threshold=threshold, schema=schema)
 
     # Return a human-readable label based on the prediction
     return "Fraud" if prediction[0] == 1 else "Not Fraud"
 
-# Create two columns for side-by-side buttons
-col1, col2 = st.columns([1, 1])
-
-# Button to trigger fraud prediction
-with col1:
-    predict_button = st.button("🚀 Predict Transaction")
-
-# Button to reset all input fields
-with col2:
-    reset_button = st.button("🔄 Reset Fields")
-
-# If the reset button is clicked, rerun the app to clear all inputs
-# This resets the session state and reinitializes default values
+# If the reset button is clicked, restore the defaults and rerun the app
 if reset_button:
-    st.experimental_rerun()
+    st.session_state["reset_requested"] = True
+    st.rerun()
 
-# If the predict button is clicked, show a spinner and simulate progress
+# If the predict button is clicked, score the transaction straight away
 if predict_button:
     with st.spinner("Processing transaction..."):
-        progress_bar = st.progress(0)
-
-        # Simulate a short delay to mimic model processing
-        for i in range(5):
-            time.sleep(1)
-            progress_bar.progress((i + 1) * 20)
-
-        # Run the prediction function using user inputs
-        result = predict_fraud(user_inputs)
-
-        # Display the prediction result with a success message
-        st.success(f"📝 Prediction: **{result}**")
+        try:
+            # Run the prediction function using user inputs
+            result = predict_fraud(user_inputs, card_id.strip())
+        except SchemaError as exc:
+            # Point at the field that could not be used instead of scoring garbage
+            st.error(f"⚠️ {exc}")
+        else:
+            # Display the prediction result with a success message
+            st.success(f"📝 Prediction: **{result}**")
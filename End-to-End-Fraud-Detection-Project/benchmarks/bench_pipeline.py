@@ -0,0 +1,355 @@
+# Import argparse — command-line options for sizes, repeats and the comparison mode
+import argparse
+
+# Import json — results are written as machine-readable JSON, one file per run
+import json
+
+# Import os — working directories, paths and process information
+import os
+
+# Import platform — records the machine the numbers were measured on
+import platform
+
+# Import subprocess — records the git commit the numbers belong to
+import subprocess
+
+# Import sys — makes the project importable when run as a script
+import sys
+
+# Import tempfile — the serving artifact of the scoring benchmark is written to a scratch file
+import tempfile
+
+# Import time — wall-clock timings
+import time
+
+# Import tracemalloc — peak Python-level allocations per stage (NumPy and pandas buffers included)
+import tracemalloc
+
+# Import datetime — timestamps the result file
+from datetime import datetime, timezone
+
+# Import numpy and pandas — synthetic data generation
+import numpy as np
+import pandas as pd
+
+# Import scikit-learn — only its version is recorded here
+import sklearn
+
+# The benchmark changes into its data directory, so make the project root importable by absolute path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+# Import the pipeline steps under test
+from src.load_data import load_data
+from src.data_prep import preprocess_data
+from src.model import prepare_training_data, train_logistic_regression
+from src.scoring import score_batch
+from src.linear_scorer import export_linear_model, LinearScorer
+
+# Fraud rate of the Kaggle creditcard dataset (492 of 284,807 transactions)
+FRAUD_RATE = 0.00172
+
+# Rows generated per CSV write, so generating 10^8 rows never holds the full table in memory
+GENERATE_CHUNK_ROWS = 1_000_000
+
+# Rows per chunk of the streaming loader and undersampler
+STREAM_CHUNK_ROWS = 1_000_000
+
+# Largest size at which the steps that need the whole table in memory are run
+MAX_IN_MEMORY_ROWS = 20_000_000
+
+# Default location of the result files
+RESULTS_DIR = os.path.join(PROJECT_ROOT, 'benchmarks', 'results')
+
+
+def generate_synthetic(file_path, n_rows, seed=42, fraud_rate=FRAUD_RATE):
+    """
+    Write a creditcard-shaped CSV: Time, V1..V28, Amount and Class.
+
+    V1..V28 are standard normal, shifted for fraud rows so models have some
+    signal to learn; Amount is log-normal and Time increases over two days.
+    The same seed and size always give the same file.
+
+    Parameters:
+    file_path (str): Destination CSV path.
+    n_rows (int): Number of transactions.
+    seed (int): Random seed.
+    fraud_rate (float): Fraction of rows with Class 1.
+    """
+
+    rng = np.random.default_rng(seed)
+    shift = rng.normal(0, 1.5, 28)
+    columns = ['Time'] + [f'V{i}' for i in range(1, 29)] + ['Amount', 'Class']
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'w') as file:
+        for start in range(0, n_rows, GENERATE_CHUNK_ROWS):
+            rows = min(GENERATE_CHUNK_ROWS, n_rows - start)
+            label = (rng.random(rows) < fraud_rate).astype(np.int8)
+            features = rng.standard_normal((rows, 28), dtype=np.float32) + np.outer(label, shift).astype(np.float32)
+            chunk = pd.DataFrame(features, columns=columns[1:29])
+            chunk.insert(0, 'Time', np.linspace(start, start + rows, rows, endpoint=False) * (172_800 / n_rows))
+            chunk['Amount'] = rng.lognormal(3, 1.5, rows).round(2)
+            chunk['Class'] = label
+            chunk.to_csv(file, header=start == 0, index=False, float_format='%.6f')
+    os.replace(tmp_path, file_path)
+
+
+def _rss_mb():
+    # Current and peak resident set size from /proc (Linux); None elsewhere
+    try:
+        with open('/proc/self/status') as file:
+            fields = dict(line.split(':', 1) for line in file if line.startswith(('VmRSS', 'VmHWM')))
+        return int(fields['VmRSS'].split()[0]) / 1024, int(fields['VmHWM'].split()[0]) / 1024
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def _reset_peak_rss():
+    # Writing 5 to clear_refs resets the peak RSS counter (Linux 4.0+); best effort elsewhere
+    try:
+        with open('/proc/self/clear_refs', 'w') as file:
+            file.write('5')
+    except OSError:
+        pass
+
+
+def measure(func, repeat=3, trace_memory=True):
+    """
+    Time a function over several runs and record its memory use.
+
+    Timed runs are separate from the traced run, since tracemalloc slows allocations down.
+
+    Parameters:
+    func (callable): Function without arguments; its last result is returned.
+    repeat (int): Number of timed runs.
+    trace_memory (bool): Whether to do one extra run under tracemalloc.
+
+    Returns:
+    Tuple: (measurement dict, result of the last call).
+    """
+
+    seconds = []
+    rss_before, _ = _rss_mb()
+    _reset_peak_rss()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        seconds.append(time.perf_counter() - start)
+    rss_after, rss_peak = _rss_mb()
+
+    measurement = {
+        'seconds': seconds,
+        'min_seconds': min(seconds),
+        'median_seconds': float(np.median(seconds)),
+        'rss_before_mb': rss_before,
+        'rss_after_mb': rss_after,
+        'rss_peak_mb': rss_peak,
+    }
+
+    if trace_memory:
+        del result
+        tracemalloc.start()
+        try:
+            result = func()
+            measurement['tracemalloc_peak_mb'] = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+    return measurement, result
+
+
+def _score_single(model, rows):
+    # One call per transaction, the way an interactive request is scored
+    for row in rows:
+        score_batch(model, row)
+
+
+def _count_chunks(chunks):
+    # Consume a chunk iterator without keeping the chunks, as a streaming consumer would
+    return sum(len(chunk) for chunk in chunks)
+
+
+def bench_size(n_rows, data_dir, repeat=3, trace_memory=True, single_rows=1000, seed=42,
+               chunk_rows=STREAM_CHUNK_ROWS, max_in_memory_rows=MAX_IN_MEMORY_ROWS):
+    """
+    Benchmark every pipeline step on one synthetic dataset size.
+
+    The loader and undersampler are timed on the chunked path the pipeline
+    uses, so they never hold the whole table. The full table is only loaded
+    for the steps that need it (full loads, the train/test split), and not at
+    all above 'max_in_memory_rows'.
+
+    Parameters:
+    n_rows (int): Number of transactions.
+    data_dir (str): Directory for the generated data (reused across runs).
+    repeat (int): Timed runs per step.
+    trace_memory (bool): Whether to record tracemalloc peaks.
+    single_rows (int): Transactions scored one at a time for the single-scoring step.
+    seed (int): Random seed of the synthetic data.
+    chunk_rows (int): Rows per chunk of the streaming steps.
+    max_in_memory_rows (int): Largest size at which the whole-table steps are run.
+
+    Returns:
+    list: One result dict per step.
+    """
+
+    # load_data reads from data/raw_data relative to the working directory
+    raw_dir = os.path.join(data_dir, 'data', 'raw_data')
+    os.makedirs(raw_dir, exist_ok=True)
+    file_name = f'synthetic_{n_rows}_{seed}.csv'
+    if not os.path.exists(os.path.join(raw_dir, file_name)):
+        print(f"Generating {n_rows:,} rows ...", flush=True)
+        generate_synthetic(os.path.join(raw_dir, file_name), n_rows, seed)
+
+    results = []
+    os.chdir(data_dir)
+
+    def record(step, func, rows_processed):
+        measurement, result = measure(func, repeat=repeat, trace_memory=trace_memory)
+        measurement.update(step=step, rows=n_rows, rows_processed=rows_processed,
+                           rows_per_second=rows_processed / measurement['min_seconds'])
+        results.append(measurement)
+        print(f"{n_rows:>12,}  {step:<28} {measurement['min_seconds']:10.4f}s", flush=True)
+        return result
+
+    # Streaming steps: peak memory is one chunk plus the undersampler's bounded buffer
+    record('load_data_chunked', lambda: _count_chunks(load_data(file_name, chunksize=chunk_rows)), n_rows)
+    record('preprocess_data_streaming',
+           lambda: preprocess_data(load_data(file_name, chunksize=chunk_rows)), n_rows)
+
+    if n_rows > max_in_memory_rows:
+        print(f"{n_rows:>12,}  skipping the whole-table steps (above {max_in_memory_rows:,} rows)", flush=True)
+        return results
+
+    # Full loads; their results are dropped right away, so only one copy of the table is ever alive
+    record('load_data_csv', lambda: load_data(file_name, use_cache=False), n_rows)
+
+    # The first cached load builds the Feather cache; the timed runs then measure cache hits
+    load_data(file_name)
+    record('load_data_cached', lambda: load_data(file_name), n_rows)
+
+    # The stratified split needs the whole table; it is released as soon as the split exists
+    df = load_data(file_name)
+    X_train, y_train, X_test, y_test = record('prepare_training_data', lambda: prepare_training_data(df), n_rows)
+    del df
+    model = record('train_logistic_regression', lambda: train_logistic_regression(X_train, y_train), len(X_train))
+
+    # Scoring: the scikit-learn model and the NumPy scorer, one transaction at a time and as one batch
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        artifact_path = os.path.join(tmp_dir, 'model.npz')
+        export_linear_model(model, artifact_path)
+        scorer = LinearScorer.load(artifact_path)
+
+    single = X_test.head(single_rows).to_dict('records')
+    for name, scoring_model in (('sklearn', model), ('linear_scorer', scorer)):
+        record(f'score_single_{name}', lambda: _score_single(scoring_model, single), len(single))
+        record(f'score_batch_{name}', lambda: score_batch(scoring_model, X_test), len(X_test))
+
+    del X_train, y_train, X_test, y_test
+    return results
+
+
+def _git_commit():
+    # Commit and dirty flag of the working tree, so results can be compared across commits
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=PROJECT_ROOT, text=True).strip()
+        dirty = bool(subprocess.check_output(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                             cwd=PROJECT_ROOT, text=True).strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def environment():
+    """
+    Describe where and on what code the benchmark ran.
+
+    Returns:
+    dict: Git commit, library versions and machine details.
+    """
+
+    commit, dirty = _git_commit()
+    return {
+        'git_commit': commit,
+        'git_dirty': dirty,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'scikit-learn': sklearn.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def compare(base_path, new_path, tolerance=0.10):
+    """
+    Print the per-step change between two result files and flag regressions.
+
+    Parameters:
+    base_path (str): Result file of the reference commit.
+    new_path (str): Result file to check.
+    tolerance (float): Relative slowdown of the best time above which a step counts as a regression.
+
+    Returns:
+    list: (rows, step, ratio) for every regressed step.
+    """
+
+    with open(base_path) as file:
+        base = {(r['rows'], r['step']): r for r in json.load(file)['results']}
+    with open(new_path) as file:
+        new = json.load(file)['results']
+
+    regressions = []
+    print(f"{'rows':>12}  {'step':<26} {'base':>10} {'new':>10} {'ratio':>7}")
+    for result in new:
+        reference = base.get((result['rows'], result['step']))
+        if reference is None:
+            continue
+        ratio = result['min_seconds'] / reference['min_seconds']
+        flag = '  REGRESSION' if ratio > 1 + tolerance else ''
+        print(f"{result['rows']:>12,}  {result['step']:<26} {reference['min_seconds']:10.4f} "
+              f"{result['min_seconds']:10.4f} {ratio:7.2f}{flag}")
+        if flag:
+            regressions.append((result['rows'], result['step'], ratio))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the fraud pipeline on synthetic creditcard-shaped data")
+    parser.add_argument("--rows", type=float, nargs='+', default=[1e5, 1e6],
+                        help="dataset sizes, e.g. 1e5 1e6 1e7 1e8")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per step")
+    parser.add_argument("--single-rows", type=int, default=1000, help="transactions scored one at a time")
+    parser.add_argument("--chunk-rows", type=int, default=STREAM_CHUNK_ROWS,
+                        help="rows per chunk of the streaming loader and undersampler")
+    parser.add_argument("--max-in-memory-rows", type=float, default=MAX_IN_MEMORY_ROWS,
+                        help="largest size at which steps needing the whole table are run")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), 'fraud-bench'),
+                        help="where synthetic data is generated and cached")
+    parser.add_argument("--no-tracemalloc", action='store_true', help="skip the extra memory-traced run per step")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/bench-<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=('BASE', 'NEW'),
+                        help="compare two result files instead of running; exits 1 on a regression")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed slowdown when comparing")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, tolerance=args.tolerance) else 0)
+
+    env = environment()
+    output = os.path.abspath(args.output or os.path.join(
+        RESULTS_DIR, f"bench-{(env['git_commit'] or 'unknown')[:12]}{'-dirty' if env['git_dirty'] else ''}.json"))
+    data_dir = os.path.abspath(args.data_dir)
+
+    results = []
+    for n_rows in args.rows:
+        results += bench_size(int(n_rows), data_dir, repeat=args.repeat, trace_memory=not args.no_tracemalloc,
+                              single_rows=args.single_rows, seed=args.seed, chunk_rows=args.chunk_rows,
+                              max_in_memory_rows=int(args.max_in_memory_rows))
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as file:
+        json.dump({'environment': env, 'results': results}, file, indent=2)
+    print(f"Results written to {output}")
@@ -0,0 +1,369 @@
+# Import argparse — command-line options for the port, host, model path and worker count
+import argparse
+
+# Import asyncio — each worker runs the micro-batcher on an event loop in a background thread
+import asyncio
+
+# Import json — request and response bodies are JSON
+import json
+
+# Import multiprocessing — workers agree through shared memory on which baseline the drift counters hold
+import multiprocessing
+
+# Import os — used to fork worker processes that share one listening socket
+import os
+
+# Import socket — the listening socket is created once and inherited by every worker
+import socket
+
+# Import threading — the batching event loop runs next to the request threads
+import threading
+
+# Import time — measures per-request latency for the histogram
+import time
+
+# Import numpy — rows of concurrent requests are stacked into one matrix
+import numpy as np
+
+# Import the standard-library HTTP server — keeps the service free of web-framework dependencies
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Import the vectorized scoring helpers, the shared latency histogram and the drift monitor
+from src.scoring import MicroBatcher, model_matrix, score_batch
+from src.metrics import LatencyHistogram
+from src.monitoring import DriftMonitor, baseline_path, load_baseline
+from src.model_cache import ModelCache
+
+# Default location of the model written by src/model.py
+MODEL_PATH = "models/logistic_regression_model.pkl"
+
+# Upper bound on request bodies, so a single client cannot exhaust worker memory
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+# Default micro-batching of single-transaction requests: rows per scoring call and longest wait
+MAX_BATCH_SIZE = 256
+MAX_WAIT_MS = 2.0
+
+# Drift counters are allocated before forking with room for this many times the startup baseline,
+# so a reloaded model with more features keeps counting into memory every worker shares
+DRIFT_COUNTER_HEADROOM = 4
+
+
+class SnapshotMonitor:
+    """
+    Drift monitor that follows the model snapshot handed out by the model cache.
+
+    A reloaded model can have a different feature layout and is saved with its
+    own baseline, so the monitor is rebuilt from the snapshot's feature names
+    and the reloaded baseline whenever the snapshot changes. The new monitor
+    reuses the counters allocated before forking (with DRIFT_COUNTER_HEADROOM
+    room to grow), and the first worker to load a new baseline clears them, so
+    all workers keep reporting into one sketch.
+
+    Parameters:
+    model_path (str): Path of the model; the baseline is read from next to it.
+    """
+
+    def __init__(self, model_path):
+        self.model_path = model_path
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._monitor = None
+        self._counts = None
+        # mtime of the baseline the shared counters currently hold, shared across workers
+        self._baseline_mtime = multiprocessing.Value('q', -1)
+
+    def get(self, snapshot):
+        """
+        Return the drift monitor for a model snapshot, rebuilding it if the snapshot changed.
+
+        Parameters:
+        snapshot (ModelSnapshot): Snapshot the observed rows were built and scored with.
+
+        Returns:
+        DriftMonitor or None: None if the model was saved without a baseline.
+        """
+
+        if snapshot is not self._snapshot:
+            with self._lock:
+                if snapshot is not self._snapshot:
+                    self._monitor = self._build(snapshot)
+                    self._snapshot = snapshot
+        return self._monitor
+
+    def _build(self, snapshot):
+        try:
+            mtime = os.stat(baseline_path(self.model_path)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        baseline = load_baseline(self.model_path)
+        if baseline is None:
+            return None
+
+        if self._counts is None:
+            # The first counters are kept for every later monitor; serve() allocates them before forking
+            fractions = baseline['fractions']
+            self._counts = multiprocessing.Array('Q', DRIFT_COUNTER_HEADROOM * len(fractions) * len(fractions[0]))
+
+        monitor = DriftMonitor(baseline, feature_names=snapshot.model.feature_names_in_, counts=self._counts)
+        if monitor._counts is self._counts:
+            with self._baseline_mtime.get_lock():
+                if self._baseline_mtime.value != mtime:
+                    monitor.reset()
+                    self._baseline_mtime.value = mtime
+        return monitor
+
+
+class BatchScorer:
+    """
+    Score concurrent single-transaction requests from the server threads in micro-batches.
+
+    Each worker process runs one MicroBatcher on an asyncio loop in a daemon
+    thread. A request thread hands over its model snapshot and feature row and
+    blocks until the batch containing it has been scored with one vectorized call.
+
+    Parameters:
+    monitors (SnapshotMonitor, optional): Counts every scored row for drift monitoring.
+    max_batch_size (int): Maximum number of rows scored in one call.
+    max_wait_ms (float): Maximum time a request waits for others to join its batch.
+    """
+
+    def __init__(self, monitors=None, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.monitors = monitors
+        self.batcher = MicroBatcher(self._score_rows, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="score-batcher", daemon=True)
+        self._thread.start()
+
+    def score(self, snapshot, row):
+        """
+        Score one transaction together with whatever else is queued.
+
+        Parameters:
+        snapshot (ModelSnapshot): Model, schema and threshold the row was built for.
+        row (ndarray): Feature matrix of shape (1, n_features) from model_matrix.
+
+        Returns:
+        Tuple: (fraud probability, 1 if flagged at the snapshot's threshold else 0).
+        """
+
+        return asyncio.run_coroutine_threadsafe(self.batcher.score((snapshot, row)), self.loop).result()
+
+    def _score_rows(self, items):
+        # A batch normally shares one snapshot; rows queued around a model reload are scored per snapshot
+        groups = {}
+        for idx, (snapshot, _) in enumerate(items):
+            groups.setdefault(id(snapshot), []).append(idx)
+
+        results = [None] * len(items)
+        for indices in groups.values():
+            snapshot = items[indices[0]][0]
+            matrix = np.vstack([items[idx][1] for idx in indices])
+            probabilities = score_batch(snapshot.model, matrix)
+            monitor = self.monitors.get(snapshot) if self.monitors is not None else None
+            if monitor is not None:
+                monitor.observe(matrix, probabilities)
+            for idx, probability in zip(indices, probabilities):
+                results[idx] = (float(probability), int(probability >= snapshot.threshold))
+        return results
+
+    def close(self):
+        """Stop the micro-batcher and its event loop."""
+
+        asyncio.run_coroutine_threadsafe(self.batcher.close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+
+
+class InferenceHandler(BaseHTTPRequestHandler):
+    """
+    JSON endpoints for single and batch scoring.
+
+    POST /score        {"transaction": {...}}      -> {"probability": p, "prediction": 0|1}
+    POST /score/batch  {"transactions": [{...}]}   -> {"probabilities": [...], "predictions": [...]}
+    GET  /health                                   -> {"status": "ok"}
+    GET  /metrics                                  -> Prometheus latency histogram and drift gauges
+    GET  /drift                                    -> {"rows": n, "drift": {feature: {"psi", "ks"}}}
+    """
+
+    # Keep connections alive so machine clients do not pay a TCP handshake per decision
+    protocol_version = "HTTP/1.1"
+
+    # Set by serve() before any worker starts; the batcher is started in each worker
+    model_cache = None
+    histogram = None
+    monitors = None
+    batcher = None
+
+    def log_message(self, format, *args):
+        # Per-request access logging costs more than the prediction itself; stay quiet
+        pass
+
+    def _send(self, status, body, content_type="application/json"):
+        payload = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        if length > MAX_BODY_BYTES:
+            raise ValueError("Request body too large.")
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, {"status": "ok"})
+        elif self.path in ("/metrics", "/drift"):
+            # Report against the current model's baseline, even if nothing has been scored since a reload
+            monitor = self.monitors.get(self.model_cache.get())
+            if self.path == "/metrics":
+                body = self.histogram.render() + (monitor.render() if monitor else "")
+                self._send(200, body, content_type="text/plain; version=0.0.4")
+            elif monitor:
+                self._send(200, monitor.report())
+            else:
+                self._send(404, {"error": "not found"})
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        start = time.perf_counter()
+        try:
+            self._handle_post()
+        finally:
+            self.histogram.observe(time.perf_counter() - start)
+
+    def _handle_post(self):
+        try:
+            payload = self._read_json()
+            if self.path == "/score":
+                transactions = payload["transaction"]
+            elif self.path == "/score/batch":
+                transactions = payload["transactions"]
+            else:
+                self._send(404, {"error": "not found"})
+                return
+
+            # One snapshot per request, so the model, schema and threshold always belong together
+            snapshot = self.model_cache.get()
+            model, schema, threshold = snapshot
+
+            # Build the matrix once, so the drift monitor counts exactly the values that were scored
+            # Parsing stays in the request thread, so one invalid transaction never fails a whole batch
+            matrix = model_matrix(model, transactions, schema=schema)
+
+            if self.path == "/score" and self.batcher is not None and len(matrix) == 1:
+                # Single transactions arriving together are scored in one vectorized call
+                probability, prediction = self.batcher.score(snapshot, matrix)
+                body = {"probability": probability, "prediction": prediction}
+            else:
+                probabilities = score_batch(model, matrix)
+                monitor = self.monitors.get(snapshot)
+                if monitor is not None:
+                    monitor.observe(matrix, probabilities)
+                body = self._body(probabilities, threshold)
+        except (KeyError, ValueError, TypeError) as exc:
+            # Missing fields, malformed JSON or non-numeric values are the client's fault
+            # Schema errors name the offending field
+            self._send(400, {"error": str(exc)})
+            return
+        self._send(200, body)
+
+    def _body(self, probabilities, threshold):
+        if self.path == "/score":
+            probability = float(probabilities[0])
+            return {"probability": probability, "prediction": int(probability >= threshold)}
+        return {
+            "probabilities": probabilities.tolist(),
+            "predictions": (probabilities >= threshold).astype(int).tolist(),
+        }
+
+
+def _serve_forever(server, max_batch_size, max_wait_ms):
+    # Threads do not survive fork, so every worker starts its own batching loop
+    if max_wait_ms > 0:
+        InferenceHandler.batcher = BatchScorer(InferenceHandler.monitors, max_batch_size, max_wait_ms)
+    try:
+        server.serve_forever()
+    finally:
+        if InferenceHandler.batcher is not None:
+            InferenceHandler.batcher.close()
+            InferenceHandler.batcher = None
+
+
+def serve(host, port, model_path, workers, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+    """
+    Load the model once and serve it from one or more worker processes.
+
+    The model is loaded and the socket bound in the parent before forking, so
+    workers share the model pages copy-on-write and the kernel spreads incoming
+    connections across them. Each worker reloads the model, schema and
+    threshold together when a newly trained model is written.
+
+    Parameters:
+    host (str): Interface to bind.
+    port (int): TCP port to listen on.
+    model_path (str): Path to the pickled model.
+    workers (int): Number of worker processes.
+    max_batch_size (int): Maximum number of concurrent /score requests scored in one call.
+    max_wait_ms (float): Longest a /score request waits for others to join its batch; 0 disables batching.
+    """
+
+    # The model with its schema and threshold: with a saved schema, omitted fields take their training
+    # medians and bad values are rejected by name; rows are flagged at the cost-optimal threshold, not at 0.5
+    InferenceHandler.model_cache = ModelCache(model_path)
+    snapshot = InferenceHandler.model_cache.get()
+    model, _, threshold = snapshot
+
+    # Score one dummy row so lazy imports and first-call setup happen before the first real request
+    score_batch(model, [[0.0] * model.n_features_in_])
+
+    InferenceHandler.histogram = LatencyHistogram("fraud_score_latency_seconds")
+
+    # Input and score drift against the baseline saved with the model, rebuilt when the model reloads
+    # Built once before forking, so the counters are shared across workers
+    InferenceHandler.monitors = SnapshotMonitor(model_path)
+    InferenceHandler.monitors.get(snapshot)
+
+    server = ThreadingHTTPServer((host, port), InferenceHandler)
+    server.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    print(f"Serving {model_path} on http://{host}:{port} with {workers} worker(s), "
+          f"threshold {threshold:.4f}")
+
+    # Fork is only available on POSIX; elsewhere fall back to a single process
+    if workers > 1 and hasattr(os, "fork"):
+        children = []
+        for _ in range(workers):
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    _serve_forever(server, max_batch_size, max_wait_ms)
+                finally:
+                    os._exit(0)
+            children.append(pid)
+        try:
+            for pid in children:
+                os.waitpid(pid, 0)
+        except KeyboardInterrupt:
+            pass
+    else:
+        try:
+            _serve_forever(server, max_batch_size, max_wait_ms)
+        except KeyboardInterrupt:
+            pass
+    server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless fraud-scoring HTTP service")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-batch-size", type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    args = parser.parse_args()
+    serve(args.host, args.port, args.model, args.workers, args.max_batch_size, args.max_wait_ms)
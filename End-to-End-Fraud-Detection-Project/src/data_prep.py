@@ -2,59 +2,130 @@
 # Commonly used for loading datasets, handling DataFrames, and performing preprocessing tasks
 import pandas as pd
 
-# Import seaborn — a statistical data visualization library built on top of matplotlib
-# Provides high-level functions for creating attractive and informative plots (e.g., barplots, heatmaps)
-import seaborn as sns
-
-# Import matplotlib.pyplot — the core plotting interface of matplotlib
-# Used for customizing plots, setting figure size, labels, titles, and displaying visualizations
-import matplotlib.pyplot as plt
-
-# Import RandomUnderSampler from imbalanced-learn — a tool for handling class imbalance
-# Randomly downsamples the majority class to balance the dataset, improving model fairness and performance
-from imblearn.under_sampling import RandomUnderSampler
+# Import numpy — used for the seeded random keys of the streaming undersampler
+import numpy as np
 
 # Import os — a standard Python library for interacting with the operating system
 # Useful for file path handling, directory navigation, and environment variable access
 import os
 
-def preprocess_data(df):
+# Import warnings — a sample smaller than requested is reported through the warnings machinery
+import warnings
+
+# Import the typed, cached loader so the raw CSV is parsed in one place only
+from src.load_data import load_data
+
+# Import the headless reporting helpers — float32 correlation, JSON numbers, Agg rendering
+from src.report import heatmap_report, render_heatmap
+
+# Minority rows to see before the streaming undersampler starts discarding majority rows
+_MIN_MINORITY_FOR_THRESHOLD = 100
+
+def stream_undersample(chunks, sampling_ratio=1.0, random_state=42, oversample_factor=2.0):
+    """
+    Undersample the majority class in a single pass over a stream of chunks.
+
+    Every minority (fraud) row is kept. Each majority row draws a uniform random
+    key and the final sample is the rows with the smallest keys, which is a
+    uniform sample without replacement. Only rows whose key is below a
+    shrinking threshold are buffered, so peak memory is bounded by one chunk
+    plus roughly 'oversample_factor' times the sample size.
+
+    The threshold is set from the class ratio seen so far. When fraud rows
+    are concentrated late in the stream, majority rows needed for the final
+    ratio may already have been discarded; the sample then keeps every
+    buffered majority row and a RuntimeWarning reports the shortfall.
+
+    Parameters:
+    chunks (iterable): DataFrames with a 'Class' column (e.g. load_data(..., chunksize=N)).
+    sampling_ratio (float): Number of majority rows to keep per minority row.
+    random_state (int): Seed for the random keys, for reproducible samples.
+    oversample_factor (float): Safety margin on the buffered majority rows.
+
+    Returns:
+    DataFrame: The downsampled DataFrame, majority rows first.
+    """
+
+    # Seeded generator so the same input stream always yields the same sample
+    rng = np.random.default_rng(random_state)
+
+    # Minority rows are kept as-is; majority rows live in a key-tagged buffer
+    minority_parts = []
+    n_minority = 0
+    n_majority = 0
+    buffer = None
+    buffer_keys = np.empty(0)
+
+    # Keep-threshold on the random keys — only ever decreases, which keeps the sample uniform
+    threshold = 1.0
+
+    for chunk in chunks:
+        is_minority = (chunk['Class'] == 1).to_numpy()
+
+        # Keep every fraud row
+        if is_minority.any():
+            minority_parts.append(chunk[is_minority])
+            n_minority += int(is_minority.sum())
+
+        # Draw one random key per majority row and buffer only the ones under the threshold
+        majority = chunk[~is_minority]
+        n_majority += len(majority)
+        keys = rng.random(len(majority))
+        keep = keys < threshold
+        if buffer is None:
+            buffer = majority[keep]
+        else:
+            buffer = pd.concat([buffer, majority[keep]])
+        buffer_keys = np.concatenate([buffer_keys, keys[keep]])
+
+        # Tighten the threshold to the fraction of majority rows we expect to need, with a margin
+        # Wait for a minimum number of fraud rows so an early, fraud-poor chunk cannot set it too low
+        if n_majority and n_minority >= _MIN_MINORITY_FOR_THRESHOLD:
+            expected = oversample_factor * sampling_ratio * n_minority / n_majority
+            threshold = min(threshold, expected)
+            keep = buffer_keys < threshold
+            if not keep.all():
+                buffer = buffer[keep]
+                buffer_keys = buffer_keys[keep]
+
+    if buffer is None:
+        raise ValueError("Cannot undersample an empty input.")
+
+    # The sample is the majority rows with the smallest keys
+    # If the margin was too tight we keep every buffered row (still a uniform sample) and warn
+    n_target = min(int(round(sampling_ratio * n_minority)), n_majority)
+    n_samples = min(n_target, len(buffer))
+    if n_samples < n_target:
+        warnings.warn(f"Only {n_samples} of {n_target} majority rows could be sampled, because fraud rows "
+                      f"were concentrated late in the stream; shuffle the input or raise oversample_factor "
+                      f"(currently {oversample_factor:g}).", RuntimeWarning, stacklevel=2)
+    selected = np.sort(np.argpartition(buffer_keys, n_samples - 1)[:n_samples]) if n_samples else []
+
+    # Combine the sampled majority rows with every minority row into a single DataFrame
+    downsampled_df = pd.concat([buffer.iloc[selected]] + minority_parts, ignore_index=True)
+
+    # Return the final downsampled DataFrame for further modeling or analysis
+    return downsampled_df
+
+def preprocess_data(df, sampling_ratio=1.0, random_state=42):
     """
     Preprocess the data by performing undersampling and saving the processed data.
     
     Parameters:
-    df (DataFrame): The input DataFrame to preprocess.
+    df (DataFrame or iterable): The input DataFrame to preprocess, or an iterator
+                                of DataFrame chunks for out-of-core data.
+    sampling_ratio (float): Number of majority rows to keep per minority row.
+    random_state (int): Seed for the sampling, for reproducible results.
     
     Returns:
     DataFrame: The downsampled DataFrame.
     """
 
-    # Separate features (X) and target (y)
-    # 'X' includes all columns except 'Class', which is the label indicating fraud (1) or non-fraud (0)
-    X = df.drop('Class', axis=1)
-
-    # 'y' contains only the 'Class' column — the target variable for classification
-    y = df['Class']
-
-    # Initialize RandomUnderSampler to balance the dataset by reducing the majority class
-    # 'random_state=42' ensures reproducibility of the sampling process
-    rus = RandomUnderSampler(random_state=42)
+    # A single in-memory DataFrame is simply a stream with one chunk
+    chunks = [df] if isinstance(df, pd.DataFrame) else df
 
-    # Apply undersampling to the dataset
-    # This returns a new set of features and labels with balanced class distribution
-    X_resampled, y_resampled = rus.fit_resample(X, y)
-
-    # Convert the resampled features and labels back into a single DataFrame
-    # pd.DataFrame(X_resampled, columns=X.columns) restores column names for features
-    # pd.DataFrame(y_resampled, columns=['Class']) ensures the target column is labeled correctly
-    # pd.concat(..., axis=1) merges features and target side-by-side
-    downsampled_df = pd.concat([
-        pd.DataFrame(X_resampled, columns=X.columns),
-        pd.DataFrame(y_resampled, columns=['Class'])
-    ], axis=1)
-
-    # Return the final downsampled DataFrame for further modeling or analysis
-    return downsampled_df
+    # Balance the classes in one pass without materialising resampled copies of the table
+    return stream_undersample(chunks, sampling_ratio=sampling_ratio, random_state=random_state)
 
 def save_processed_data(df, file_path):
     """
@@ -81,41 +152,30 @@ def plot_heatmap(df, file_path):
     file_path (str): The path to save the heatmap image.
     """
 
-    # Override the input file_path to ensure the heatmap is saved in the 'artifacts' directory
-    # This hardcoded path ensures consistency but ignores the function's file_path argument
-    file_path = 'artifacts/heatmap.jpeg'
-
-    # Set the figure size to 16x9 inches for a wide, readable layout
-    plt.figure(figsize=(16, 9))
-
-    # Compute and plot the correlation matrix as a heatmap
-    # 'df.corr()' calculates pairwise correlations between numeric columns
-    # 'annot=True' displays the correlation values inside each cell
-    sns.heatmap(df.corr(), annot=True)
-
-    # Save the heatmap image to the specified file path
-    plt.savefig(file_path)
+    # Compute the correlation matrix in NumPy float32 and save the raw numbers as JSON
+    # Then draw it with the non-interactive backend and close the figure
+    render_heatmap(**heatmap_report(df, file_path))
 
     # Print confirmation message with the save location
     print(f"Heatmap saved to {file_path}")
 
-# Example usage:
+if __name__ == "__main__":
+    # Example usage:
 
-# Load the raw credit card transaction data from CSV
-# This dataset contains anonymized features and a 'Class' column indicating fraud (1) or non-fraud (0)
-data_path = 'data/raw_data/creditcard.csv'
-df = pd.read_csv(data_path)
+    # Load the raw credit card transaction data through the typed, cached loader
+    # This dataset contains anonymized features and a 'Class' column indicating fraud (1) or non-fraud (0)
+    df = load_data('creditcard.csv')
 
-# Preprocess the data by applying RandomUnderSampler to balance the class distribution
-# This step reduces the majority class to match the minority class, improving model fairness
-downsampled_df = preprocess_data(df)
+    # Preprocess the data by streaming it in chunks through the undersampler to balance the class distribution
+    # This step reduces the majority class to match the minority class, improving model fairness
+    downsampled_df = preprocess_data(load_data('creditcard.csv', chunksize=100_000))
 
-# Save the original (unprocessed) data to a new CSV file for reference or backup
-# Note: This line saves 'df', not the downsampled version — consider saving 'downsampled_df' instead if intended
-processed_data_path = 'data/processed/processed_data.csv'
-save_processed_data(df, processed_data_path)
+    # Save the original (unprocessed) data to a new CSV file for reference or backup
+    # Note: This line saves 'df', not the downsampled version — consider saving 'downsampled_df' instead if intended
+    processed_data_path = 'data/processed/processed_data.csv'
+    save_processed_data(df, processed_data_path)
 
-# Plot and save a heatmap of feature correlations using the downsampled data
-# This helps visualize relationships between features and identify potential multicollinearity
-heatmap_path = 'artifacts/heatmap.jpeg'
-plot_heatmap(downsampled_df, heatmap_path)
+    # Plot and save a heatmap of feature correlations using the downsampled data
+    # This helps visualize relationships between features and identify potential multicollinearity
+    heatmap_path = 'artifacts/heatmap.jpeg'
+    plot_heatmap(downsampled_df, heatmap_path)
@@ -0,0 +1,230 @@
+# Import numpy — every transform is a whole-column array operation, with no per-row Python loops
+import numpy as np
+
+# Import pandas — factorizes entity ids for the rolling velocity aggregates
+import pandas as pd
+
+# Import scikit-learn's estimator base classes when available, so the transformer fits in a Pipeline
+try:
+    from sklearn.base import BaseEstimator, TransformerMixin
+except ImportError:
+    BaseEstimator, TransformerMixin = object, object
+
+# Import the NumPy-only transform code shared with serving (src.transform never imports pandas or scikit-learn)
+from src.transform import SECONDS_PER_DAY, feature_layout, engineer_features
+
+# Trailing windows of the per-card velocity aggregates, in seconds
+VELOCITY_WINDOWS = {'1h': 3600, '24h': 86400, '7d': 604800}
+
+# Buckets per window — windows advance one bucket at a time, exactly like the online feature store
+VELOCITY_BUCKETS = 60
+
+
+def rolling_velocity(entity, time, amount, window, bucket_width=None):
+    """
+    Per-entity count and amount sum over a trailing time window, fully vectorized.
+
+    Each row sees the earlier rows of the same entity with time in
+    (t - window, t], itself included. With a bucket_width, time is cut into
+    buckets of that width and the window is the last window / bucket_width
+    buckets up to the row's own, which is what the online FeatureStore keeps.
+    Rows are sorted once by (entity, time); entities are laid out on disjoint
+    stretches of a single sorted key, so one searchsorted call finds every
+    window start and a cumulative sum gives every window total.
+
+    Parameters:
+    entity (array): Entity id per row (e.g. card id).
+    time (array): Event time per row, in seconds.
+    amount (array): Transaction amount per row.
+    window (float): Window length in seconds.
+    bucket_width (float, optional): Bucket width in seconds; exact windows when omitted.
+
+    Returns:
+    Tuple: (count, amount sum) arrays aligned with the input rows.
+    """
+
+    codes, _ = pd.factorize(np.asarray(entity))
+    time = np.asarray(time, dtype=np.float64)
+    amount = np.asarray(amount, dtype=np.float64)
+    if len(time) == 0:
+        return np.zeros(0), np.zeros(0)
+
+    # Sort by entity, then time (stable, so ties keep their input order)
+    order = np.lexsort((time, codes))
+    if bucket_width is None:
+        offset = time - time.min()
+        lookback, side = window, 'right'
+    else:
+        # Work in whole buckets: the window holds the row's bucket and the buckets before it
+        offset = np.floor(time / bucket_width)
+        offset -= offset.min()
+        lookback, side = round(window / bucket_width) - 1, 'left'
+    span = offset.max() + lookback + 1.0
+    key = codes[order] * span + offset[order]
+
+    # First row inside each row's window, and window totals from a cumulative sum
+    position = np.arange(len(key))
+    start = np.searchsorted(key, key - lookback, side=side)
+    cumulative = np.concatenate([[0.0], np.cumsum(amount[order])])
+
+    count = np.empty(len(key))
+    total = np.empty(len(key))
+    count[order] = position - start + 1
+    total[order] = cumulative[position + 1] - cumulative[start]
+    return count, total
+
+
+def add_velocity_features(df, entity_col='card_id', time_col='Time', amount_col='Amount',
+                          windows=VELOCITY_WINDOWS, buckets=VELOCITY_BUCKETS):
+    """
+    Add per-entity rolling count and amount-sum columns for each window.
+
+    Velocity needs each card's full history, so compute it on the complete
+    transaction table before any split or downsampling. Windows are bucketed
+    the same way as in the online FeatureStore, so training and serving see
+    identical values. Without an entity column the data is returned unchanged.
+
+    Parameters:
+    df (DataFrame): Transactions.
+    entity_col (str): Entity id column (e.g. card id).
+    time_col (str): Time column, in seconds.
+    amount_col (str): Amount column.
+    windows (dict): Window name -> length in seconds.
+    buckets (int, optional): Buckets per window; exact windows when None.
+
+    Returns:
+    DataFrame: A copy of df with 'velocity_<window>_count' and 'velocity_<window>_amount' columns.
+    """
+
+    if entity_col not in df.columns:
+        return df
+
+    features = {}
+    for name, window in windows.items():
+        bucket_width = window / buckets if buckets else None
+        count, total = rolling_velocity(df[entity_col].to_numpy(), df[time_col].to_numpy(),
+                                        df[amount_col].to_numpy(), window, bucket_width)
+        features[f'velocity_{name}_count'] = count.astype(np.float32)
+        features[f'velocity_{name}_amount'] = total.astype(np.float32)
+    return df.assign(**features)
+
+
+class FeatureTransformer(BaseEstimator, TransformerMixin):
+    """
+    Stateless feature transforms plus robust scaling fitted on the training data.
+
+    Adds log(1 + Amount) and a cyclical sin/cos encoding of time of day, drops
+    the raw Time, Amount and entity columns (the entity id only keys the
+    velocity aggregates), then centres every non-cyclical
+    column on its median and divides by its interquartile range. The fitted
+    parameters are plain arrays, so the transform can be serialised with the
+    model (see get_state) and applied identically at serving time by the
+    NumPy-only transform.FeatureTransform.
+
+    Parameters:
+    time_col (str): Time column, in seconds.
+    amount_col (str): Amount column.
+    entity_col (str): Entity id column, dropped from the model inputs.
+    """
+
+    def __init__(self, time_col='Time', amount_col='Amount', entity_col='card_id'):
+        self.time_col = time_col
+        self.amount_col = amount_col
+        self.entity_col = entity_col
+
+    def _set_layout(self, input_features):
+        # Numeric model inputs, the columns passed through unchanged, and the output feature names
+        self.input_features_ = list(input_features)
+        self._passthrough, self.feature_names_out_ = feature_layout(self.input_features_,
+                                                                    self.time_col, self.amount_col)
+
+    def _engineer(self, X):
+        # Build the unscaled feature matrix from a raw matrix in input_features_ order
+        return engineer_features(X, self.input_features_, self._passthrough, self.time_col, self.amount_col)
+
+    def fit(self, X, y=None):
+        """
+        Fit the robust scaling on the training data.
+
+        Parameters:
+        X (DataFrame): Raw training features.
+        y: Ignored.
+
+        Returns:
+        FeatureTransformer: self.
+        """
+
+        self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        self.n_features_in_ = len(self.feature_names_in_)
+
+        # The entity id only keys the velocity aggregates; it is never a model input itself
+        self._set_layout([name for name in X.columns if name not in (self.entity_col, 'Class')])
+
+        features = self._engineer(X[self.input_features_].to_numpy(dtype=np.float64))
+        q1, median, q3 = np.percentile(features, [25, 50, 75], axis=0)
+        scale = q3 - q1
+        scale[scale == 0] = 1.0
+
+        # The sin/cos pair is already bounded; leave it unscaled
+        median[-2:], scale[-2:] = 0.0, 1.0
+        self.center_, self.scale_ = median, scale
+        return self
+
+    def transform(self, X):
+        """
+        Apply the feature transforms and the fitted scaling.
+
+        Parameters:
+        X (DataFrame or ndarray): Raw features; arrays must be in input_features_ order.
+
+        Returns:
+        ndarray: Engineered feature matrix, in feature_names_out_ order.
+        """
+
+        if isinstance(X, pd.DataFrame):
+            X = X[self.input_features_].to_numpy(dtype=np.float64)
+        features = self._engineer(X)
+        features -= self.center_
+        features /= self.scale_
+        return features
+
+    def get_feature_names_out(self, input_features=None):
+        return np.asarray(self.feature_names_out_, dtype=object)
+
+    def get_state(self):
+        """
+        Fitted parameters as plain, JSON-serialisable values.
+
+        Returns:
+        dict: Everything needed to rebuild the fitted transformer with from_state.
+        """
+
+        return {
+            'time_col': self.time_col,
+            'amount_col': self.amount_col,
+            'entity_col': self.entity_col,
+            'feature_names_in': list(self.feature_names_in_),
+            'input_features': self.input_features_,
+            'center': self.center_.tolist(),
+            'scale': self.scale_.tolist(),
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Rebuild a fitted transformer from get_state output.
+
+        Parameters:
+        state (dict): Output of get_state.
+
+        Returns:
+        FeatureTransformer: The fitted transformer.
+        """
+
+        transformer = cls(state['time_col'], state['amount_col'], state['entity_col'])
+        transformer.feature_names_in_ = np.asarray(state['feature_names_in'], dtype=object)
+        transformer.n_features_in_ = len(transformer.feature_names_in_)
+        transformer._set_layout(state['input_features'])
+        transformer.center_ = np.asarray(state['center'])
+        transformer.scale_ = np.asarray(state['scale'])
+        return transformer
@@ -0,0 +1,278 @@
+# Import os — snapshots are written to a temporary file and swapped in atomically
+import os
+
+# Import pickle — snapshots hold the per-entity ring buffers as plain Python objects
+import pickle
+
+# Import threading — Streamlit sessions and server threads update the store concurrently
+import threading
+
+# Import time — throttles how often snapshots are written
+import time
+
+# Import OrderedDict — entities are kept in last-update order, so TTL eviction only touches the oldest
+from collections import OrderedDict
+
+# Import numpy — the bulk replay orders transactions by time in one vectorized sort
+import numpy as np
+
+# Import the window definitions shared with the offline velocity features
+from src.feat_eng import VELOCITY_WINDOWS, VELOCITY_BUCKETS
+
+
+class RollingWindow:
+    """
+    Count and amount sum over the last n_buckets time buckets, as a ring buffer.
+
+    Running totals are kept alongside the buckets, so a read is O(1). Moving
+    to a newer bucket clears at most n_buckets slots, so updates are O(1) too.
+
+    Parameters:
+    bucket_width (float): Bucket width in seconds.
+    n_buckets (int): Number of buckets in the window.
+    """
+
+    __slots__ = ('bucket_width', 'n_buckets', 'counts', 'sums', 'count', 'total', 'last_bucket')
+
+    def __init__(self, bucket_width, n_buckets):
+        self.bucket_width = bucket_width
+        self.n_buckets = n_buckets
+        self.counts = [0] * n_buckets
+        self.sums = [0.0] * n_buckets
+        self.count = 0
+        self.total = 0.0
+        self.last_bucket = None
+
+    def _advance(self, bucket):
+        # Clear the slots of every bucket that falls out of the window when moving up to 'bucket'
+        if self.last_bucket is None:
+            self.last_bucket = bucket
+            return
+        if bucket <= self.last_bucket:
+            return
+        for b in range(max(self.last_bucket + 1, bucket - self.n_buckets + 1), bucket + 1):
+            slot = b % self.n_buckets
+            self.count -= self.counts[slot]
+            self.total -= self.sums[slot]
+            self.counts[slot] = 0
+            self.sums[slot] = 0.0
+        self.last_bucket = bucket
+
+        # Reset the running sum once the window is empty, so float error cannot accumulate
+        if self.count == 0:
+            self.total = 0.0
+
+    def add(self, event_time, amount):
+        """
+        Add one event; events older than the window are ignored.
+
+        Parameters:
+        event_time (float): Event time in seconds.
+        amount (float): Event amount.
+        """
+
+        bucket = int(event_time // self.bucket_width)
+        self._advance(bucket)
+        if bucket <= self.last_bucket - self.n_buckets:
+            return
+        slot = bucket % self.n_buckets
+        self.counts[slot] += 1
+        self.sums[slot] += amount
+        self.count += 1
+        self.total += amount
+
+    def read(self, event_time):
+        """
+        Count and amount sum of the window ending at a given time.
+
+        Parameters:
+        event_time (float): Time in seconds; the window is moved forward to it.
+
+        Returns:
+        Tuple: (count, amount sum).
+        """
+
+        self._advance(int(event_time // self.bucket_width))
+        return self.count, self.total
+
+
+class FeatureStore:
+    """
+    In-process per-entity velocity features for online scoring.
+
+    Every entity (e.g. card) gets one RollingWindow per window length. The
+    buckets are the ones add_velocity_features uses offline, so a store fed
+    the same transactions in time order returns the same values the model was
+    trained on. Entities with no events for longer than ttl seconds are evicted.
+
+    Parameters:
+    windows (dict): Window name -> length in seconds.
+    buckets (int): Buckets per window.
+    ttl (float, optional): Seconds of inactivity after which an entity is dropped; defaults to the longest window.
+    """
+
+    def __init__(self, windows=VELOCITY_WINDOWS, buckets=VELOCITY_BUCKETS, ttl=None):
+        self.windows = dict(windows)
+        self.buckets = buckets
+        self.ttl = ttl if ttl is not None else max(self.windows.values())
+        self.feature_names = [f'velocity_{name}_{kind}' for name in self.windows for kind in ('count', 'amount')]
+        self._entities = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_snapshot = 0.0
+
+    def __len__(self):
+        return len(self._entities)
+
+    def __getstate__(self):
+        # Locks cannot be pickled; snapshots only carry the configuration and the buffers
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._last_snapshot = 0.0
+
+    def _new_entity(self):
+        return [RollingWindow(length / self.buckets, self.buckets) for length in self.windows.values()]
+
+    def _features(self, windows, event_time):
+        features = {}
+        for name, window in zip(self.windows, windows):
+            count, total = window.read(event_time)
+            features[f'velocity_{name}_count'] = float(count)
+            features[f'velocity_{name}_amount'] = total
+        return features
+
+    def _evict(self, now):
+        # Entities are in last-update order, so only the expired ones at the front are visited
+        while self._entities:
+            entity, (last_seen, _) = next(iter(self._entities.items()))
+            if last_seen > now - self.ttl:
+                break
+            del self._entities[entity]
+
+    def update(self, entity, event_time, amount):
+        """
+        Record a transaction and return the entity's features including it.
+
+        Parameters:
+        entity: Entity id (e.g. card id).
+        event_time (float): Transaction time in seconds.
+        amount (float): Transaction amount.
+
+        Returns:
+        dict: Feature name -> value, e.g. velocity_1h_count.
+        """
+
+        with self._lock:
+            record = self._entities.pop(entity, None)
+            windows = record[1] if record is not None else self._new_entity()
+            last_seen = max(record[0], event_time) if record is not None else event_time
+            self._entities[entity] = (last_seen, windows)
+            for window in windows:
+                window.add(event_time, amount)
+            features = self._features(windows, event_time)
+            self._evict(event_time)
+        return features
+
+    def read(self, entity, event_time):
+        """
+        Return an entity's features at a given time without recording anything.
+
+        Parameters:
+        entity: Entity id (e.g. card id).
+        event_time (float): Time in seconds.
+
+        Returns:
+        dict: Feature name -> value; all zeros for an unknown entity.
+        """
+
+        with self._lock:
+            record = self._entities.get(entity)
+            if record is None:
+                return dict.fromkeys(self.feature_names, 0.0)
+            return self._features(record[1], event_time)
+
+    def replay(self, df, entity_col='card_id', time_col='Time', amount_col='Amount'):
+        """
+        Warm the store from historical transactions.
+
+        Only transactions recent enough to still be inside a window are replayed,
+        in time order (ties keep their row order, as in add_velocity_features).
+
+        Parameters:
+        df (DataFrame): Transactions.
+        entity_col (str): Entity id column.
+        time_col (str): Time column, in seconds.
+        amount_col (str): Amount column.
+
+        Returns:
+        int: Number of transactions replayed.
+        """
+
+        if entity_col not in df.columns or len(df) == 0:
+            return 0
+
+        # Anything before the first bucket of the longest window has already expired
+        times = df[time_col].to_numpy(dtype=np.float64)
+        longest = max(self.windows.values())
+        width = longest / self.buckets
+        cutoff = (np.floor(times.max() / width) - self.buckets + 1) * width
+        recent = np.flatnonzero(times >= cutoff)
+        recent = recent[np.argsort(times[recent], kind='stable')]
+
+        entities = df[entity_col].to_numpy()[recent]
+        amounts = df[amount_col].to_numpy(dtype=np.float64)[recent]
+        for entity, event_time, amount in zip(entities.tolist(), times[recent].tolist(), amounts.tolist()):
+            self.update(entity, event_time, amount)
+        return len(recent)
+
+    def snapshot(self, file_path, min_interval=0.0):
+        """
+        Write the store to disk atomically.
+
+        Parameters:
+        file_path (str): Destination pickle path.
+        min_interval (float): Skip the write if the last snapshot is more recent than this many seconds.
+
+        Returns:
+        bool: Whether a snapshot was written.
+        """
+
+        now = time.monotonic()
+        if self._last_snapshot and now - self._last_snapshot < min_interval:
+            return False
+
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Serialise under the lock for a consistent view, then write to a temporary name and rename
+        with self._lock:
+            data = pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL)
+            self._last_snapshot = now
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, 'wb') as file:
+            file.write(data)
+        os.replace(tmp_path, file_path)
+        return True
+
+    @classmethod
+    def restore(cls, file_path, **kwargs):
+        """
+        Load a snapshot, or start an empty store if there is none.
+
+        Parameters:
+        file_path (str): Snapshot pickle path.
+        **kwargs: FeatureStore arguments used when no snapshot exists.
+
+        Returns:
+        FeatureStore: The restored (or new) store.
+        """
+
+        if not os.path.exists(file_path):
+            return cls(**kwargs)
+        with open(file_path, 'rb') as file:
+            return pickle.load(file)
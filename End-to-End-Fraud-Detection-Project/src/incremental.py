@@ -0,0 +1,263 @@
+# Import argparse — command-line options for the data file and model directory
+import argparse
+
+# Import os — checkpoint discovery and atomic file replacement
+import os
+
+# Import re — parses checkpoint version numbers from file names
+import re
+
+# Import pickle — checkpoints hold the model, scaler and stream position
+import pickle
+
+# Import numpy — class-balance weights and coefficient folding
+import numpy as np
+
+# Import pandas — parses the appended CSV rows in chunks
+import pandas as pd
+
+# Import SGDClassifier — logistic regression trained by SGD, which supports partial_fit
+from sklearn.linear_model import SGDClassifier
+
+# Import StandardScaler — its partial_fit keeps running feature means and variances
+from sklearn.preprocessing import StandardScaler
+
+# Import the explicit CSV dtypes and the compact artifact writer
+from src.load_data import COLUMN_DTYPES
+from src.linear_scorer import save_linear_artifact
+
+# Checkpoints are written as models/sgd_model_v0001.pkl, sgd_model_v0002.pkl, ...
+CHECKPOINT_PREFIX = 'sgd_model_v'
+_CHECKPOINT_PATTERN = re.compile(rf'^{CHECKPOINT_PREFIX}(\d+)\.pkl$')
+
+
+class _BoundedReader:
+    """
+    File-like view of a byte range, so pandas never reads a half-appended last line.
+
+    Parameters:
+    file: Binary file object positioned at the start of the range.
+    limit (int): Number of bytes that may be read.
+    """
+
+    def __init__(self, file, limit):
+        self.file = file
+        self.remaining = limit
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def __iter__(self):
+        # pandas checks for iterability to recognise file-like objects
+        return self
+
+    def __next__(self):
+        raise StopIteration
+
+
+def latest_checkpoint(directory):
+    """
+    Find the newest versioned checkpoint in a directory.
+
+    Parameters:
+    directory (str): Directory holding the checkpoints.
+
+    Returns:
+    Tuple: (version, path) of the newest checkpoint, or (0, None) if there is none.
+    """
+
+    if not os.path.isdir(directory):
+        return 0, None
+    versions = [int(match.group(1)) for match in map(_CHECKPOINT_PATTERN.match, os.listdir(directory)) if match]
+    if not versions:
+        return 0, None
+    version = max(versions)
+    return version, os.path.join(directory, f"{CHECKPOINT_PREFIX}{version:04d}.pkl")
+
+
+def load_checkpoint(directory):
+    """
+    Load the newest checkpoint, or start a fresh state if there is none.
+
+    Parameters:
+    directory (str): Directory holding the checkpoints.
+
+    Returns:
+    dict: Checkpoint state with the model, scaler, stream offset and class counts.
+    """
+
+    version, path = latest_checkpoint(directory)
+    if path is None:
+        return {
+            'version': 0,
+            'model': SGDClassifier(loss='log_loss', alpha=1e-4, random_state=42),
+            'scaler': StandardScaler(),
+            'columns': None,
+            'byte_offset': 0,
+            'rows_seen': 0,
+            'class_counts': np.zeros(2, dtype=np.int64),
+        }
+    with open(path, 'rb') as file:
+        return pickle.load(file)
+
+
+def iter_appended_rows(data_path, byte_offset, columns=None, chunksize=100_000):
+    """
+    Stream the CSV rows appended after a byte offset.
+
+    Only complete lines present when the call starts are read. The offset
+    to resume from next time is returned once the generator is exhausted.
+
+    Parameters:
+    data_path (str): Path to the append-only transactions CSV.
+    byte_offset (int): Offset just past the last row already consumed (0 for none).
+    columns (list, optional): Column names; read from the header when omitted.
+    chunksize (int): Rows per yielded DataFrame.
+
+    Yields:
+    DataFrame: Chunks of new rows.
+
+    Returns:
+    Tuple: (columns, new byte offset), as the generator's return value.
+    """
+
+    # Let pandas parse the header, since the Kaggle export quotes every column name
+    if columns is None:
+        columns = pd.read_csv(data_path, nrows=0).columns.tolist()
+
+    with open(data_path, 'rb') as file:
+        header = file.readline()
+
+        # Stop at the last newline present now, ignoring a line that is still being appended
+        file.seek(0, os.SEEK_END)
+        end = file.tell()
+        while end > 0:
+            file.seek(end - 1)
+            if file.read(1) == b'\n':
+                break
+            end -= 1
+
+        start = max(byte_offset, len(header))
+        if end <= start:
+            return columns, max(start, byte_offset)
+
+        file.seek(start)
+        reader = pd.read_csv(_BoundedReader(file, end - start), header=None, names=columns,
+                             dtype=COLUMN_DTYPES, chunksize=chunksize)
+        for chunk in reader:
+            yield chunk
+
+    return columns, end
+
+
+def save_checkpoint(state, directory):
+    """
+    Write the state as the next versioned checkpoint, atomically.
+
+    Parameters:
+    state (dict): Checkpoint state from load_checkpoint, after training.
+    directory (str): Directory holding the checkpoints.
+
+    Returns:
+    str: Path of the written checkpoint.
+    """
+
+    os.makedirs(directory, exist_ok=True)
+    version, _ = latest_checkpoint(directory)
+    state['version'] = version + 1
+    path = os.path.join(directory, f"{CHECKPOINT_PREFIX}{state['version']:04d}.pkl")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as file:
+        pickle.dump(state, file)
+    os.replace(tmp_path, path)
+    return path
+
+
+def export_for_serving(state, file_path):
+    """
+    Fold the running standardisation into the SGD weights and write a LinearScorer artifact.
+
+    Parameters:
+    state (dict): Trained checkpoint state.
+    file_path (str): Destination .npz path.
+    """
+
+    # sigmoid(w . (x - mean) / scale + b) == sigmoid((w / scale) . x + b - w . mean / scale)
+    scaler, model = state['scaler'], state['model']
+    coef = model.coef_.ravel() / scaler.scale_
+    intercept = model.intercept_[0] - np.dot(coef, scaler.mean_)
+    save_linear_artifact(coef, intercept, [c for c in state['columns'] if c != 'Class'], file_path)
+
+
+def train_incremental(data_path, directory='models', chunksize=100_000):
+    """
+    Fold transactions appended since the last checkpoint into the SGD logistic model.
+
+    Instead of downsampling, each chunk is weighted with running class-balance
+    weights computed from all labels seen so far, so the rare fraud class keeps
+    the same total weight as the majority class.
+
+    Parameters:
+    data_path (str): Path to the append-only transactions CSV.
+    directory (str): Directory holding the versioned checkpoints.
+    chunksize (int): Rows per partial_fit call.
+
+    Returns:
+    dict: The updated checkpoint state (unchanged if there were no new rows).
+    """
+
+    state = load_checkpoint(directory)
+    model, scaler = state['model'], state['scaler']
+    offset, columns = state['byte_offset'], state['columns']
+
+    rows = iter_appended_rows(data_path, state['byte_offset'], state['columns'], chunksize)
+    new_rows = 0
+    while True:
+        try:
+            chunk = next(rows)
+        except StopIteration as done:
+            state['columns'], state['byte_offset'] = done.value
+            break
+
+        X = chunk.drop(columns='Class').to_numpy(dtype=np.float64)
+        y = chunk['Class'].to_numpy()
+
+        # Running class-balance weights: n_total / (2 * n_class), over every label seen so far
+        state['class_counts'] += np.bincount(y, minlength=2)[:2]
+        counts = np.maximum(state['class_counts'], 1)
+        weights = counts.sum() / (2.0 * counts)
+
+        # Update the running standardisation, then take one SGD pass over the chunk
+        scaler.partial_fit(X)
+        model.partial_fit(scaler.transform(X), y, classes=np.array([0, 1]), sample_weight=weights[y])
+        new_rows += len(chunk)
+
+    if new_rows == 0:
+        # Still record a moved offset or newly read columns, e.g. a header-only file on the first run
+        if (state['byte_offset'], state['columns']) != (offset, columns):
+            save_checkpoint(state, directory)
+        print("No new transactions since the last checkpoint")
+        return state
+
+    state['rows_seen'] += new_rows
+    path = save_checkpoint(state, directory)
+    print(f"Folded {new_rows} new transactions into checkpoint {path}")
+    return state
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental SGD training on newly appended transactions")
+    parser.add_argument("--data", default=os.path.join('data', 'raw_data', 'creditcard.csv'))
+    parser.add_argument("--models", default='models')
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--export", action='store_true',
+                        help="also write models/sgd_model.npz for the NumPy scorer")
+    args = parser.parse_args()
+
+    state = train_incremental(args.data, args.models, args.chunksize)
+    if args.export and state['rows_seen']:
+        export_for_serving(state, os.path.join(args.models, 'sgd_model.npz'))
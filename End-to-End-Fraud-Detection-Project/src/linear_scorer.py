@@ -0,0 +1,159 @@
+# Import json — an optional feature transform is stored in the artifact as a JSON string
+import json
+
+# Import os — the artifact is written to a temporary file and swapped in atomically
+import os
+
+# Import numpy — the only dependency of the compact scorer, so serving does not need scikit-learn
+import numpy as np
+
+# Import the NumPy-only feature transform, so artifacts with a transform load without pandas or scikit-learn
+from src.transform import FeatureTransform
+
+
+def save_linear_artifact(coef, intercept, feature_names, file_path, transform_state=None):
+    """
+    Write coefficients, intercept and feature order as a compact NumPy artifact.
+
+    Parameters:
+    coef (array): Coefficient vector, one weight per feature.
+    intercept (float): Intercept term.
+    feature_names (list): Feature order of the raw inputs.
+    file_path (str): Destination .npz path.
+    transform_state (dict, optional): FeatureTransformer state applied to the inputs before the coefficients.
+    """
+
+    arrays = {
+        'coef': np.asarray(coef, dtype=np.float64).ravel(),
+        'intercept': np.asarray(intercept, dtype=np.float64).ravel()[:1],
+        'feature_names': np.asarray(feature_names, dtype=str),
+    }
+    if transform_state is not None:
+        arrays['transform'] = np.asarray(json.dumps(transform_state))
+
+    # Only plain arrays are stored, so loading never needs pickle
+    # Write to a temporary file and rename, so readers never see a partial artifact
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'wb') as file:
+        np.savez(file, **arrays)
+    os.replace(tmp_path, file_path)
+
+
+def export_linear_model(model, file_path, feature_names=None, transform_state=None):
+    """
+    Export a fitted binary linear classifier as a compact NumPy artifact.
+
+    Parameters:
+    model: Fitted binary classifier with coef_ and intercept_ (e.g. LogisticRegression).
+    file_path (str): Destination .npz path.
+    feature_names (list, optional): Feature order; defaults to the model's feature_names_in_.
+    transform_state (dict, optional): FeatureTransformer state applied to the inputs before the coefficients.
+    """
+
+    if feature_names is None:
+        feature_names = getattr(model, 'feature_names_in_', None)
+    if feature_names is None:
+        feature_names = [f'x{i}' for i in range(model.coef_.shape[1])]
+
+    save_linear_artifact(model.coef_, model.intercept_, feature_names, file_path, transform_state)
+
+
+class LinearScorer:
+    """
+    Zero-dependency logistic scorer computing sigmoid(X @ w + b) in NumPy.
+
+    Parameters:
+    coef (array): Coefficient vector, one weight per (transformed) feature.
+    intercept (float): Intercept term.
+    feature_names (list): Feature order of the raw inputs.
+    dtype: np.float64 for exact parity with scikit-learn, np.float32 for speed.
+    transform (FeatureTransform, optional): Fitted feature transform applied before the coefficients.
+    """
+
+    def __init__(self, coef, intercept, feature_names, dtype=np.float64, transform=None):
+        self.dtype = np.dtype(dtype)
+        self.coef = np.ascontiguousarray(coef, dtype=self.dtype)
+        self.intercept = self.dtype.type(intercept)
+        self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+        self.n_features_in_ = len(self.feature_names_in_)
+        self.transform = transform
+
+    @classmethod
+    def load(cls, file_path, dtype=np.float64):
+        """
+        Load a scorer from an artifact written by export_linear_model.
+
+        Parameters:
+        file_path (str): Path to the .npz artifact.
+        dtype: Computation dtype of the scorer.
+
+        Returns:
+        LinearScorer: The loaded scorer.
+        """
+
+        with np.load(file_path, allow_pickle=False) as artifact:
+            transform = None
+            if 'transform' in artifact.files:
+                transform = FeatureTransform.from_state(json.loads(artifact['transform'].item()))
+            return cls(artifact['coef'], artifact['intercept'][0],
+                       artifact['feature_names'].tolist(), dtype=dtype, transform=transform)
+
+    def score(self, X, out=None):
+        """
+        Compute fraud probabilities.
+
+        Parameters:
+        X (ndarray): Raw feature matrix of shape (n_rows, n_features) in feature order.
+        out (ndarray, optional): Preallocated 1D buffer of length n_rows and the scorer's dtype.
+
+        Returns:
+        ndarray: Probability of the positive class for each row (the 'out' buffer if given).
+        """
+
+        if self.transform is not None:
+            X = self.transform.transform(np.asarray(X, dtype=np.float64))
+        X = np.asarray(X, dtype=self.dtype)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if out is None:
+            out = np.empty(X.shape[0], dtype=self.dtype)
+
+        # Linear term straight into the output buffer, then an in-place sigmoid: 1 / (1 + exp(-z))
+        np.dot(X, self.coef, out=out)
+        out += self.intercept
+        np.negative(out, out=out)
+
+        # exp overflows to inf for very negative scores, which correctly maps to probability 0
+        with np.errstate(over='ignore'):
+            np.exp(out, out=out)
+        out += 1
+        np.reciprocal(out, out=out)
+        return out
+
+    def predict_proba(self, X):
+        """
+        Class probabilities in the scikit-learn layout.
+
+        Parameters:
+        X (ndarray): Feature matrix of shape (n_rows, n_features).
+
+        Returns:
+        ndarray: Array of shape (n_rows, 2) with P(non-fraud) and P(fraud).
+        """
+
+        positive = self.score(X)
+        return np.column_stack([1 - positive, positive])
+
+    def predict(self, X, threshold=0.5):
+        """
+        Class labels: 1 for fraud and 0 for non-fraud.
+
+        Parameters:
+        X (ndarray): Feature matrix of shape (n_rows, n_features).
+        threshold (float): Probability at or above which a row is flagged as fraud.
+
+        Returns:
+        ndarray: Predicted labels.
+        """
+
+        return (self.score(X) >= threshold).astype(np.int8)
@@ -0,0 +1,66 @@
+# Import bisect — finds the histogram bucket for an observation in O(log buckets)
+import bisect
+
+# Import multiprocessing — bucket counters live in shared memory so every worker process reports into one histogram
+import multiprocessing
+
+# Default latency buckets in seconds, tuned around a sub-10 ms decision budget
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+class LatencyHistogram:
+    """
+    Cumulative latency histogram shared between forked worker processes.
+
+    Counters are allocated in shared memory, so a histogram created before
+    forking aggregates observations from every worker and can be rendered in
+    the Prometheus text exposition format by any of them.
+
+    Parameters:
+    name (str): Metric name used in the exposition output.
+    buckets (tuple): Upper bounds of the buckets, in seconds, in increasing order.
+    """
+
+    def __init__(self, name, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.buckets = tuple(buckets)
+
+        # One counter per bucket plus the implicit +Inf bucket, and a running sum
+        self._counts = multiprocessing.Array('Q', len(self.buckets) + 1)
+        self._sum = multiprocessing.Value('d', 0.0, lock=False)
+
+    def observe(self, seconds):
+        """
+        Record one latency observation.
+
+        Parameters:
+        seconds (float): Observed latency in seconds.
+        """
+
+        idx = bisect.bisect_left(self.buckets, seconds)
+        with self._counts.get_lock():
+            self._counts[idx] += 1
+            self._sum.value += seconds
+
+    def render(self):
+        """
+        Render the histogram in the Prometheus text exposition format.
+
+        Returns:
+        str: The exposition lines for this metric.
+        """
+
+        with self._counts.get_lock():
+            counts = list(self._counts)
+            total_sum = self._sum.value
+
+        lines = [f"# TYPE {self.name} histogram"]
+        cumulative = 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+        cumulative += counts[-1]
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {cumulative}')
+        lines.append(f"{self.name}_sum {total_sum}")
+        lines.append(f"{self.name}_count {cumulative}")
+        return "\n".join(lines) + "\n"
@@ -6,14 +6,6 @@ import os
 # Commonly used for loading datasets, handling DataFrames, and performing preprocessing tasks
 import pandas as pd
 
-# Import seaborn — a statistical data visualization library built on top of matplotlib
-# Provides high-level functions for creating attractive and informative plots (e.g., barplots, heatmaps)
-import seaborn as sns
-
-# Import matplotlib.pyplot — the core plotting interface of matplotlib
-# Used for customizing plots, setting figure size, labels, titles, and displaying visualizations
-import matplotlib.pyplot as plt
-
 # Import train_test_split — a utility for splitting datasets into training and testing sets
 # Helps evaluate model performance on unseen data
 from sklearn.model_selection import train_test_split
@@ -22,18 +14,73 @@ from sklearn.model_selection import train_test_split
 # Handy for handling class imbalance by replicating or reducing samples
 from sklearn.utils import resample
 
-# Import classification_report and confusion_matrix — tools for evaluating classification models
-# Provide metrics like precision, recall, F1-score, and a matrix of predicted vs actual labels
-from sklearn.metrics import classification_report, confusion_matrix
-
 # Import LogisticRegression — a linear model for binary classification
 # Often used as a baseline model for fraud detection and other classification tasks
 from sklearn.linear_model import LogisticRegression
 
+# Import StratifiedKFold and clone — k-fold splits and fresh per-fold copies of an estimator
+from sklearn.model_selection import StratifiedKFold
+from sklearn.base import clone
+
+# Import the per-fold metrics reported by cross_validate_model
+from sklearn.metrics import roc_auc_score, precision_score, recall_score, f1_score
+
+# Import shared_memory — lets fold workers read one copy of the feature matrix in place
+from multiprocessing import shared_memory
+
+# Import numpy — index arithmetic for the in-fold downsampling
+import numpy as np
+
+# Import RandomForestClassifier — a tree ensemble searched alongside logistic regression
+from sklearn.ensemble import RandomForestClassifier
+
+# Import the parameter grid helpers — expand a search space into candidate hyperparameters
+from sklearn.model_selection import ParameterGrid, ParameterSampler
+
+# Import average_precision_score — PR-AUC, the selection metric for imbalanced fraud data
+from sklearn.metrics import average_precision_score
+
+# Import XGBClassifier — gradient-boosted trees in CPU 'hist' mode; optional dependency
+try:
+    from xgboost import XGBClassifier
+except ImportError:
+    XGBClassifier = None
+
+# Import ProcessPoolExecutor — fits search candidates in parallel, one core each
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Import time — measures fit time per candidate
+import time
+
 # Import pickle — a Python module for serializing and saving objects
 # Useful for saving trained models to disk and loading them later for inference or reuse
 import pickle
 
+# Import the cached loader — reuses the columnar copy of the CSV instead of re-parsing text
+from src.load_data import load_cached
+
+# Import the feature schema — order, dtypes and defaults saved next to the model for serving
+from src.schema import FeatureSchema, schema_path
+
+# Import the threshold selection — picks the cheapest operating point on held-out data
+from src.threshold import choose_threshold, save_threshold
+
+# Import the drift baseline — bin edges and fractions the service compares live traffic against
+from src.monitoring import build_baseline, save_baseline
+
+# Import the compact artifact exporter — lets serving score with NumPy alone
+from src.linear_scorer import export_linear_model
+
+# Import Pipeline — chains the feature transformer and the classifier into one fitted model
+from sklearn.pipeline import Pipeline
+
+# Import the feature engineering — stateless transforms plus robust scaling fitted on training data
+from src.feat_eng import FeatureTransformer
+
+# Import the headless reporting helpers — JSON numbers, Agg rendering and a background render pool
+from src.report import (ReportRenderer, render_heatmap,
+                        classification_report_report, confusion_matrix_report)
+
 def load_processed_data(file_path):
     """
     Load the processed data from a CSV file.
@@ -45,9 +92,9 @@ def load_processed_data(file_path):
     DataFrame: Loaded DataFrame.
     """
 
-    # Read the CSV file from the specified path using pandas
-    # This loads the processed data into a DataFrame for analysis or modeling
-    return pd.read_csv(file_path)
+    # Read the CSV file from the specified path with explicit dtypes
+    # Later runs memory-map the columnar cache instead of parsing the text again
+    return load_cached(file_path)
 
 def prepare_training_data(df):
     """
@@ -102,21 +149,169 @@ def prepare_training_data(df):
     # Return the downsampled training set and the original test set
     return X_train_downsampled, y_train_downsampled, X_test_orig, y_test_orig
 
-def train_logistic_regression(X_train, y_train):
+def _downsample_indices(y, random_state=42):
+    """
+    Indices of a balanced subset: every fraud row plus an equal number of non-fraud rows.
+
+    Parameters:
+    y (ndarray): Binary target array.
+    random_state (int): Seed for the majority-class sample.
+
+    Returns:
+    ndarray: Sorted row indices of the balanced subset.
+    """
+
+    minority = np.flatnonzero(y == 1)
+    majority = np.flatnonzero(y != 1)
+    rng = np.random.default_rng(random_state)
+    sampled = rng.choice(majority, size=min(len(minority), len(majority)), replace=False)
+    return np.sort(np.concatenate([sampled, minority]))
+
+def _evaluate_fold(X_spec, columns, y_spec, fold, n_splits, estimator, random_state):
+    """
+    Downsample, fit and evaluate one cross-validation fold from shared memory.
+
+    Parameters:
+    X_spec (tuple): (shared memory name, shape, dtype) of the feature matrix.
+    columns (list): Feature names of the matrix columns, for estimators that select columns by name.
+    y_spec (tuple): (shared memory name, shape, dtype) of the target.
+    fold (int): Index of the fold to evaluate.
+    n_splits (int): Total number of folds.
+    estimator: Unfitted estimator template, cloned for this fold.
+    random_state (int): Seed shared by the fold split and the downsampling.
+
+    Returns:
+    dict: Metrics and timings for this fold.
+    """
+
+    # Attach to the parent's arrays without copying them
+    X_shm = shared_memory.SharedMemory(name=X_spec[0])
+    y_shm = shared_memory.SharedMemory(name=y_spec[0])
+    try:
+        X = np.ndarray(X_spec[1], dtype=X_spec[2], buffer=X_shm.buf)
+        y = np.ndarray(y_spec[1], dtype=y_spec[2], buffer=y_shm.buf)
+
+        # Recompute the (deterministic) split here so fold indices never need to be pickled
+        skf = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+        train_idx, test_idx = list(skf.split(np.zeros(len(y)), y))[fold]
+
+        # Downsample inside the fold, so the test fold keeps the real class imbalance
+        train_idx = train_idx[_downsample_indices(y[train_idx], random_state)]
+
+        # Fold rows are copied by the fancy indexing anyway; wrap them with their names for the FeatureTransformer
+        start = time.perf_counter()
+        model = clone(estimator)
+        model.fit(pd.DataFrame(X[train_idx], columns=columns), y[train_idx])
+        fit_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        y_score = model.predict_proba(pd.DataFrame(X[test_idx], columns=columns))[:, 1]
+        predict_seconds = time.perf_counter() - start
+
+        y_test = y[test_idx]
+        y_pred = (y_score >= 0.5).astype(np.int8)
+        return {
+            'fold': fold,
+            'train_rows': len(train_idx),
+            'test_rows': len(test_idx),
+            'pr_auc': average_precision_score(y_test, y_score),
+            'roc_auc': roc_auc_score(y_test, y_score),
+            'precision': precision_score(y_test, y_pred, zero_division=0),
+            'recall': recall_score(y_test, y_pred, zero_division=0),
+            'f1': f1_score(y_test, y_pred, zero_division=0),
+            'fit_seconds': fit_seconds,
+            'predict_seconds': predict_seconds,
+        }
+    finally:
+        X_shm.close()
+        y_shm.close()
+
+def _to_shared_memory(array):
+    # Copy an array into a new shared memory block and describe it for the workers
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+def cross_validate_model(df, n_splits=5, estimator=None, n_jobs=None, random_state=42):
+    """
+    Stratified k-fold cross-validation with per-fold downsampling, run in parallel.
+
+    The feature matrix is placed in shared memory once and every worker process
+    reads it in place, so memory does not grow with the number of folds.
+
+    Parameters:
+    df (DataFrame): The input DataFrame with features and target.
+    n_splits (int): Number of folds.
+    estimator: Unfitted estimator to evaluate; defaults to the FeatureTransformer and
+               LogisticRegression pipeline that train_logistic_regression fits.
+    n_jobs (int, optional): Number of worker processes; defaults to one per fold, capped at the core count.
+    random_state (int): Seed for the fold split and the downsampling.
+
+    Returns:
+    Tuple: DataFrame of per-fold metrics and timings, and a DataFrame with their mean and std.
+    """
+
+    # Evaluate the model that is actually trained and served, feature engineering included
+    if estimator is None:
+        estimator = build_logistic_regression(FeatureTransformer())
+
+    # One contiguous copy of the features and target, shared by every fold
+    X = df.drop(columns='Class')
+    X_shm, X_spec = _to_shared_memory(np.ascontiguousarray(X.to_numpy()))
+    y_shm, y_spec = _to_shared_memory(np.ascontiguousarray(df['Class'].to_numpy()))
+    try:
+        n_workers = min(n_splits, n_jobs or os.cpu_count())
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            futures = [executor.submit(_evaluate_fold, X_spec, list(X.columns), y_spec, fold, n_splits,
+                                       estimator, random_state) for fold in range(n_splits)]
+            fold_results = [future.result() for future in futures]
+    finally:
+        X_shm.close()
+        X_shm.unlink()
+        y_shm.close()
+        y_shm.unlink()
+
+    # Per-fold table plus the mean and standard deviation of every metric
+    folds_df = pd.DataFrame(fold_results).set_index('fold')
+    summary_df = folds_df.agg(['mean', 'std']).transpose()
+    return folds_df, summary_df
+
+def build_logistic_regression(feature_transformer=None):
+    """
+    Build the unfitted logistic regression model, with optional feature engineering ahead of it.
+
+    Parameters:
+    feature_transformer (FeatureTransformer, optional): Feature engineering step fitted ahead of the classifier.
+
+    Returns:
+    LogisticRegression or Pipeline: Unfitted model (a Pipeline when a feature transformer is given).
+    """
+
+    # Initialize a logistic regression model using default hyperparameters
+    # Logistic regression is a linear model commonly used for binary classification tasks like fraud detection
+    log_reg = LogisticRegression()
+
+    # Fit the feature engineering on the training data only, as the first step of one pipeline
+    # The fitted scaling then travels with the model, so serving applies exactly the same transform
+    if feature_transformer is not None:
+        log_reg = Pipeline([('features', feature_transformer), ('classifier', log_reg)])
+    return log_reg
+
+def train_logistic_regression(X_train, y_train, feature_transformer=None):
     """
     Train a logistic regression model.
     
     Parameters:
     X_train (DataFrame): Training features.
     y_train (Series): Training target.
+    feature_transformer (FeatureTransformer, optional): Feature engineering step fitted ahead of the classifier.
     
     Returns:
-    LogisticRegression: Trained logistic regression model.
+    LogisticRegression or Pipeline: Trained model (a Pipeline when a feature transformer is given).
     """
 
-    # Initialize a logistic regression model using default hyperparameters
-    # Logistic regression is a linear model commonly used for binary classification tasks like fraud detection
-    log_reg = LogisticRegression()
+    # The same model cross_validate_model evaluates by default
+    log_reg = build_logistic_regression(feature_transformer)
 
     # Fit the model to the training data
     # This step learns the relationship between features and the target variable
@@ -125,7 +320,178 @@ def train_logistic_regression(X_train, y_train):
     # Return the trained model for evaluation or prediction
     return log_reg
 
-def save_model(model, directory, filename):
+# Default search space for search_models — one grid of hyperparameters per model family
+# Every family is fitted with a single thread; parallelism comes from the process pool instead
+SEARCH_SPACE = {
+    'logistic_regression': {
+        'solver': ['lbfgs', 'liblinear'],
+        'C': [0.01, 0.1, 1.0, 10.0],
+    },
+    'xgboost': {
+        'max_depth': [3, 5, 7],
+        'learning_rate': [0.05, 0.1, 0.3],
+        'subsample': [0.8, 1.0],
+    },
+    'random_forest': {
+        'max_depth': [None, 8, 16],
+        'min_samples_leaf': [1, 5],
+        'max_features': ['sqrt', 0.5],
+    },
+}
+
+# Trees added per round when growing a random forest with early stopping
+_FOREST_STEP = 50
+
+# Rounds without a PR-AUC improvement before a forest or booster stops growing
+_EARLY_STOPPING_ROUNDS = 3
+
+# Training data of the current search, installed once per worker process by _init_search_worker
+_search_data = {}
+
+def _init_search_worker(X_train, y_train, X_val, y_val):
+    # Runs once in every worker so candidates do not re-pickle the training data per task
+    _search_data.update(X_train=X_train, y_train=y_train, X_val=X_val, y_val=y_val)
+
+def _fit_candidate(family, params):
+    """
+    Fit one candidate model and score it by PR-AUC on the validation set.
+
+    Parameters:
+    family (str): Model family name from SEARCH_SPACE.
+    params (dict): Hyperparameters for this candidate.
+
+    Returns:
+    dict: Family, parameters, validation PR-AUC, fit time and the fitted model.
+    """
+
+    X_train, y_train = _search_data['X_train'], _search_data['y_train']
+    X_val, y_val = _search_data['X_val'], _search_data['y_val']
+    start = time.perf_counter()
+
+    if family == 'logistic_regression':
+        model = LogisticRegression(max_iter=1000, **params)
+        model.fit(X_train, y_train)
+
+    elif family == 'xgboost':
+        # CPU 'hist' mode with early stopping on validation PR-AUC
+        model = XGBClassifier(
+            tree_method='hist', n_estimators=1000, n_jobs=1, eval_metric='aucpr',
+            early_stopping_rounds=_EARLY_STOPPING_ROUNDS * 10, random_state=42, **params)
+        model.fit(X_train, y_train, eval_set=[(X_val, y_val)], verbose=False)
+
+    elif family == 'random_forest':
+        # Grow the forest in steps with warm_start and stop once validation PR-AUC stops improving
+        model = RandomForestClassifier(
+            n_estimators=0, warm_start=True, n_jobs=1, random_state=42, **params)
+        best_score, stale_rounds = -1.0, 0
+        while stale_rounds < _EARLY_STOPPING_ROUNDS and model.n_estimators < 1000:
+            model.n_estimators += _FOREST_STEP
+            model.fit(X_train, y_train)
+            score = average_precision_score(y_val, model.predict_proba(X_val)[:, 1])
+            if score > best_score:
+                best_score, stale_rounds = score, 0
+            else:
+                stale_rounds += 1
+
+    else:
+        raise ValueError(f"Unknown model family: {family}")
+
+    fit_seconds = time.perf_counter() - start
+    pr_auc = average_precision_score(y_val, model.predict_proba(X_val)[:, 1])
+    return {'family': family, 'params': params, 'pr_auc': pr_auc,
+            'fit_seconds': fit_seconds, 'model': model}
+
+def search_models(X_train, y_train, X_val=None, y_val=None, search_space=None,
+                  n_iter=None, n_jobs=None, random_state=42):
+    """
+    Run a parallel grid or random search over several model families.
+
+    Candidates are fitted in a process pool, one core each, and the winner is
+    the candidate with the highest PR-AUC (average precision) on the validation set.
+
+    Parameters:
+    X_train (DataFrame): Training features.
+    y_train (Series): Training target.
+    X_val (DataFrame, optional): Validation features; carved out of the training data if omitted.
+    y_val (Series, optional): Validation target.
+    search_space (dict, optional): Family name -> parameter grid; defaults to SEARCH_SPACE.
+    n_iter (int, optional): Random-search budget per family; full grid search if omitted.
+    n_jobs (int, optional): Number of worker processes; defaults to all cores.
+    random_state (int): Seed for the validation split and random search.
+
+    Returns:
+    Tuple: The best fitted model and a DataFrame of every candidate's results.
+    """
+
+    if search_space is None:
+        search_space = SEARCH_SPACE
+
+    # XGBoost is optional — skip its grid when it is not installed
+    if XGBClassifier is None and 'xgboost' in search_space:
+        print("xgboost is not installed; skipping the xgboost search")
+        search_space = {k: v for k, v in search_space.items() if k != 'xgboost'}
+
+    # Hold out a stratified validation set for early stopping and model selection
+    if X_val is None:
+        X_train, X_val, y_train, y_val = train_test_split(
+            X_train, y_train, test_size=0.2, random_state=random_state, stratify=y_train)
+
+    # Expand every family's grid into candidates (or sample n_iter of them)
+    candidates = []
+    for family, grid in search_space.items():
+        if n_iter is None:
+            params_list = ParameterGrid(grid)
+        else:
+            params_list = ParameterSampler(grid, n_iter=n_iter, random_state=random_state)
+        candidates.extend((family, dict(params)) for params in params_list)
+
+    # Fit every candidate in parallel; the data is shipped once per worker, not once per task
+    results = []
+    with ProcessPoolExecutor(max_workers=n_jobs or os.cpu_count(),
+                             initializer=_init_search_worker,
+                             initargs=(X_train, y_train, X_val, y_val)) as executor:
+        futures = [executor.submit(_fit_candidate, family, params) for family, params in candidates]
+        for future in as_completed(futures):
+            result = future.result()
+            print(f"{result['family']} {result['params']}: PR-AUC={result['pr_auc']:.4f} "
+                  f"({result['fit_seconds']:.1f}s)")
+            results.append(result)
+
+    # Pick the winner by validation PR-AUC
+    best = max(results, key=lambda result: result['pr_auc'])
+    print(f"Best model: {best['family']} {best['params']} (PR-AUC={best['pr_auc']:.4f})")
+
+    results_df = pd.DataFrame(results).drop(columns='model').sort_values('pr_auc', ascending=False)
+    return best['model'], results_df.reset_index(drop=True)
+
+def export_model(model, model_filepath):
+    """
+    Export the serving artifact that accompanies a saved model.
+
+    Parameters:
+    model: Trained model.
+    model_filepath (str): Path of the model's pickle file; the artifact is written next to it.
+    """
+
+    # Linear models are also exported as coefficients, intercept and feature order in a .npz file
+    # The serving path loads this with NumPy only, skipping scikit-learn's import and input validation
+    artifact_filepath = os.path.splitext(model_filepath)[0] + '.npz'
+
+    # A feature pipeline is exported as its classifier plus the transformer's fitted state
+    transform_state, feature_names = None, None
+    if isinstance(model, Pipeline) and isinstance(model.steps[0][1], FeatureTransformer):
+        transformer, model = model.steps[0][1], model.steps[-1][1]
+        transform_state, feature_names = transformer.get_state(), transformer.input_features_
+
+    if hasattr(model, 'coef_') and model.coef_.shape[0] == 1:
+        export_linear_model(model, artifact_filepath, feature_names, transform_state)
+        print(f"Compact linear artifact saved to {artifact_filepath}")
+
+    # Any other model must not be shadowed by a stale artifact from an earlier linear model
+    elif os.path.exists(artifact_filepath):
+        os.remove(artifact_filepath)
+
+def save_model(model, directory, filename, export=True, schema=None):
     """
     Save the trained model to a pickle file.
     
@@ -133,6 +499,8 @@ def save_model(model, directory, filename):
     model: Trained model to save.
     directory (str): Directory to save the model.
     filename (str): Name of the pickle file.
+    export (bool): Whether to also write the serving artifact (see export_model).
+    schema (FeatureSchema, optional): Training feature schema, saved as <name>.schema.json.
     """
 
     # Check if the target directory exists; if not, create it
@@ -143,17 +511,32 @@ def save_model(model, directory, filename):
     # Construct the full file path by joining the directory and filename
     model_filepath = os.path.join(directory, filename)
 
-    # Open the file in binary write mode and serialize the model using pickle
-    # This saves the trained model object so it can be loaded later for inference or reuse
-    with open(model_filepath, 'wb') as file:
+    # Serialize the model to a temporary file, then atomically rename it into place
+    # Running apps hot-reload on mtime changes, so they must never observe a half-written file
+    tmp_filepath = f"{model_filepath}.tmp"
+    with open(tmp_filepath, 'wb') as file:
         pickle.dump(model, file)
 
+    # Serving prefers the compact artifact, so drop the previous model's one before the new pickle lands
+    # Until the new artifact is exported, running apps then serve the new pickle instead of the old model
+    artifact_filepath = os.path.splitext(model_filepath)[0] + '.npz'
+    if os.path.exists(artifact_filepath):
+        os.remove(artifact_filepath)
+    os.replace(tmp_filepath, model_filepath)
+
     # Print a confirmation message with the full save path
     print(f"Model saved to {model_filepath}")
 
+    # Save the input layout alongside, so serving can map any input onto the training columns
+    if schema is not None:
+        schema.save(schema_path(model_filepath))
+
+    if export:
+        export_model(model, model_filepath)
+
 def save_classification_report(y_true, y_pred, file_path):
     """
-    Save the classification report as an image.
+    Save the classification report as an image, with its numbers as JSON.
     
     Parameters:
     y_true (Series): True target values.
@@ -161,98 +544,92 @@ def save_classification_report(y_true, y_pred, file_path):
     file_path (str): Path to save the classification report image.
     """
 
-    # Generate a classification report as a dictionary
-    # Includes precision, recall, f1-score, and support for each class
-    report = classification_report(y_true, y_pred, output_dict=True)
-
-    # Convert the report dictionary into a pandas DataFrame for easier plotting
-    # Transpose to make metrics the columns and classes the rows
-    report_df = pd.DataFrame(report).transpose()
-
-    # Set the figure size for the heatmap
-    plt.figure(figsize=(10, 6))
-
-    # Plot a heatmap of the classification metrics (excluding 'accuracy' row and 'support' column)
-    # 'annot=True' displays metric values in each cell
-    # 'cmap="Blues"' sets the color palette
-    # 'fmt=".2f"' formats the numbers to two decimal places
-    sns.heatmap(report_df.iloc[:-1, :-1], annot=True, cmap='Blues', fmt='.2f')
-
-    # Add a title to the heatmap for clarity
-    plt.title('Classification Report')
-
-    # Save the heatmap image to the specified file path
-    plt.savefig(file_path)
+    # Generate the classification report (precision, recall, f1-score per class), write it as JSON,
+    # then draw it as a heatmap with the non-interactive backend and close the figure
+    render_heatmap(**classification_report_report(y_true, y_pred, file_path))
 
     # Print confirmation message with the save location
     print(f"Classification report saved to {file_path}")
 
-def plot_confusion_matrix(y_true, y_pred):
+def plot_confusion_matrix(y_true, y_pred, file_path='artifacts/confusion_matrix.jpeg'):
     """
-    Plot the confusion matrix.
+    Plot the confusion matrix and save it as an image, with its counts as JSON.
     
     Parameters:
     y_true (Series): True target values.
     y_pred (Series): Predicted target values.
+    file_path (str): Path to save the confusion matrix image.
     """
 
-    # Generate the confusion matrix from true and predicted labels
-    # This matrix summarizes correct and incorrect predictions across each class
-    conf_matrix = confusion_matrix(y_true, y_pred)
-
-    # Set the figure size to 8x6 inches for a clear and readable layout
-    plt.figure(figsize=(8, 6))
-
-    # Plot the confusion matrix as a heatmap using seaborn
-    # 'annot=True' displays the count in each cell
-    # 'fmt="d"' formats the annotations as integers
-    # 'cmap="Blues"' sets the color palette
-    # 'xticklabels' and 'yticklabels' label the axes with class names
-    sns.heatmap(conf_matrix, annot=True, fmt='d', cmap='Blues', 
-                xticklabels=['Non-Fraud', 'Fraud'], 
-                yticklabels=['Non-Fraud', 'Fraud'])
-
-    # Label the x-axis as 'Predicted' and y-axis as 'Actual'
-    plt.xlabel('Predicted')
-    plt.ylabel('Actual')
-
-    # Add a title to the plot for context
-    plt.title('Confusion Matrix')
-
-    # Display the plot in the notebook or script output
-    plt.show()
-
-# Example usage:
-
-# Load the processed dataset from disk
-# This file should contain balanced or cleaned data ready for modeling
-processed_data_path = 'data/processed/processed_data.csv'
-df = load_processed_data(processed_data_path)
-print("Data Loaded!")
-
-# Split the data into training and testing sets
-# Training data is downsampled to balance fraud and non-fraud classes
-X_train_downsampled, y_train_downsampled, X_test_orig, y_test_orig = prepare_training_data(df)
-
-# Train a logistic regression model using the downsampled training data
-# This step fits the model to learn patterns that distinguish fraud from non-fraud
-log_reg = train_logistic_regression(X_train_downsampled, y_train_downsampled)
-print("Model Trained!")
-
-# Use the trained model to make predictions on the original (imbalanced) test set
-# This evaluates how well the model generalizes to unseen data
-y_pred = log_reg.predict(X_test_orig)
-
-# Visualize the confusion matrix to assess prediction accuracy
-# Helps identify false positives and false negatives — critical in fraud detection
-plot_confusion_matrix(y_test_orig, y_pred)
-
-# Save the trained model to disk for future reuse or deployment
-# The model is serialized as a .pkl file in the 'models' directory
-save_model(log_reg, 'models', 'logistic_regression_model.pkl')
-
-# Generate and save a visual classification report as a heatmap
-# This includes precision, recall, and F1-score for each class
-classification_report_path = 'artifacts/classification_report.jpeg'
-save_classification_report(y_test_orig, y_pred, classification_report_path)
-print("Report Saved!")
+    # Generate the confusion matrix, write it as JSON, then save the figure instead of showing it
+    # plt.show() would block locally and do nothing in CI
+    render_heatmap(**confusion_matrix_report(y_true, y_pred, file_path))
+
+    # Print confirmation message with the save location
+    print(f"Confusion matrix saved to {file_path}")
+
+if __name__ == "__main__":
+    # Example usage:
+
+    # Load the processed dataset from disk
+    # This file should contain balanced or cleaned data ready for modeling
+    processed_data_path = 'data/processed/processed_data.csv'
+    df = load_processed_data(processed_data_path)
+    print("Data Loaded!")
+
+    # Split the data into training and testing sets
+    # Training data is downsampled to balance fraud and non-fraud classes
+    X_train_downsampled, y_train_downsampled, X_test_orig, y_test_orig = prepare_training_data(df)
+
+    # Train a logistic regression model using the downsampled training data
+    # This step fits the model to learn patterns that distinguish fraud from non-fraud
+    # The engineered features (log amount, time of day, robust scaling) are fitted in the same pipeline
+    log_reg = train_logistic_regression(X_train_downsampled, y_train_downsampled,
+                                        feature_transformer=FeatureTransformer())
+    print("Model Trained!")
+
+    # Optionally estimate the variance of the metrics with stratified k-fold cross-validation
+    # Set FRAUD_CV_FOLDS to the number of folds; folds run in parallel on one shared copy of the data
+    if os.environ.get('FRAUD_CV_FOLDS'):
+        cv_folds, cv_summary = cross_validate_model(df, n_splits=int(os.environ['FRAUD_CV_FOLDS']))
+        cv_folds.to_csv('artifacts/cv_folds.csv')
+        print(cv_summary)
+
+    # Optionally search LR, XGBoost and random forests in parallel and keep the winner instead
+    # Set FRAUD_MODEL_SEARCH=1 to enable; the winner is chosen by validation PR-AUC
+    if os.environ.get('FRAUD_MODEL_SEARCH') == '1':
+        log_reg, search_results = search_models(X_train_downsampled, y_train_downsampled)
+        search_results.to_csv('artifacts/model_search.csv', index=False)
+        print("Model Search Complete!")
+
+    # Choose the operating threshold on the original (imbalanced) test set
+    # A false alert costs one manual review, a missed fraud its transaction amount
+    test_scores = log_reg.predict_proba(X_test_orig)[:, 1]
+    decision, _ = choose_threshold(y_test_orig, test_scores, cost_fn=X_test_orig['Amount'].to_numpy())
+    print(f"Operating threshold: {decision['threshold']:.4f}")
+
+    # Use the trained model to make predictions on the original (imbalanced) test set
+    # This evaluates how well the model generalizes to unseen data, at the chosen threshold
+    y_pred = (test_scores >= decision['threshold']).astype(int)
+
+    # Render the evaluation figures in background processes while the model is saved
+    # The raw numbers are written as JSON next to each figure straight away
+    with ReportRenderer() as renderer:
+        # Visualize the confusion matrix to assess prediction accuracy
+        # Helps identify false positives and false negatives — critical in fraud detection
+        renderer.confusion_matrix(y_test_orig, y_pred, 'artifacts/confusion_matrix.jpeg')
+
+        # Generate and save a visual classification report as a heatmap
+        # This includes precision, recall, and F1-score for each class
+        classification_report_path = 'artifacts/classification_report.jpeg'
+        renderer.classification_report(y_test_orig, y_pred, classification_report_path)
+
+        # Save the trained model to disk for future reuse or deployment
+        # The model is serialized as a .pkl file in the 'models' directory
+        save_model(log_reg, 'models', 'logistic_regression_model.pkl',
+                   schema=FeatureSchema.from_frame(X_train_downsampled))
+        save_threshold(decision, 'models/logistic_regression_model.pkl')
+
+        # Save the input and score distribution of the test set as the drift baseline for serving
+        save_baseline(build_baseline(X_test_orig, test_scores), 'models/logistic_regression_model.pkl')
+    print("Report Saved!")
@@ -0,0 +1,102 @@
+# Import os — file modification times drive the hot reload
+import os
+
+# Import pickle — the trained model is stored as a pickle file
+import pickle
+
+# Import threading — concurrent sessions must not unpickle the same file twice
+import threading
+
+# Import namedtuple — model, schema and threshold are handed out together as one immutable snapshot
+from collections import namedtuple
+
+# Import the compact NumPy scorer — preferred when its artifact sits next to the pickle
+from src.linear_scorer import LinearScorer
+
+# Import the feature schema and operating threshold saved next to the model
+from src.schema import load_schema, schema_path
+from src.threshold import load_threshold, threshold_path
+
+# Import the drift baseline path — a new baseline also makes a new snapshot, so monitors are rebuilt
+from src.monitoring import baseline_path
+
+
+def load_model(model_path):
+    """
+    Load the trained model from disk.
+
+    The compact NumPy artifact saved next to the pickle is preferred when it
+    exists, since it loads without importing scikit-learn.
+
+    Parameters:
+    model_path (str): Path to the pickled model or to a .npz linear artifact.
+
+    Returns:
+    The loaded model or LinearScorer.
+    """
+
+    artifact_path = os.path.splitext(model_path)[0] + ".npz"
+    if os.path.exists(artifact_path):
+        return LinearScorer.load(artifact_path)
+
+    with open(model_path, "rb") as model_file:
+        return pickle.load(model_file)
+
+
+# One consistent view of a trained model: the model plus the schema and threshold saved with it
+ModelSnapshot = namedtuple("ModelSnapshot", ["model", "schema", "threshold"])
+
+
+class ModelCache:
+    """
+    Process-wide model cache that reloads when the model file changes.
+
+    Each get() costs one stat() call per watched file. When a file changes,
+    the model, feature schema and operating threshold are loaded together
+    under a lock and swapped in as one snapshot, so callers see either the old
+    or the new model with its own schema and threshold, never a mix. Writers
+    should replace the files atomically (see model.save_model).
+
+    Parameters:
+    model_path (str): Path to the pickled model.
+    loader (callable): Function loading a model from a path.
+    """
+
+    def __init__(self, model_path, loader=load_model):
+        self.model_path = model_path
+        self.loader = loader
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._mtime = None
+
+    def _current_mtime(self):
+        # Watch the compact artifact, schema and threshold too, since they are loaded with the model,
+        # and the drift baseline, which serve.py rebuilds its monitor from for every new snapshot
+        artifact_path = os.path.splitext(self.model_path)[0] + ".npz"
+        paths = [p for p in (self.model_path, artifact_path, schema_path(self.model_path),
+                             threshold_path(self.model_path), baseline_path(self.model_path))
+                 if os.path.exists(p)]
+        return tuple((p, os.stat(p).st_mtime_ns) for p in paths)
+
+    def _refresh(self):
+        mtime = self._current_mtime()
+        if mtime != self._mtime:
+            with self._lock:
+                # Another thread may have reloaded while we waited for the lock
+                if mtime != self._mtime:
+                    self._snapshot = ModelSnapshot(self.loader(self.model_path),
+                                                   load_schema(self.model_path),
+                                                   load_threshold(self.model_path))
+                    self._mtime = mtime
+
+    def get(self):
+        """
+        Return the current model snapshot, reloading it if files changed on disk.
+
+        Returns:
+        ModelSnapshot: (model, schema, threshold); schema is None and threshold 0.5
+        if the model was saved without them.
+        """
+
+        self._refresh()
+        return self._snapshot
@@ -0,0 +1,258 @@
+# Import json — the training baseline is stored next to the model as a small JSON file
+import json
+
+# Import os — baseline paths and atomic file replacement
+import os
+
+# Import multiprocessing — bin counters live in shared memory so every worker process reports into one sketch
+import multiprocessing
+
+# Import numpy — binning, PSI and KS are whole-array operations
+import numpy as np
+
+# Default number of quantile bins per feature; fixed memory of n_features x n_bins counters
+DRIFT_BINS = 10
+
+# Floor for empty-bin fractions, so PSI stays finite
+_EPSILON = 1e-4
+
+# Name of the model output in the baseline and the drift report
+SCORE_NAME = 'score'
+
+
+def baseline_path(model_path):
+    """
+    Path of the drift baseline saved next to a model.
+
+    Parameters:
+    model_path (str): Path of the model's pickle file.
+
+    Returns:
+    str: models/<name>.baseline.json for models/<name>.pkl.
+    """
+
+    return os.path.splitext(model_path)[0] + '.baseline.json'
+
+
+def _bin_indices(X, edges):
+    # Bin of every value: how many of its feature's edges it reaches, via one broadcast comparison
+    # X is (n_rows, n_features) and edges is (n_features, n_bins - 1)
+    return (X[:, :, None] >= edges[None, :, :]).sum(axis=2)
+
+
+def build_baseline(X, scores, n_bins=DRIFT_BINS):
+    """
+    Quantile bin edges and bin fractions of every feature and of the model score.
+
+    Build it on data with the production class balance (e.g. the held-out
+    split), so the baseline matches what the service will see.
+
+    Parameters:
+    X (DataFrame): Features.
+    scores (array): Model fraud probabilities for the same rows.
+    n_bins (int): Number of bins per feature.
+
+    Returns:
+    dict: JSON-serialisable baseline with 'features', 'edges' and 'fractions'.
+    """
+
+    names = list(X.columns) + [SCORE_NAME]
+    values = np.column_stack([X.to_numpy(dtype=np.float64), np.asarray(scores, dtype=np.float64)])
+
+    # Interior quantiles only; values beyond them fall into the first and last bins
+    edges = np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1], axis=0).T
+    bins = _bin_indices(values, edges)
+    counts = np.stack([np.bincount(bins[:, j], minlength=n_bins) for j in range(len(names))])
+    return {
+        'features': names,
+        'edges': edges.tolist(),
+        'fractions': (counts / len(values)).tolist(),
+        'rows': len(values),
+    }
+
+
+def save_baseline(baseline, model_path):
+    """
+    Save a baseline from build_baseline next to the model, atomically.
+
+    Parameters:
+    baseline (dict): Output of build_baseline.
+    model_path (str): Path of the model's pickle file.
+    """
+
+    file_path = baseline_path(model_path)
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'w') as file:
+        json.dump(baseline, file)
+    os.replace(tmp_path, file_path)
+
+
+def load_baseline(model_path):
+    """
+    Load the baseline saved next to a model, if there is one.
+
+    Parameters:
+    model_path (str): Path of the model's pickle file.
+
+    Returns:
+    dict or None.
+    """
+
+    file_path = baseline_path(model_path)
+    if not os.path.exists(file_path):
+        return None
+    with open(file_path) as file:
+        return json.load(file)
+
+
+def psi(expected, observed):
+    """
+    Population stability index between binned distributions, per row.
+
+    Parameters:
+    expected (ndarray): Baseline bin fractions, shape (n_features, n_bins).
+    observed (ndarray): Observed bin fractions, same shape.
+
+    Returns:
+    ndarray: PSI per feature; above ~0.2 is usually treated as significant drift.
+    """
+
+    expected = np.maximum(expected, _EPSILON)
+    observed = np.maximum(observed, _EPSILON)
+    return ((observed - expected) * np.log(observed / expected)).sum(axis=1)
+
+
+def ks_statistic(expected, observed):
+    """
+    Kolmogorov-Smirnov distance between binned distributions, per row.
+
+    Computed on the bin CDFs, so it is a lower bound of the exact statistic.
+
+    Parameters:
+    expected (ndarray): Baseline bin fractions, shape (n_features, n_bins).
+    observed (ndarray): Observed bin fractions, same shape.
+
+    Returns:
+    ndarray: Maximum CDF difference per feature.
+    """
+
+    return np.abs(np.cumsum(observed, axis=1) - np.cumsum(expected, axis=1)).max(axis=1)
+
+
+class DriftMonitor:
+    """
+    Fixed-memory histograms of live inputs and scores, compared against the training baseline.
+
+    Every observed value is counted in the baseline's quantile bins, so memory
+    is n_features x n_bins counters no matter how much traffic is seen. The
+    counters sit in shared memory: a monitor created before forking
+    aggregates every worker, like LatencyHistogram.
+
+    Parameters:
+    baseline (dict): Output of build_baseline / load_baseline.
+    feature_names (list, optional): Column order of the matrices passed to observe;
+                                    defaults to the baseline's feature order. Baseline
+                                    features missing from it are not monitored.
+    counts (multiprocessing.Array, optional): Shared counters of an earlier monitor to
+                                              reuse when they are large enough.
+    """
+
+    def __init__(self, baseline, feature_names=None, counts=None):
+        # Keep the baseline features present in the incoming matrices, plus the score (always last)
+        features = baseline['features'][:-1]
+        keep = list(range(len(features))) if feature_names is None else \
+            [idx for idx, name in enumerate(features) if name in list(feature_names)]
+        rows = keep + [len(features)]
+
+        self.features = [features[idx] for idx in keep]
+        self.names = self.features + [baseline['features'][-1]]
+        self.edges = np.asarray(baseline['edges'], dtype=np.float64)[rows]
+        self.expected = np.asarray(baseline['fractions'], dtype=np.float64)[rows]
+        self.n_bins = self.expected.shape[1]
+
+        # Columns of the incoming matrix that hold the monitored features, in baseline order
+        if feature_names is None:
+            self._columns = None
+        else:
+            feature_names = list(feature_names)
+            self._columns = np.array([feature_names.index(name) for name in self.features], dtype=np.intp)
+
+        # Offset of each feature's first counter in the flat counter array
+        self._offsets = np.arange(len(self.names)) * self.n_bins
+        size = len(self.names) * self.n_bins
+        self._counts = counts if counts is not None and len(counts) >= size else multiprocessing.Array('Q', size)
+        self._view = np.frombuffer(self._counts.get_obj(), dtype=np.uint64)[:size]
+
+    def observe(self, X, scores):
+        """
+        Count a batch of transactions and their scores.
+
+        Parameters:
+        X (ndarray): Feature matrix, shape (n_rows, n_features), in feature_names order.
+        scores (array): Fraud probabilities, one per row.
+        """
+
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if self._columns is not None:
+            X = X[:, self._columns]
+        values = np.column_stack([X, np.asarray(scores, dtype=np.float64)])
+
+        # One flat counter index per value, then a single bincount per batch
+        flat = (_bin_indices(values, self.edges) + self._offsets).ravel()
+        if len(flat) == len(self.names):
+            # A single transaction: every index is distinct, so a fancy increment is exact and cheaper
+            with self._counts.get_lock():
+                self._view[flat] += 1
+        else:
+            batch = np.bincount(flat, minlength=len(self._view)).astype(np.uint64)
+            with self._counts.get_lock():
+                self._view += batch
+
+    def reset(self):
+        """Clear all counters, e.g. to start a new monitoring window."""
+        with self._counts.get_lock():
+            self._view[:] = 0
+
+    def report(self):
+        """
+        PSI and KS of every feature and the score against the baseline.
+
+        Returns:
+        dict: 'rows' observed, and per name {'psi': ..., 'ks': ...}.
+        """
+
+        with self._counts.get_lock():
+            counts = self._view.reshape(len(self.names), self.n_bins).astype(np.float64)
+        rows = int(counts[-1].sum())
+        if rows == 0:
+            return {'rows': 0, 'drift': {}}
+
+        observed = counts / rows
+        psi_values = psi(self.expected, observed)
+        ks_values = ks_statistic(self.expected, observed)
+        return {
+            'rows': rows,
+            'drift': {name: {'psi': float(p), 'ks': float(k)}
+                      for name, p, k in zip(self.names, psi_values, ks_values)},
+        }
+
+    def render(self, prefix='fraud'):
+        """
+        Render PSI and KS gauges in the Prometheus text exposition format.
+
+        Parameters:
+        prefix (str): Metric name prefix.
+
+        Returns:
+        str: The exposition lines.
+        """
+
+        report = self.report()
+        lines = [f"# TYPE {prefix}_drift_rows gauge", f"{prefix}_drift_rows {report['rows']}"]
+        for metric in ('psi', 'ks'):
+            lines.append(f"# TYPE {prefix}_drift_{metric} gauge")
+            for name, values in report['drift'].items():
+                lines.append(f'{prefix}_drift_{metric}{{feature="{name}"}} {values[metric]}')
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,385 @@
+# Import argparse — command-line options for forcing stages and setting parallelism
+import argparse
+
+# Import hashlib — stage inputs and code are content-hashed to decide what is up to date
+import hashlib
+
+# Import json — the hashes of the last successful run are kept in a small JSON state file
+import json
+
+# Import os — file existence, stat calls and directory creation
+import os
+
+# Import pickle — the train stage hands the fitted model to later stages as a pickle file
+import pickle
+
+# Import threading — stages finishing concurrently update the state file under a lock
+import threading
+
+# Import time — per-stage wall-clock timings
+import time
+
+# Import ThreadPoolExecutor — runs independent stages (e.g. report and export) concurrently
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Import pandas and pyarrow — stages exchange data as memory-mappable Feather files
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# Import the pipeline steps
+from src.load_data import read_transactions
+from src.data_prep import preprocess_data
+from src.feat_eng import FeatureTransformer, add_velocity_features
+from src.feature_store import FeatureStore
+from src.schema import FeatureSchema
+from src.monitoring import build_baseline, save_baseline
+from src.threshold import choose_threshold, save_threshold, load_threshold, COST_FALSE_POSITIVE
+from src.model import prepare_training_data, train_logistic_regression, save_model, export_model
+from src.report import ReportRenderer
+
+# Files exchanged between stages
+RAW_DATA = os.path.join('data', 'raw_data', 'creditcard.csv')
+TRANSACTIONS = os.path.join('data', 'processed', 'transactions.feather')
+DOWNSAMPLED = os.path.join('data', 'processed', 'downsampled.feather')
+TEST_SPLIT = os.path.join('data', 'processed', 'test_split.feather')
+MODEL = os.path.join('models', 'logistic_regression_model.pkl')
+MODEL_ARTIFACT = os.path.join('models', 'logistic_regression_model.npz')
+MODEL_SCHEMA = os.path.join('models', 'logistic_regression_model.schema.json')
+MODEL_THRESHOLD = os.path.join('models', 'logistic_regression_model.threshold.json')
+MODEL_BASELINE = os.path.join('models', 'logistic_regression_model.baseline.json')
+FEATURE_STORE = os.path.join('models', 'feature_store.pkl')
+PREDICTIONS = os.path.join('artifacts', 'predictions.feather')
+THRESHOLD_CURVES = os.path.join('artifacts', 'threshold_curves.feather')
+HEATMAP = os.path.join('artifacts', 'heatmap.jpeg')
+CONFUSION_MATRIX = os.path.join('artifacts', 'confusion_matrix.jpeg')
+CLASSIFICATION_REPORT = os.path.join('artifacts', 'classification_report.jpeg')
+
+# The stage definitions themselves; changing them invalidates every stage
+PIPELINE_CODE = os.path.join('src', 'pipeline.py')
+
+# Hashes of the last successful run of every stage
+STATE_PATH = os.path.join('.pipeline', 'state.json')
+
+# Read size used when hashing files
+_HASH_BLOCK_SIZE = 1 << 20
+
+
+# Serialises progress lines from concurrently running stages
+_print_lock = threading.Lock()
+
+
+def _log(message):
+    with _print_lock:
+        print(message, flush=True)
+
+
+class Stage:
+    """
+    One pipeline step with declared inputs, outputs and code dependencies.
+
+    A stage is skipped when the hash of its inputs, code and parameters matches
+    the last successful run and all of its outputs still exist. Dependencies
+    between stages follow from the files: a stage runs after every stage that
+    produces one of its inputs.
+
+    Parameters:
+    name (str): Stage name.
+    func (callable): Function doing the work; it reads the inputs and writes the outputs.
+    inputs (list): Files the stage reads.
+    outputs (list): Files the stage writes.
+    code (list): Source files whose changes invalidate the stage.
+    params (dict, optional): Parameters passed to func, also part of the hash.
+    """
+
+    def __init__(self, name, func, inputs, outputs, code, params=None):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.code = list(code)
+        self.params = params or {}
+
+
+def _write_feather(df, file_path):
+    # Write to a temporary name and rename, so a failed stage never leaves a truncated output
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    tmp_path = f"{file_path}.tmp"
+    df.reset_index(drop=True).to_feather(tmp_path, compression='uncompressed')
+    os.replace(tmp_path, file_path)
+
+
+def _read_feather(file_path):
+    # Memory-map a Feather file instead of reading it into a buffer first
+    return feather.read_table(file_path, memory_map=True).to_pandas(split_blocks=True)
+
+
+def _iter_feather(file_path):
+    # Stream the record batches of a Feather file from a memory map, one DataFrame at a time
+    with pa.memory_map(file_path) as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i).to_pandas()
+
+
+def load_stage():
+    # Parse the raw CSV once with explicit dtypes into a columnar file for every later stage
+    _write_feather(read_transactions(RAW_DATA), TRANSACTIONS)
+
+
+def preprocess_stage(sampling_ratio=1.0):
+    # Stream the transactions through the single-pass undersampler
+    downsampled_df = preprocess_data(_iter_feather(TRANSACTIONS), sampling_ratio=sampling_ratio)
+    _write_feather(downsampled_df, DOWNSAMPLED)
+
+
+def train_stage(feature_engineering=True):
+    # Split, downsample the training part and fit; the held-out split is kept for evaluation
+    # Velocity aggregates need each card's full history, so they are added before the split
+    df = _read_feather(TRANSACTIONS)
+    if feature_engineering:
+        df = add_velocity_features(df)
+    X_train, y_train, X_test, y_test = prepare_training_data(df)
+    transformer = FeatureTransformer() if feature_engineering else None
+    model = train_logistic_regression(X_train, y_train, feature_transformer=transformer)
+    # save_model removes the previous run's .npz, so a running server never pairs it with the new
+    # schema and threshold; the export stage writes the new one
+    save_model(model, os.path.dirname(MODEL), os.path.basename(MODEL), export=False,
+               schema=FeatureSchema.from_frame(X_train))
+    _write_feather(X_test.assign(Class=y_test), TEST_SPLIT)
+
+
+def evaluate_stage():
+    # Score the held-out split, which keeps the real class balance, for threshold selection and reporting
+    with open(MODEL, 'rb') as file:
+        model = pickle.load(file)
+    test_df = _read_feather(TEST_SPLIT)
+    X_test = test_df.drop(columns='Class')
+    predictions = pd.DataFrame({
+        'y_true': test_df['Class'],
+        'y_score': model.predict_proba(X_test)[:, 1],
+        'amount': test_df['Amount'],
+    })
+    _write_feather(predictions, PREDICTIONS)
+
+
+def threshold_stage(cost_fp=COST_FALSE_POSITIVE, alert_budget=None):
+    # Pick the cheapest operating threshold: a false alert costs one review, a missed fraud its amount
+    predictions = _read_feather(PREDICTIONS)
+    decision, curves = choose_threshold(predictions['y_true'], predictions['y_score'],
+                                        cost_fp=cost_fp, cost_fn=predictions['amount'].to_numpy(),
+                                        alert_budget=alert_budget)
+    _write_feather(curves, THRESHOLD_CURVES)
+    save_threshold(decision, MODEL)
+    _log(f"[threshold] {decision['threshold']:.4f}: precision {decision['precision']:.3f}, "
+         f"recall {decision['recall']:.3f}, {decision['alert_rate']:.4%} of transactions flagged")
+
+
+def baseline_stage():
+    # Bin edges and fractions of every feature and the score, for drift monitoring in the service
+    test_df = _read_feather(TEST_SPLIT)
+    predictions = _read_feather(PREDICTIONS)
+    save_baseline(build_baseline(test_df.drop(columns='Class'), predictions['y_score']), MODEL)
+
+
+def report_stage():
+    # Render every figure in parallel background processes, at the chosen operating threshold
+    predictions = _read_feather(PREDICTIONS)
+    y_pred = (predictions['y_score'] >= load_threshold(MODEL)).astype(int)
+    os.makedirs(os.path.dirname(HEATMAP), exist_ok=True)
+    with ReportRenderer(max_workers=3) as renderer:
+        renderer.heatmap(_read_feather(DOWNSAMPLED), HEATMAP)
+        renderer.confusion_matrix(predictions['y_true'], y_pred, CONFUSION_MATRIX)
+        renderer.classification_report(predictions['y_true'], y_pred, CLASSIFICATION_REPORT)
+
+
+def feature_store_stage():
+    # Replay the recent transactions into the online feature store, so serving starts warm
+    # The store uses the same buckets as add_velocity_features, so online values match training
+    store = FeatureStore()
+    replayed = store.replay(_read_feather(TRANSACTIONS))
+    store.snapshot(FEATURE_STORE)
+    _log(f"[feature_store] {replayed} transactions replayed for {len(store)} entities")
+
+
+def export_stage():
+    # Write the NumPy-only serving artifact next to the model
+    with open(MODEL, 'rb') as file:
+        model = pickle.load(file)
+    export_model(model, MODEL)
+
+
+# The fraud pipeline: load -> preprocess -> train -> evaluate -> threshold -> report,
+# plus export, the drift baseline and the feature store
+STAGES = [
+    Stage('load', load_stage,
+          inputs=[RAW_DATA], outputs=[TRANSACTIONS],
+          code=[os.path.join('src', 'load_data.py')]),
+    Stage('preprocess', preprocess_stage,
+          inputs=[TRANSACTIONS], outputs=[DOWNSAMPLED],
+          code=[os.path.join('src', 'data_prep.py')], params={'sampling_ratio': 1.0}),
+    Stage('train', train_stage,
+          inputs=[TRANSACTIONS], outputs=[MODEL, MODEL_SCHEMA, TEST_SPLIT],
+          code=[os.path.join('src', 'model.py'), os.path.join('src', 'feat_eng.py'),
+                os.path.join('src', 'transform.py'), os.path.join('src', 'schema.py')],
+          params={'feature_engineering': True}),
+    Stage('evaluate', evaluate_stage,
+          inputs=[MODEL, TEST_SPLIT], outputs=[PREDICTIONS],
+          code=[os.path.join('src', 'feat_eng.py'), os.path.join('src', 'transform.py')]),
+    Stage('threshold', threshold_stage,
+          inputs=[PREDICTIONS], outputs=[MODEL_THRESHOLD, THRESHOLD_CURVES],
+          code=[os.path.join('src', 'threshold.py')],
+          params={'cost_fp': COST_FALSE_POSITIVE, 'alert_budget': None}),
+    Stage('baseline', baseline_stage,
+          inputs=[TEST_SPLIT, PREDICTIONS], outputs=[MODEL_BASELINE],
+          code=[os.path.join('src', 'monitoring.py')]),
+    Stage('report', report_stage,
+          inputs=[PREDICTIONS, MODEL_THRESHOLD, DOWNSAMPLED], outputs=[HEATMAP, CONFUSION_MATRIX, CLASSIFICATION_REPORT],
+          code=[os.path.join('src', 'report.py'), os.path.join('src', 'threshold.py')]),
+    Stage('export', export_stage,
+          inputs=[MODEL], outputs=[MODEL_ARTIFACT],
+          code=[os.path.join('src', 'model.py'), os.path.join('src', 'linear_scorer.py'),
+                os.path.join('src', 'feat_eng.py'), os.path.join('src', 'transform.py')]),
+    Stage('feature_store', feature_store_stage,
+          inputs=[TRANSACTIONS], outputs=[FEATURE_STORE],
+          code=[os.path.join('src', 'feature_store.py'), os.path.join('src', 'feat_eng.py')]),
+]
+
+
+class PipelineRunner:
+    """
+    Run stages in dependency order, concurrently where possible, skipping up-to-date ones.
+
+    File digests are cached by (size, mtime), so unchanged large inputs such
+    as the raw CSV are not re-hashed on every run.
+
+    Parameters:
+    stages (list): Stage objects.
+    state_path (str): Where to keep the hashes of the last successful run.
+    max_workers (int): Maximum number of stages running at once.
+    """
+
+    def __init__(self, stages=STAGES, state_path=STATE_PATH, max_workers=4):
+        self.stages = {stage.name: stage for stage in stages}
+        self.state_path = state_path
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._state = {'stages': {}, 'digests': {}}
+        if os.path.exists(state_path):
+            with open(state_path) as file:
+                self._state = json.load(file)
+
+        # A stage depends on every stage producing one of its inputs
+        producers = {output: stage.name for stage in stages for output in stage.outputs}
+        self.dependencies = {
+            stage.name: {producers[path] for path in stage.inputs if path in producers}
+            for stage in stages
+        }
+
+    def _file_digest(self, path):
+        stat = os.stat(path)
+        with self._lock:
+            cached = self._state['digests'].get(path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(_HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+        with self._lock:
+            self._state['digests'][path] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def stage_key(self, stage):
+        """
+        Hash of everything that determines a stage's outputs.
+
+        Parameters:
+        stage (Stage): The stage.
+
+        Returns:
+        str: Hex digest of the stage's inputs, code and parameters.
+        """
+
+        digest = hashlib.sha256(stage.name.encode())
+        digest.update(json.dumps(stage.params, sort_keys=True).encode())
+        for path in stage.inputs + stage.code + [PIPELINE_CODE]:
+            digest.update(path.encode())
+            digest.update(self._file_digest(path).encode())
+        return digest.hexdigest()
+
+    def _save_state(self):
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        # Write and rename under the lock: stages finishing together share the tmp file
+        with self._lock:
+            with open(tmp_path, 'w') as file:
+                json.dump(self._state, file, indent=2)
+            os.replace(tmp_path, self.state_path)
+
+    def _run_stage(self, stage, force):
+        key = self.stage_key(stage)
+        with self._lock:
+            previous = self._state['stages'].get(stage.name)
+        if not force and previous == key and all(os.path.exists(path) for path in stage.outputs):
+            _log(f"[{stage.name}] up to date, skipped")
+            return False
+
+        _log(f"[{stage.name}] running")
+        start = time.perf_counter()
+        stage.func(**stage.params)
+        _log(f"[{stage.name}] done in {time.perf_counter() - start:.1f}s")
+
+        # Hash the fresh outputs now, so downstream stages reuse the cached digests
+        for path in stage.outputs:
+            self._file_digest(path)
+        with self._lock:
+            self._state['stages'][stage.name] = key
+        self._save_state()
+        return True
+
+    def run(self, force=()):
+        """
+        Run the pipeline.
+
+        Parameters:
+        force (iterable): Names of stages to run even if they are up to date.
+
+        Returns:
+        dict: Stage name -> True if it ran, False if it was skipped.
+        """
+
+        force = set(force)
+        pending = set(self.stages)
+        results = {}
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                # Start every stage whose upstream stages have all finished
+                for name in sorted(pending):
+                    if self.dependencies[name] <= results.keys():
+                        running[executor.submit(self._run_stage, self.stages[name], name in force)] = name
+                        pending.discard(name)
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    # Surface the first failure; stages already running are left to finish
+                    results[name] = future.result()
+        return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the fraud detection pipeline, skipping up-to-date stages")
+    parser.add_argument("--force", nargs='*', default=None, metavar='STAGE',
+                        help="stages to rerun regardless of their hashes (no names: all stages)")
+    parser.add_argument("--jobs", type=int, default=4, help="maximum number of concurrent stages")
+    args = parser.parse_args()
+
+    runner = PipelineRunner(max_workers=args.jobs)
+    if args.force is None:
+        force = []
+    else:
+        force = args.force or list(runner.stages)
+    runner.run(force=force)
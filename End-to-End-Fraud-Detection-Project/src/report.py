@@ -0,0 +1,220 @@
+# Import json — every figure is accompanied by its raw numbers as JSON
+import json
+
+# Import os — output paths for figures and their JSON sidecars
+import os
+
+# Import matplotlib with the non-interactive Agg backend, before pyplot is imported
+# Rendering never blocks on or requires a display, which makes it safe in CI and worker processes
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+# Import numpy — correlation and report numbers are computed directly on float32 arrays
+import numpy as np
+
+# Import ProcessPoolExecutor — renders figures in the background so training is not blocked
+from concurrent.futures import ProcessPoolExecutor
+
+# Import the classification metrics summarised by the report
+from sklearn.metrics import classification_report, confusion_matrix
+
+# Cells per side above which heatmap values are no longer annotated (text rendering dominates the cost)
+MAX_ANNOTATED_CELLS = 12
+
+
+def correlation_matrix(df):
+    """
+    Pearson correlation matrix of the numeric columns, computed in float32.
+
+    Parameters:
+    df (DataFrame): The input data.
+
+    Returns:
+    Tuple: (correlation matrix as a float32 ndarray, list of column labels).
+    """
+
+    numeric = df.select_dtypes('number')
+    X = numeric.to_numpy(dtype=np.float32)
+
+    # Centre and scale each column, then one matrix product gives every pairwise correlation
+    X = X - X.mean(axis=0, dtype=np.float64).astype(np.float32)
+    std = np.sqrt((X * X).sum(axis=0, dtype=np.float64)).astype(np.float32)
+    std[std == 0] = np.nan
+    corr = (X.T @ X) / np.outer(std, std)
+    return corr.astype(np.float32), list(numeric.columns)
+
+
+def write_json(data, file_path):
+    """
+    Write report numbers as JSON next to a figure.
+
+    Parameters:
+    data (dict): JSON-serialisable numbers.
+    file_path (str): Path of the figure; the JSON gets the same name with a .json extension.
+
+    Returns:
+    str: Path of the written JSON file.
+    """
+
+    json_path = os.path.splitext(file_path)[0] + '.json'
+    with open(json_path, 'w') as file:
+        json.dump(data, file, indent=2)
+    return json_path
+
+
+def render_heatmap(matrix, labels, file_path, title=None, cmap='coolwarm', fmt='.2f', figsize=(16, 9),
+                   xlabel=None, ylabel=None):
+    """
+    Render a labelled heatmap to an image file and close the figure.
+
+    Parameters:
+    matrix (ndarray): 2D values to plot.
+    labels (list or tuple): Row labels, or a (row labels, column labels) pair.
+    file_path (str): Destination image path.
+    title (str, optional): Figure title.
+    cmap (str): Matplotlib colormap.
+    fmt (str): Format of cell annotations (only drawn for small matrices).
+    figsize (tuple): Figure size in inches.
+    xlabel (str, optional): X-axis label.
+    ylabel (str, optional): Y-axis label.
+    """
+
+    row_labels, col_labels = labels if isinstance(labels, tuple) else (labels, labels)
+    matrix = np.asarray(matrix)
+
+    fig, ax = plt.subplots(figsize=figsize)
+    try:
+        image = ax.imshow(matrix, cmap=cmap, aspect='auto')
+        fig.colorbar(image, ax=ax)
+        ax.set_xticks(range(len(col_labels)), labels=col_labels, rotation=90)
+        ax.set_yticks(range(len(row_labels)), labels=row_labels)
+
+        # Annotating every cell of a large matrix costs far more than drawing it; skip it there
+        if max(matrix.shape) <= MAX_ANNOTATED_CELLS:
+            for (row, col), value in np.ndenumerate(matrix):
+                ax.text(col, row, format(value, fmt), ha='center', va='center')
+
+        if title:
+            ax.set_title(title)
+        if xlabel:
+            ax.set_xlabel(xlabel)
+        if ylabel:
+            ax.set_ylabel(ylabel)
+        fig.tight_layout()
+        fig.savefig(file_path)
+    finally:
+        # Always release the figure, so long pipelines do not accumulate open figures
+        plt.close(fig)
+
+
+def heatmap_report(df, file_path):
+    """
+    Compute the correlation matrix, save it as JSON and return the rendering arguments.
+
+    Parameters:
+    df (DataFrame): The input data.
+    file_path (str): Destination image path.
+
+    Returns:
+    dict: Keyword arguments for render_heatmap.
+    """
+
+    corr, labels = correlation_matrix(df)
+    write_json({'labels': labels, 'correlation': np.round(corr, 6).tolist()}, file_path)
+    return dict(matrix=corr, labels=labels, file_path=file_path, title='Correlation Matrix')
+
+
+def confusion_matrix_report(y_true, y_pred, file_path):
+    """
+    Compute the confusion matrix, save it as JSON and return the rendering arguments.
+
+    Parameters:
+    y_true (Series): True target values.
+    y_pred (Series): Predicted target values.
+    file_path (str): Destination image path.
+
+    Returns:
+    dict: Keyword arguments for render_heatmap.
+    """
+
+    conf_matrix = confusion_matrix(y_true, y_pred)
+    labels = ['Non-Fraud', 'Fraud']
+    write_json({'labels': labels, 'confusion_matrix': conf_matrix.tolist()}, file_path)
+    return dict(matrix=conf_matrix, labels=labels, file_path=file_path, title='Confusion Matrix',
+                cmap='Blues', fmt='d', figsize=(8, 6), xlabel='Predicted', ylabel='Actual')
+
+
+def classification_report_report(y_true, y_pred, file_path):
+    """
+    Compute the classification report, save it as JSON and return the rendering arguments.
+
+    Parameters:
+    y_true (Series): True target values.
+    y_pred (Series): Predicted target values.
+    file_path (str): Destination image path.
+
+    Returns:
+    dict: Keyword arguments for render_heatmap.
+    """
+
+    report = classification_report(y_true, y_pred, output_dict=True)
+    write_json(report, file_path)
+
+    # Plot precision, recall and f1-score per class and average (no 'accuracy' row, no 'support' column)
+    rows = [name for name, values in report.items() if isinstance(values, dict)]
+    metrics = ['precision', 'recall', 'f1-score']
+    values = np.array([[report[row][metric] for metric in metrics] for row in rows])
+    return dict(matrix=values, labels=(rows, metrics), file_path=file_path, title='Classification Report',
+                cmap='Blues', fmt='.2f', figsize=(10, 6))
+
+
+class ReportRenderer:
+    """
+    Render report figures in a background process pool.
+
+    The numbers behind each figure are computed and written as JSON right away;
+    only the (slow) drawing is handed to the pool. Use as a context manager, or
+    call wait(), to make sure every figure has been written.
+
+    Parameters:
+    max_workers (int): Number of rendering processes.
+    """
+
+    def __init__(self, max_workers=2):
+        self._executor = ProcessPoolExecutor(max_workers=max_workers)
+        self._futures = []
+
+    def _submit(self, render_kwargs):
+        self._futures.append(self._executor.submit(render_heatmap, **render_kwargs))
+
+    def heatmap(self, df, file_path):
+        """Queue the correlation heatmap of df."""
+        self._submit(heatmap_report(df, file_path))
+
+    def confusion_matrix(self, y_true, y_pred, file_path):
+        """Queue the confusion matrix figure."""
+        self._submit(confusion_matrix_report(y_true, y_pred, file_path))
+
+    def classification_report(self, y_true, y_pred, file_path):
+        """Queue the classification report figure."""
+        self._submit(classification_report_report(y_true, y_pred, file_path))
+
+    def wait(self):
+        """Block until every queued figure is written, re-raising any rendering error."""
+        futures, self._futures = self._futures, []
+        for future in futures:
+            future.result()
+
+    def close(self):
+        """Wait for pending figures and shut the pool down."""
+        try:
+            self.wait()
+        finally:
+            self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,218 @@
+# Import json — the schema is stored next to the model as a small JSON file
+import json
+
+# Import os — schema paths and atomic file replacement
+import os
+
+# Import numpy — inputs are coerced column by column into one preallocated matrix
+import numpy as np
+
+# Import pandas — DataFrame inputs, and vectorized parsing of string columns
+import pandas as pd
+
+
+class SchemaError(ValueError):
+    """Raised when an input cannot be mapped onto the training feature layout; names the field."""
+
+
+def schema_path(model_path):
+    """
+    Path of the schema saved next to a model.
+
+    Parameters:
+    model_path (str): Path of the model's pickle file.
+
+    Returns:
+    str: models/<name>.schema.json for models/<name>.pkl.
+    """
+
+    return os.path.splitext(model_path)[0] + '.schema.json'
+
+
+def load_schema(model_path):
+    """
+    Load the schema saved next to a model, if there is one.
+
+    Parameters:
+    model_path (str): Path of the model's pickle file.
+
+    Returns:
+    FeatureSchema or None.
+    """
+
+    path = schema_path(model_path)
+    if not os.path.exists(path):
+        return None
+    return FeatureSchema.load(path)
+
+
+class FeatureSchema:
+    """
+    Feature order, dtypes and defaults of the data a model was trained on.
+
+    coerce() maps a transaction dict, a list of them, a DataFrame, an Arrow
+    batch or a plain matrix onto exactly this layout, writing every column
+    straight into one preallocated array. Missing or empty values take the
+    feature's default (the training median); values that cannot be parsed
+    raise a SchemaError naming the field.
+
+    Parameters:
+    names (list): Feature names in model column order.
+    dtypes (list): Training dtype of each feature, e.g. 'float32'.
+    defaults (list): Value used for each feature when an input omits it.
+    """
+
+    def __init__(self, names, dtypes, defaults):
+        if not len(names) == len(dtypes) == len(defaults):
+            raise ValueError("names, dtypes and defaults must have the same length.")
+        self.names = list(names)
+        self.dtypes = [str(dtype) for dtype in dtypes]
+        self.defaults = np.asarray(defaults, dtype=np.float64)
+        self._index = {name: idx for idx, name in enumerate(self.names)}
+        self._integer = np.array([np.issubdtype(np.dtype(dtype), np.integer) for dtype in self.dtypes])
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def from_frame(cls, X):
+        """
+        Build the schema of a training feature frame, with its medians as defaults.
+
+        Parameters:
+        X (DataFrame): Training features.
+
+        Returns:
+        FeatureSchema: The schema.
+        """
+
+        defaults = X.median(numeric_only=True).reindex(X.columns).fillna(0.0)
+        return cls(list(X.columns), [X[name].dtype for name in X.columns], defaults.to_numpy())
+
+    def to_dict(self):
+        """Plain, JSON-serialisable representation."""
+        return {
+            'features': [
+                {'name': name, 'dtype': dtype, 'default': float(default)}
+                for name, dtype, default in zip(self.names, self.dtypes, self.defaults)
+            ]
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a schema from to_dict output."""
+        features = data['features']
+        return cls([f['name'] for f in features], [f['dtype'] for f in features],
+                   [f['default'] for f in features])
+
+    def save(self, file_path):
+        """
+        Write the schema as JSON, atomically.
+
+        Parameters:
+        file_path (str): Destination path, usually schema_path(model_path).
+        """
+
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(self.to_dict(), file, indent=2)
+        os.replace(tmp_path, file_path)
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Read a schema written by save.
+
+        Parameters:
+        file_path (str): Path of the schema JSON.
+
+        Returns:
+        FeatureSchema: The schema.
+        """
+
+        with open(file_path) as file:
+            return cls.from_dict(json.load(file))
+
+    def _fill_column(self, out, j, name, values, allow_missing):
+        # Parse one input column into out[:, j]; numbers and numeric strings take the fast path
+        try:
+            out[:, j] = values
+        except (ValueError, TypeError):
+            # Blank strings and other junk: parse the whole column at once, then report the first bad value
+            raw = pd.Series(values, dtype=object).replace(r'^\s*$', None, regex=True)
+            parsed = pd.to_numeric(raw, errors='coerce')
+            invalid = parsed.isna().to_numpy() & raw.notna().to_numpy()
+            if invalid.any():
+                row = int(np.flatnonzero(invalid)[0])
+                raise SchemaError(f"Field '{name}' has a non-numeric value {values[row]!r} (row {row}).")
+            out[:, j] = parsed.to_numpy(dtype=np.float64)
+
+        # Missing values take the training default
+        column = out[:, j]
+        missing = np.isnan(column)
+        if missing.any():
+            if not allow_missing:
+                raise SchemaError(f"Field '{name}' is missing (row {int(np.flatnonzero(missing)[0])}).")
+            column[missing] = self.defaults[self._index[name]]
+
+        if np.isinf(column).any():
+            raise SchemaError(f"Field '{name}' is not finite (row {int(np.flatnonzero(np.isinf(column))[0])}).")
+        if self._integer[self._index[name]] and (column != np.round(column)).any():
+            row = int(np.flatnonzero(column != np.round(column))[0])
+            raise SchemaError(f"Field '{name}' must be an integer, got {float(column[row])!r} (row {row}).")
+
+    def coerce(self, data, columns=None, dtype=np.float64, allow_missing=True):
+        """
+        Map inputs onto the training layout in a single allocation.
+
+        Parameters:
+        data: A dict (one transaction), a list of dicts, a DataFrame, a pyarrow
+              RecordBatch/Table, or a list of lists / array already in schema order.
+        columns (list, optional): Subset and order of schema features to return; defaults to all.
+        dtype: NumPy dtype of the returned matrix.
+        allow_missing (bool): Fill missing fields with their defaults instead of raising.
+
+        Returns:
+        ndarray: Array of shape (n_rows, len(columns)).
+        """
+
+        columns = self.names if columns is None else list(columns)
+        unknown = [name for name in columns if name not in self._index]
+        if unknown:
+            raise SchemaError(f"Field '{unknown[0]}' is not part of the schema.")
+
+        # A single transaction is a batch of one
+        if isinstance(data, dict):
+            data = [data]
+
+        # Plain matrices are taken to be in schema order; only the shape can be checked
+        if not isinstance(data, pd.DataFrame) and not hasattr(data, 'column_names') and \
+                not (isinstance(data, (list, tuple)) and data and isinstance(data[0], dict)):
+            try:
+                matrix = np.asarray(data, dtype=dtype)
+            except (ValueError, TypeError):
+                raise SchemaError("Input rows must contain only numbers.") from None
+            if matrix.ndim == 1:
+                matrix = matrix.reshape(1, -1)
+            if matrix.ndim != 2 or matrix.shape[1] != len(self.names):
+                raise SchemaError(f"Expected {len(self.names)} features, got {matrix.shape[-1]}.")
+            return matrix[:, [self._index[name] for name in columns]] if columns != self.names else matrix
+
+        n_rows = len(data) if not hasattr(data, 'num_rows') else data.num_rows
+        out = np.empty((n_rows, len(columns)), dtype=dtype)
+
+        for j, name in enumerate(columns):
+            if isinstance(data, pd.DataFrame):
+                values = data[name].to_numpy() if name in data.columns else None
+            elif hasattr(data, 'column_names'):
+                values = data.column(name).to_numpy(zero_copy_only=False) if name in data.column_names else None
+            else:
+                values = [row.get(name) for row in data]
+
+            if values is None:
+                if not allow_missing:
+                    raise SchemaError(f"Field '{name}' is missing.")
+                out[:, j] = self.defaults[self._index[name]]
+                continue
+            self._fill_column(out, j, name, values, allow_missing)
+        return out
@@ -0,0 +1,232 @@
+# Import asyncio — drives the micro-batching queue that groups concurrent requests
+import asyncio
+
+# Import numpy — every input format is converted into one contiguous feature matrix
+import numpy as np
+
+# Import pandas — DataFrame inputs are accepted directly and used to keep sklearn's feature names
+import pandas as pd
+
+# Import the compact NumPy scorer — scored directly, without sklearn's input validation
+from src.linear_scorer import LinearScorer
+
+
+def to_feature_matrix(data, feature_names, dtype=np.float64):
+    """
+    Convert transactions into a 2D feature matrix in the given column order.
+
+    Parameters:
+    data: A dict (one transaction), a list of dicts, a list of lists, a NumPy
+          array, a pandas DataFrame, or a pyarrow RecordBatch/Table.
+    feature_names (list): Column order expected by the model.
+    dtype: NumPy dtype of the returned matrix.
+
+    Returns:
+    ndarray: Array of shape (n_rows, n_features).
+    """
+
+    # A single transaction is a batch of one
+    if isinstance(data, dict):
+        data = [data]
+
+    # DataFrames are reordered by column name and converted in one call
+    if isinstance(data, pd.DataFrame):
+        return data[feature_names].to_numpy(dtype=dtype)
+
+    # Arrow record batches and tables expose columns by name; copy each column straight into place
+    if hasattr(data, 'column_names') and hasattr(data, 'num_rows'):
+        matrix = np.empty((data.num_rows, len(feature_names)), dtype=dtype)
+        for idx, name in enumerate(feature_names):
+            matrix[:, idx] = data.column(name).to_numpy(zero_copy_only=False)
+        return matrix
+
+    # Lists of dicts are filled column by column into a single preallocated array
+    if isinstance(data, (list, tuple)) and data and isinstance(data[0], dict):
+        matrix = np.empty((len(data), len(feature_names)), dtype=dtype)
+        for idx, name in enumerate(feature_names):
+            matrix[:, idx] = [row[name] for row in data]
+        return matrix
+
+    # Anything else (lists of lists, arrays) is taken to already be in model column order
+    matrix = np.asarray(data, dtype=dtype)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    if matrix.shape[1] != len(feature_names):
+        raise ValueError(f"Expected {len(feature_names)} features, got {matrix.shape[1]}.")
+    return matrix
+
+
+def model_matrix(model, data, feature_names=None, schema=None):
+    """
+    Convert transactions into the feature matrix a model scores.
+
+    Parameters:
+    model: Fitted classifier exposing predict_proba, or a LinearScorer.
+    data: Transactions in any format accepted by to_feature_matrix.
+    feature_names (list, optional): Column order; defaults to the model's feature_names_in_.
+    schema (FeatureSchema, optional): Training schema; when given, inputs are validated
+                                      and missing fields take the schema defaults.
+
+    Returns:
+    ndarray: Array of shape (n_rows, n_features) in the model's dtype.
+    """
+
+    # Fall back to the column names the model was fitted with
+    if feature_names is None:
+        feature_names = list(model.feature_names_in_)
+
+    # With a schema, strings are parsed and validated per column and gaps filled with defaults
+    dtype = model.dtype if isinstance(model, LinearScorer) else np.float64
+    if schema is not None:
+        return schema.coerce(data, columns=feature_names, dtype=dtype)
+    return to_feature_matrix(data, feature_names, dtype=dtype)
+
+
+def score_batch(model, data, feature_names=None, schema=None):
+    """
+    Score many transactions with a single vectorized model call.
+
+    Parameters:
+    model: Fitted classifier exposing predict_proba, or a LinearScorer.
+    data: Transactions in any format accepted by to_feature_matrix.
+    feature_names (list, optional): Column order; defaults to the model's feature_names_in_.
+    schema (FeatureSchema, optional): Training schema; when given, inputs are validated
+                                      and missing fields take the schema defaults.
+
+    Returns:
+    ndarray: Fraud probability for each transaction.
+    """
+
+    if feature_names is None:
+        feature_names = list(model.feature_names_in_)
+    matrix = model_matrix(model, data, feature_names, schema)
+
+    # The compact scorer works on the raw matrix in its own dtype
+    if isinstance(model, LinearScorer):
+        return model.score(matrix)
+
+    # Models fitted on DataFrames warn on bare arrays, so wrap the matrix without copying it
+    if hasattr(model, 'feature_names_in_'):
+        matrix = pd.DataFrame(matrix, columns=feature_names, copy=False)
+
+    # Column 1 of predict_proba is the probability of the fraud class
+    return model.predict_proba(matrix)[:, 1]
+
+
+def predict_batch(model, data, feature_names=None, threshold=0.5, schema=None):
+    """
+    Classify many transactions with a single vectorized model call.
+
+    Parameters:
+    model: Fitted classifier exposing predict_proba, or a LinearScorer.
+    data: Transactions in any format accepted by to_feature_matrix.
+    feature_names (list, optional): Column order; defaults to the model's feature_names_in_.
+    threshold (float): Probability at or above which a transaction is flagged as fraud.
+    schema (FeatureSchema, optional): Training schema used to validate and complete the inputs.
+
+    Returns:
+    ndarray: 1 for fraud and 0 for non-fraud, for each transaction.
+    """
+
+    return (score_batch(model, data, feature_names, schema) >= threshold).astype(np.int8)
+
+
+class MicroBatcher:
+    """
+    Collect concurrent single-transaction requests and score them together.
+
+    Requests are queued until either 'max_batch_size' rows are waiting or the
+    oldest one has waited 'max_wait_ms', then the whole batch is scored with one
+    call in a worker thread so the event loop keeps accepting requests.
+
+    Parameters:
+    score_fn (callable): Function mapping a list of transactions to one result per transaction,
+                         e.g. functools.partial(score_batch, model) for an array of scores.
+    max_batch_size (int): Maximum number of rows scored in one call.
+    max_wait_ms (float): Maximum time a request waits for others to join its batch.
+    """
+
+    def __init__(self, score_fn, max_batch_size=256, max_wait_ms=2.0):
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = None
+        self._worker = None
+
+    async def score(self, transaction):
+        """
+        Queue one transaction and wait for its score.
+
+        Parameters:
+        transaction: A single transaction, typically a dict of feature values.
+
+        Returns:
+        The result score_fn computed for this transaction (a float score for score_batch).
+        """
+
+        # Lazily bind the queue and worker task to the running event loop
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((transaction, future))
+        return await future
+
+    async def close(self):
+        """Stop the background worker task; requests still queued or being scored are cancelled."""
+
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+            # Nobody will pick these up any more, so their callers must not wait forever
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                future.cancel()
+
+    async def _collect(self):
+        # Block for the first request, then gather more until the batch is full or the wait expires
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            # Drain whatever is already queued without paying for a timer
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            transactions = [transaction for transaction, _ in batch]
+
+            # Score the whole batch off the event loop and fan the results back out
+            try:
+                scores = await loop.run_in_executor(None, self.score_fn, transactions)
+            except asyncio.CancelledError:
+                # Closed while this batch was being scored
+                for _, future in batch:
+                    future.cancel()
+                raise
+            except Exception as exc:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            for (_, future), score in zip(batch, scores):
+                if not future.done():
+                    future.set_result(score)
@@ -0,0 +1,166 @@
+# Import json — the chosen operating point is saved next to the model as a small JSON file
+import json
+
+# Import os — threshold paths and atomic file replacement
+import os
+
+# Import numpy — every candidate threshold is evaluated at once with a sort and cumulative sums
+import numpy as np
+
+# Import pandas — curves are returned as a DataFrame for saving and plotting
+import pandas as pd
+
+# Default cost of a false alert — one manual review
+COST_FALSE_POSITIVE = 5.0
+
+# Default cost of a missed fraud when no per-transaction amounts are given
+COST_FALSE_NEGATIVE = 100.0
+
+
+def threshold_curves(y_true, y_score, cost_fp=COST_FALSE_POSITIVE, cost_fn=COST_FALSE_NEGATIVE):
+    """
+    Confusion counts, precision/recall and cost at every distinct score threshold.
+
+    Scores are sorted once; cumulative sums then give the counts for flagging
+    every transaction scoring at or above each distinct score, so the whole
+    sweep is O(n log n) with no Python loop. The first row is the 'no alerts'
+    operating point (threshold above every score).
+
+    Parameters:
+    y_true (array): True labels, 1 for fraud.
+    y_score (array): Fraud probabilities.
+    cost_fp (float or array): Cost of a false alert, globally or per transaction.
+    cost_fn (float or array): Cost of a missed fraud, globally or per transaction (e.g. its amount).
+
+    Returns:
+    DataFrame: One row per threshold with tp, fp, fn, tn, precision, recall, alert_rate and cost.
+    """
+
+    y_true = np.asarray(y_true).astype(bool)
+    y_score = np.asarray(y_score, dtype=np.float64)
+    n = len(y_score)
+    cost_fp = np.broadcast_to(np.asarray(cost_fp, dtype=np.float64), (n,))
+    cost_fn = np.broadcast_to(np.asarray(cost_fn, dtype=np.float64), (n,))
+
+    # Highest score first; a threshold flags a prefix of this order
+    order = np.argsort(-y_score, kind='stable')
+    score = y_score[order]
+    positive = y_true[order]
+
+    # Only the last row of each run of equal scores is a valid cut
+    cut = np.flatnonzero(np.diff(score, append=-np.inf) != 0)
+    tp = np.cumsum(positive)[cut]
+    fp = (cut + 1) - tp
+    fp_cost = np.cumsum(np.where(positive, 0.0, cost_fp[order]))[cut]
+    caught_cost = np.cumsum(np.where(positive, cost_fn[order], 0.0))[cut]
+
+    # Prepend the operating point that flags nothing
+    total_pos = int(positive.sum())
+    thresholds = np.concatenate([[np.nextafter(score[0], np.inf) if n else 1.0], score[cut]])
+    tp = np.concatenate([[0], tp])
+    fp = np.concatenate([[0], fp])
+    fp_cost = np.concatenate([[0.0], fp_cost])
+    missed_cost = np.where(y_true, cost_fn, 0.0).sum() - np.concatenate([[0.0], caught_cost])
+
+    alerts = tp + fp
+    with np.errstate(invalid='ignore', divide='ignore'):
+        precision = np.where(alerts > 0, tp / np.maximum(alerts, 1), 1.0)
+        recall = tp / total_pos if total_pos else np.zeros(len(tp))
+
+    return pd.DataFrame({
+        'threshold': thresholds,
+        'tp': tp,
+        'fp': fp,
+        'fn': total_pos - tp,
+        'tn': (n - total_pos) - fp,
+        'precision': precision,
+        'recall': recall,
+        'alert_rate': alerts / max(n, 1),
+        'cost': fp_cost + missed_cost,
+    })
+
+
+def choose_threshold(y_true, y_score, cost_fp=COST_FALSE_POSITIVE, cost_fn=COST_FALSE_NEGATIVE,
+                     alert_budget=None):
+    """
+    Pick the operating threshold with the lowest expected cost.
+
+    Parameters:
+    y_true (array): True labels of a held-out set with the real class balance.
+    y_score (array): Fraud probabilities for the same rows.
+    cost_fp (float or array): Cost of a false alert (a manual review).
+    cost_fn (float or array): Cost of a missed fraud, e.g. the transaction amount.
+    alert_budget (float, optional): Maximum fraction of transactions that may be flagged.
+
+    Returns:
+    Tuple: (decision dict with the threshold and its metrics, full curves DataFrame).
+    """
+
+    curves = threshold_curves(y_true, y_score, cost_fp, cost_fn)
+
+    # The budget caps how many reviews the threshold may generate; 'no alerts' always fits
+    eligible = curves if alert_budget is None else curves[curves['alert_rate'] <= alert_budget]
+
+    # Curves run from the highest threshold down, so ties in cost go to the one with fewer alerts
+    best = eligible.loc[eligible['cost'].idxmin()]
+    decision = {
+        'threshold': float(best['threshold']),
+        'expected_cost': float(best['cost']),
+        'precision': float(best['precision']),
+        'recall': float(best['recall']),
+        'alert_rate': float(best['alert_rate']),
+        'tp': int(best['tp']), 'fp': int(best['fp']), 'fn': int(best['fn']), 'tn': int(best['tn']),
+        'cost_fp': float(cost_fp) if np.ndim(cost_fp) == 0 else 'per_transaction',
+        'cost_fn': float(cost_fn) if np.ndim(cost_fn) == 0 else 'per_transaction',
+        'alert_budget': alert_budget,
+    }
+    return decision, curves
+
+
+def threshold_path(model_path):
+    """
+    Path of the operating threshold saved next to a model.
+
+    Parameters:
+    model_path (str): Path of the model's pickle file.
+
+    Returns:
+    str: models/<name>.threshold.json for models/<name>.pkl.
+    """
+
+    return os.path.splitext(model_path)[0] + '.threshold.json'
+
+
+def save_threshold(decision, model_path):
+    """
+    Save a decision from choose_threshold next to the model, atomically.
+
+    Parameters:
+    decision (dict): Output of choose_threshold.
+    model_path (str): Path of the model's pickle file.
+    """
+
+    file_path = threshold_path(model_path)
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'w') as file:
+        json.dump(decision, file, indent=2)
+    os.replace(tmp_path, file_path)
+
+
+def load_threshold(model_path, default=0.5):
+    """
+    Load the operating threshold saved next to a model.
+
+    Parameters:
+    model_path (str): Path of the model's pickle file.
+    default (float): Threshold used when none was saved.
+
+    Returns:
+    float: The operating threshold.
+    """
+
+    file_path = threshold_path(model_path)
+    if not os.path.exists(file_path):
+        return default
+    with open(file_path) as file:
+        return float(json.load(file)['threshold'])
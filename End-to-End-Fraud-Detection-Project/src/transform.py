@@ -0,0 +1,109 @@
+# Import numpy — the only dependency, so scoring an artifact with a transform stays NumPy-only
+import numpy as np
+
+# Seconds in a day — 'Time' is seconds elapsed, so time of day is Time modulo this
+SECONDS_PER_DAY = 86400
+
+
+def feature_layout(input_features, time_col='Time', amount_col='Amount'):
+    """
+    Column layout of the engineered feature matrix.
+
+    Parameters:
+    input_features (list): Raw model inputs, in column order.
+    time_col (str): Time column, in seconds.
+    amount_col (str): Amount column.
+
+    Returns:
+    Tuple: (indices of the columns passed through unchanged, output feature names).
+    """
+
+    input_features = list(input_features)
+    passthrough = [i for i, name in enumerate(input_features) if name not in (time_col, amount_col)]
+    names_out = [input_features[i] for i in passthrough] + ['log_amount', 'time_of_day_sin', 'time_of_day_cos']
+    return passthrough, names_out
+
+
+def engineer_features(X, input_features, passthrough, time_col='Time', amount_col='Amount'):
+    """
+    Build the unscaled feature matrix: passthrough columns, log(1 + Amount) and time of day as sin/cos.
+
+    Parameters:
+    X (ndarray): Raw matrix in input_features order.
+    input_features (list): Raw model inputs, in column order.
+    passthrough (list): Indices of the columns passed through unchanged (see feature_layout).
+    time_col (str): Time column, in seconds.
+    amount_col (str): Amount column.
+
+    Returns:
+    ndarray: float64 matrix of shape (n_rows, len(passthrough) + 3).
+    """
+
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim == 1:
+        X = X.reshape(1, -1)
+    amount = X[:, input_features.index(amount_col)]
+    angle = (2 * np.pi / SECONDS_PER_DAY) * np.mod(X[:, input_features.index(time_col)], SECONDS_PER_DAY)
+
+    out = np.empty((X.shape[0], len(passthrough) + 3))
+    out[:, :len(passthrough)] = X[:, passthrough]
+    out[:, -3] = np.log1p(np.maximum(amount, 0))
+    out[:, -2] = np.sin(angle)
+    out[:, -1] = np.cos(angle)
+    return out
+
+
+class FeatureTransform:
+    """
+    Fitted feature transform for serving: engineered features, then robust scaling.
+
+    The serving counterpart of feat_eng.FeatureTransformer, rebuilt from its
+    get_state output. It only accepts arrays and only imports NumPy, so a
+    LinearScorer with a transform loads without pandas or scikit-learn.
+
+    Parameters:
+    input_features (list): Raw model inputs, in column order.
+    center (array): Per-feature centre (training median).
+    scale (array): Per-feature scale (training interquartile range).
+    time_col (str): Time column, in seconds.
+    amount_col (str): Amount column.
+    """
+
+    def __init__(self, input_features, center, scale, time_col='Time', amount_col='Amount'):
+        self.input_features_ = list(input_features)
+        self.time_col = time_col
+        self.amount_col = amount_col
+        self.center_ = np.asarray(center, dtype=np.float64)
+        self.scale_ = np.asarray(scale, dtype=np.float64)
+        self._passthrough, self.feature_names_out_ = feature_layout(self.input_features_, time_col, amount_col)
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Rebuild the transform from FeatureTransformer.get_state output.
+
+        Parameters:
+        state (dict): The saved state.
+
+        Returns:
+        FeatureTransform: The fitted transform.
+        """
+
+        return cls(state['input_features'], state['center'], state['scale'],
+                   state['time_col'], state['amount_col'])
+
+    def transform(self, X):
+        """
+        Apply the feature transforms and the fitted scaling.
+
+        Parameters:
+        X (ndarray): Raw features in input_features_ order.
+
+        Returns:
+        ndarray: Engineered feature matrix, in feature_names_out_ order.
+        """
+
+        features = engineer_features(X, self.input_features_, self._passthrough, self.time_col, self.amount_col)
+        features -= self.center_
+        features /= self.scale_
+        return features
@@ -0,0 +1,5 @@
+# Import os and sys — tests import the project as 'src.<module>', the same way the pipeline and apps do
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
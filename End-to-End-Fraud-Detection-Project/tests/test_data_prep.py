@@ -0,0 +1,60 @@
+# Import warnings — an evenly spread stream must not warn
+import warnings
+
+# Import numpy and pandas — synthetic transaction chunks
+import numpy as np
+import pandas as pd
+
+# Import pytest — expected warnings
+import pytest
+
+# Import the streaming undersampler under test
+from src.data_prep import stream_undersample
+
+
+def _chunk(n_majority, n_minority, start):
+    # A chunk with a unique 'id' per row, majority rows first
+    labels = np.r_[np.zeros(n_majority, dtype=int), np.ones(n_minority, dtype=int)]
+    return pd.DataFrame({'id': np.arange(start, start + len(labels)), 'Class': labels})
+
+
+def _stream(sizes):
+    # Chunks from (majority rows, minority rows) pairs, with ids continuing across chunks
+    chunks, start = [], 0
+    for n_majority, n_minority in sizes:
+        chunks.append(_chunk(n_majority, n_minority, start))
+        start += n_majority + n_minority
+    return chunks
+
+
+def test_evenly_spread_fraud_gets_the_requested_ratio():
+    chunks = _stream([(20_000, 200)] * 5)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        sample = stream_undersample(chunks, sampling_ratio=2.0)
+
+    counts = sample['Class'].value_counts()
+    assert counts[1] == 1000
+    assert counts[0] == 2000
+    assert sample['id'].is_unique
+
+
+def test_fraud_concentrated_late_warns_about_the_shortfall():
+    # The early chunks set a threshold for ~1 fraud per 1000 rows; the last chunk brings 10x more fraud
+    chunks = _stream([(50_000, 50)] * 4 + [(1_000, 2_000)])
+    with pytest.warns(RuntimeWarning, match=r"Only \d+ of 2200 majority rows could be sampled"):
+        sample = stream_undersample(chunks, sampling_ratio=1.0)
+
+    # Every fraud row is still kept, and the majority part is whatever the buffer could provide
+    counts = sample['Class'].value_counts()
+    assert counts[1] == 2200
+    assert 0 < counts[0] < 2200
+    assert sample['id'].is_unique
+
+
+def test_larger_oversample_factor_avoids_the_shortfall():
+    chunks = _stream([(50_000, 50)] * 4 + [(1_000, 2_000)])
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        sample = stream_undersample(chunks, sampling_ratio=1.0, oversample_factor=50.0)
+    assert (sample['Class'] == 0).sum() == 2200
@@ -0,0 +1,58 @@
+# Import numpy — synthetic transactions
+import numpy as np
+
+# Import the incremental trainer under test
+from src.incremental import latest_checkpoint, load_checkpoint, train_incremental
+
+# Column order of the Kaggle creditcard.csv
+COLUMNS = ['Time'] + [f'V{i}' for i in range(1, 29)] + ['Amount', 'Class']
+
+
+def _rows(n, seed):
+    # Comma-separated rows with about one fraud in ten
+    rng = np.random.default_rng(seed)
+    lines = []
+    for i in range(n):
+        features = ','.join(f'{value:.6f}' for value in rng.normal(size=len(COLUMNS) - 1))
+        lines.append(f"{features},{int(i % 10 == 0)}\n")
+    return ''.join(lines)
+
+
+def _quoted_header():
+    # The Kaggle export quotes every column name: "Time","V1",...,"Class"
+    return ','.join(f'"{column}"' for column in COLUMNS) + '\n'
+
+
+def test_quoted_header_is_parsed_and_appended_rows_are_trained(tmp_path):
+    data_path = tmp_path / 'creditcard.csv'
+    models = str(tmp_path / 'models')
+    data_path.write_text(_quoted_header() + _rows(200, seed=0))
+
+    state = train_incremental(str(data_path), models, chunksize=64)
+    assert state['columns'] == COLUMNS
+    assert state['rows_seen'] == 200
+    assert state['class_counts'].tolist() == [180, 20]
+
+    # Only the rows appended since the checkpoint are folded in on the next run
+    with open(data_path, 'a') as file:
+        file.write(_rows(50, seed=1))
+    state = train_incremental(str(data_path), models, chunksize=64)
+    assert state['rows_seen'] == 250
+    assert state['byte_offset'] == data_path.stat().st_size
+    assert latest_checkpoint(models)[0] == 2
+
+
+def test_header_only_file_still_saves_the_offset_and_columns(tmp_path):
+    data_path = tmp_path / 'creditcard.csv'
+    models = str(tmp_path / 'models')
+    data_path.write_text(_quoted_header())
+
+    train_incremental(str(data_path), models)
+    state = load_checkpoint(models)
+    assert state['columns'] == COLUMNS
+    assert state['byte_offset'] == data_path.stat().st_size
+    assert state['rows_seen'] == 0
+
+    # Nothing changed since, so no further checkpoint is written
+    train_incremental(str(data_path), models)
+    assert latest_checkpoint(models)[0] == 1
@@ -0,0 +1,85 @@
+# Import os, subprocess and sys — the import check runs in a fresh interpreter
+import os
+import subprocess
+import sys
+
+# Import numpy and pandas — synthetic training data
+import numpy as np
+import pandas as pd
+
+# Import LogisticRegression — the reference model the scorer must reproduce
+from sklearn.linear_model import LogisticRegression
+
+# Import the scorer and the training code under test
+from src.feat_eng import FeatureTransformer
+from src.linear_scorer import LinearScorer, export_linear_model
+from src.model import export_model, train_logistic_regression
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _transactions(n_rows=2000, seed=0):
+    # Creditcard-shaped frame: Time, a few V columns and Amount, with a learnable label
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.standard_normal((n_rows, 4)), columns=['V1', 'V2', 'V3', 'V4'])
+    X.insert(0, 'Time', rng.uniform(0, 172_800, n_rows))
+    X['Amount'] = rng.lognormal(3, 1.5, n_rows)
+    y = pd.Series((X['V1'] + 0.5 * X['V2'] + rng.normal(0, 0.5, n_rows) > 1.5).astype(int))
+    return X, y
+
+
+def _fitted_scorer(tmp_path, dtype):
+    # Plain logistic regression on the raw columns, exported and loaded back
+    X, y = _transactions()
+    model = LogisticRegression(max_iter=1000).fit(X, y)
+    export_linear_model(model, str(tmp_path / 'model.npz'))
+    return X, model, LinearScorer.load(str(tmp_path / 'model.npz'), dtype=dtype)
+
+
+def test_float64_matches_predict_proba(tmp_path):
+    X, model, scorer = _fitted_scorer(tmp_path, np.float64)
+    scores = scorer.score(X.to_numpy())
+    assert scores.dtype == np.float64
+    np.testing.assert_allclose(scores, model.predict_proba(X)[:, 1], rtol=1e-10, atol=1e-12)
+
+
+def test_float32_matches_predict_proba_within_single_precision(tmp_path):
+    X, model, scorer = _fitted_scorer(tmp_path, np.float32)
+    scores = scorer.score(X.to_numpy())
+    assert scores.dtype == np.float32
+    np.testing.assert_allclose(scores, model.predict_proba(X)[:, 1], rtol=1e-4, atol=1e-5)
+
+
+def test_score_writes_into_preallocated_buffer(tmp_path):
+    X, model, scorer = _fitted_scorer(tmp_path, np.float64)
+    out = np.full(len(X), np.nan)
+    result = scorer.score(X.to_numpy(), out=out)
+    assert result is out
+    np.testing.assert_allclose(out, model.predict_proba(X)[:, 1], rtol=1e-10, atol=1e-12)
+
+
+def test_artifact_with_transform_matches_pipeline(tmp_path):
+    X, y = _transactions()
+    model = train_logistic_regression(X, y, feature_transformer=FeatureTransformer())
+    model_path = str(tmp_path / 'model.pkl')
+    export_model(model, model_path)
+
+    scorer = LinearScorer.load(str(tmp_path / 'model.npz'))
+    np.testing.assert_allclose(scorer.score(X.to_numpy()), model.predict_proba(X)[:, 1], rtol=1e-10, atol=1e-12)
+
+
+def test_loading_artifact_with_transform_does_not_import_sklearn_or_pandas(tmp_path):
+    X, y = _transactions()
+    model = train_logistic_regression(X, y, feature_transformer=FeatureTransformer())
+    export_model(model, str(tmp_path / 'model.pkl'))
+
+    # A fresh interpreter, so modules imported by this test session do not count
+    code = (
+        "import sys\n"
+        "from src.linear_scorer import LinearScorer\n"
+        f"scorer = LinearScorer.load({str(tmp_path / 'model.npz')!r})\n"
+        "scorer.score([[0.0] * scorer.n_features_in_])\n"
+        "print(sorted(name for name in ('sklearn', 'pandas') if name in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == '[]'
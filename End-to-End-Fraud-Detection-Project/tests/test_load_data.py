@@ -0,0 +1,35 @@
+# Import os — file modification times
+import os
+
+# Import pytest — the cache needs pyarrow
+import pytest
+
+# Import the columnar cache under test
+from src.load_data import load_cached
+
+pytest.importorskip('pyarrow')
+
+
+def _write_csv(path, amounts, mtime_ns):
+    # A small transactions file with a fixed mtime, so rewrites always change the fingerprint
+    path.write_text('Time,Amount,Class\n' + ''.join(f'{i},{amount},0\n' for i, amount in enumerate(amounts)))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_rewriting_a_source_only_removes_its_own_stale_cache(tmp_path):
+    cache_dir = tmp_path / 'cache'
+    sources = {name: tmp_path / name for name in ('creditcard.csv', 'creditcard-eu.csv', 'creditcard-2.csv')}
+    for idx, path in enumerate(sources.values()):
+        _write_csv(path, [1.0 + idx], 1_000_000_000)
+        load_cached(str(path), str(cache_dir))
+    assert len(os.listdir(cache_dir)) == 3
+    before = set(os.listdir(cache_dir))
+
+    # A new version of creditcard.csv replaces its own cache and leaves the other sources' caches alone
+    _write_csv(sources['creditcard.csv'], [5.0, 6.0], 2_000_000_000)
+    assert load_cached(str(sources['creditcard.csv']), str(cache_dir))['Amount'].tolist() == [5.0, 6.0]
+    after = set(os.listdir(cache_dir))
+    assert len(after) == 3
+    assert len(before - after) == 1 and (before - after).pop().startswith('creditcard-')
+    assert sum(name.startswith('creditcard-eu-') for name in after) == 1
+    assert sum(name.startswith('creditcard-2-') for name in after) == 1
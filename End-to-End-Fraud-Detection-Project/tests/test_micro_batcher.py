@@ -0,0 +1,153 @@
+# Import asyncio and threading — the batcher runs on an event loop and scores in a worker thread
+import asyncio
+import threading
+
+# Import pytest — expected exceptions
+import pytest
+
+# Import the batcher under test
+from src.scoring import MicroBatcher
+
+
+class RecordingScorer:
+    # Score function that doubles its inputs and records the size of every batch it was called with
+    def __init__(self, release=None):
+        self.batches = []
+        self.release = release
+
+    def __call__(self, transactions):
+        if self.release is not None:
+            self.release.wait(5)
+        self.batches.append(len(transactions))
+        return [2.0 * transaction for transaction in transactions]
+
+
+async def _score_all(batcher, transactions):
+    try:
+        return await asyncio.gather(*(batcher.score(transaction) for transaction in transactions))
+    finally:
+        await batcher.close()
+
+
+def test_full_batches_are_scored_without_waiting():
+    scorer = RecordingScorer()
+    # A wait far above the test's run time: only max_batch_size can release the batches
+    batcher = MicroBatcher(scorer, max_batch_size=4, max_wait_ms=60_000)
+    results = asyncio.run(asyncio.wait_for(_score_all(batcher, range(8)), 5))
+    assert results == [2.0 * i for i in range(8)]
+    assert scorer.batches == [4, 4]
+
+
+def test_partial_batch_is_scored_after_max_wait():
+    scorer = RecordingScorer()
+    batcher = MicroBatcher(scorer, max_batch_size=100, max_wait_ms=20)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        results = await _score_all(batcher, range(3))
+        return results, loop.time() - start
+
+    results, elapsed = asyncio.run(main())
+    assert results == [0.0, 2.0, 4.0]
+    assert scorer.batches == [3]
+    assert 0.015 <= elapsed < 2.0
+
+
+def test_requests_arriving_during_scoring_form_the_next_batch():
+    release = threading.Event()
+    scorer = RecordingScorer(release)
+    batcher = MicroBatcher(scorer, max_batch_size=100, max_wait_ms=1)
+
+    async def main():
+        first = asyncio.ensure_future(batcher.score(1))
+        await asyncio.sleep(0.05)
+        rest = [asyncio.ensure_future(batcher.score(i)) for i in range(2, 5)]
+        await asyncio.sleep(0.01)
+        release.set()
+        try:
+            return await asyncio.gather(first, *rest)
+        finally:
+            await batcher.close()
+
+    assert asyncio.run(main()) == [2.0, 4.0, 6.0, 8.0]
+    assert scorer.batches == [1, 3]
+
+
+def test_exception_is_raised_for_every_request_in_the_batch():
+    calls = []
+
+    def failing(transactions):
+        calls.append(len(transactions))
+        raise ValueError("model unavailable")
+
+    batcher = MicroBatcher(failing, max_batch_size=3, max_wait_ms=60_000)
+
+    async def main():
+        try:
+            return await asyncio.gather(*(batcher.score(i) for i in range(3)), return_exceptions=True)
+        finally:
+            await batcher.close()
+
+    results = asyncio.run(asyncio.wait_for(main(), 5))
+    assert calls == [3]
+    assert all(isinstance(result, ValueError) and str(result) == "model unavailable" for result in results)
+
+
+def test_batcher_keeps_serving_after_a_failed_batch():
+    outcomes = iter([ValueError("transient"), None])
+
+    def flaky(transactions):
+        error = next(outcomes)
+        if error is not None:
+            raise error
+        return [0.5] * len(transactions)
+
+    batcher = MicroBatcher(flaky, max_batch_size=1, max_wait_ms=0)
+
+    async def main():
+        try:
+            with pytest.raises(ValueError):
+                await batcher.score(1)
+            return await batcher.score(2)
+        finally:
+            await batcher.close()
+
+    assert asyncio.run(main()) == 0.5
+
+
+def test_close_stops_the_worker_and_a_later_score_restarts_it():
+    scorer = RecordingScorer()
+    batcher = MicroBatcher(scorer, max_batch_size=10, max_wait_ms=1)
+
+    async def main():
+        assert await batcher.score(1) == 2.0
+        worker = batcher._worker
+        await batcher.close()
+        assert worker.cancelled() and batcher._worker is None
+
+        # Closing twice is harmless, and the next request starts a fresh worker
+        await batcher.close()
+        try:
+            return await batcher.score(3)
+        finally:
+            await batcher.close()
+
+    assert asyncio.run(main()) == 6.0
+    assert scorer.batches == [1, 1]
+
+
+def test_close_cancels_requests_that_are_queued_or_being_scored():
+    release = threading.Event()
+    scorer = RecordingScorer(release)
+    batcher = MicroBatcher(scorer, max_batch_size=1, max_wait_ms=0)
+
+    async def main():
+        requests = [asyncio.ensure_future(batcher.score(i)) for i in range(3)]
+        await asyncio.sleep(0.05)
+        await batcher.close()
+        release.set()
+        return await asyncio.gather(*requests, return_exceptions=True)
+
+    results = asyncio.run(asyncio.wait_for(main(), 5))
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
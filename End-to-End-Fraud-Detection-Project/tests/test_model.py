@@ -0,0 +1,32 @@
+# Import numpy and pandas — a small synthetic transactions table
+import numpy as np
+import pandas as pd
+
+# Import the cross-validation under test and the pipeline it should evaluate by default
+from src.model import build_logistic_regression, cross_validate_model
+from src.feat_eng import FeatureTransformer
+
+
+def _transactions(n=2000, seed=0):
+    # Creditcard-like columns, where fraud has larger amounts and shifted V1
+    rng = np.random.default_rng(seed)
+    y = (rng.uniform(size=n) < 0.05).astype(np.int8)
+    return pd.DataFrame({
+        'Time': rng.uniform(0, 172_800, size=n),
+        'V1': rng.normal(size=n) + 2.0 * y,
+        'V2': rng.normal(size=n),
+        'Amount': rng.lognormal(3, 1, size=n) * (1 + 4 * y),
+        'Class': y,
+    })
+
+
+def test_default_cross_validation_fits_the_feature_pipeline_per_fold():
+    folds, summary = cross_validate_model(_transactions(), n_splits=3, n_jobs=2)
+    assert list(folds.index) == [0, 1, 2]
+    assert summary.loc['roc_auc', 'mean'] > 0.8
+
+    # The folds are deterministic, so the default must score exactly like the trained pipeline
+    pipeline_folds, _ = cross_validate_model(_transactions(), n_splits=3, n_jobs=2,
+                                             estimator=build_logistic_regression(FeatureTransformer()))
+    metrics = ['pr_auc', 'roc_auc', 'precision', 'recall', 'f1']
+    pd.testing.assert_frame_equal(folds[metrics], pipeline_folds[metrics])
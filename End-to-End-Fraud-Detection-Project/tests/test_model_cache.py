@@ -0,0 +1,53 @@
+# Import os — file modification times drive the reload
+import os
+
+# Import the cache under test and the sidecar writers it reloads with the model
+from src.model_cache import ModelCache
+from src.threshold import save_threshold, threshold_path
+
+
+def _write_model(model_path, name, threshold, mtime_ns):
+    # A model file whose content names the version, with its threshold saved next to it
+    with open(model_path, 'w') as file:
+        file.write(name)
+    save_threshold({'threshold': threshold}, model_path)
+    for path in (model_path, threshold_path(model_path)):
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_get_returns_model_and_threshold_as_one_snapshot(tmp_path):
+    model_path = str(tmp_path / 'model.pkl')
+    _write_model(model_path, 'v1', 0.3, 1_000_000_000)
+    loads = []
+
+    def loader(path):
+        loads.append(path)
+        with open(path) as file:
+            return file.read()
+
+    cache = ModelCache(model_path, loader=loader)
+    model, schema, threshold = cache.get()
+    assert (model, schema, threshold) == ('v1', None, 0.3)
+
+    # Unchanged files: the same snapshot object, nothing reloaded
+    assert cache.get() is cache.get()
+    assert len(loads) == 1
+
+    # A new model and threshold are picked up together
+    _write_model(model_path, 'v2', 0.7, 2_000_000_000)
+    snapshot = cache.get()
+    assert (snapshot.model, snapshot.threshold) == ('v2', 0.7)
+    assert len(loads) == 2
+
+
+def test_saving_a_new_model_drops_the_previous_artifact(tmp_path):
+    # Import the model writer here — it pulls in scikit-learn, which the other tests do not need
+    from src.model import save_model
+
+    model_path = str(tmp_path / 'model.pkl')
+    (tmp_path / 'model.npz').write_bytes(b'artifact of the previous model')
+
+    # Without an export the cache must serve the new pickle, not the old artifact next to it
+    save_model({'version': 2}, str(tmp_path), 'model.pkl', export=False)
+    assert not (tmp_path / 'model.npz').exists()
+    assert ModelCache(model_path).get().model == {'version': 2}
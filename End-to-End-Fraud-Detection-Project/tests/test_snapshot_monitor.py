@@ -0,0 +1,61 @@
+# Import os — baseline modification times
+import os
+
+# Import numpy and pandas — synthetic features and scores
+import numpy as np
+import pandas as pd
+
+# Import the monitor under test and the snapshot and baseline helpers it is built from
+from serve import SnapshotMonitor
+from src.model_cache import ModelSnapshot
+from src.monitoring import baseline_path, build_baseline, save_baseline
+
+
+class FakeModel:
+    # Only the feature layout matters to the monitor
+    def __init__(self, names):
+        self.feature_names_in_ = np.asarray(names, dtype=object)
+
+
+def _save(model_path, names, mtime_ns):
+    # A baseline over uniform features and scores, with a fixed mtime
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.uniform(size=(1000, len(names))), columns=names)
+    save_baseline(build_baseline(X, rng.uniform(size=1000)), model_path)
+    os.utime(baseline_path(model_path), ns=(mtime_ns, mtime_ns))
+    return ModelSnapshot(FakeModel(names), None, 0.5)
+
+
+def test_monitor_follows_a_reload_to_a_new_feature_layout(tmp_path):
+    model_path = str(tmp_path / 'model.pkl')
+    first = _save(model_path, ['Time', 'V1', 'Amount'], 1_000_000_000)
+    monitors = SnapshotMonitor(model_path)
+
+    monitor = monitors.get(first)
+    assert monitors.get(first) is monitor
+    monitor.observe(np.full((4, 3), 0.5), np.full(4, 0.5))
+    assert monitor.report()['rows'] == 4
+
+    # The reloaded model has more features in another order; its monitor uses the new baseline's bins
+    second = _save(model_path, ['V2', 'Amount', 'V1', 'Time'], 2_000_000_000)
+    reloaded = monitors.get(second)
+    assert reloaded is not monitor
+    assert reloaded.features == ['V2', 'Amount', 'V1', 'Time']
+
+    # The shared counters were cleared for the new baseline and are reused, not reallocated
+    assert reloaded.report()['rows'] == 0
+    assert reloaded._counts is monitor._counts
+
+    # Values far above the baseline land in the last bin of exactly the column they were sent in
+    rng = np.random.default_rng(1)
+    X = rng.uniform(size=(500, 4))
+    X[:, 0] = 10.0
+    reloaded.observe(X, rng.uniform(size=500))
+    drift = reloaded.report()['drift']
+    assert drift['V2']['ks'] > 0.8
+    assert drift['Time']['ks'] < 0.2
+
+
+def test_model_without_a_baseline_has_no_monitor(tmp_path):
+    monitors = SnapshotMonitor(str(tmp_path / 'model.pkl'))
+    assert monitors.get(ModelSnapshot(FakeModel(['V1']), None, 0.5)) is None
@@ -1,11 +1,13 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, Response, stream_with_context
 from src.helper import download_hugging_face_embeddings
-from langchain_pinecone import PineconeVectorStore
-from langchain.chains import create_retrieval_chain
-from langchain.chains.combine_documents import create_stuff_documents_chain
+from src.vector_index import LocalVectorStore, VECTOR_BACKEND, LOCAL_INDEX_PATH
+from src.bm25 import BM25Index, HybridRetriever, BM25_INDEX_PATH, CANDIDATES
 from langchain_core.prompts import ChatPromptTemplate
 from src.prompt import *
-from anthropic import Anthropic
+from src.response_cache import SemanticCache
+from src.llm import ClaudeLLM, FakeLLM, sse_event
+from src.serving import BackgroundLoop, ChatService, UpstreamTimeout
+from anthropic import Anthropic, AsyncAnthropic
 from dotenv import load_dotenv
 import os
 
@@ -15,30 +17,42 @@ app = Flask(__name__)
 # Load environment variables from .env file
 load_dotenv()
 
-# Retrieve Pinecone API key from environment
-PINECONE_API_KEY = os.environ.get('PINECONE_API_KEY')
-os.environ["PINECONE_API_KEY"] = PINECONE_API_KEY  # Ensure it's set for downstream usage
-
 # Initialize HuggingFace embedding model
 embeddings = download_hugging_face_embeddings()
 
-# Define Pinecone index name
-index_name = "medicalbot"
+if VECTOR_BACKEND == "local":
+    # Load the local index built by store_index.py (memory-mapped, no network round trip per query)
+    docsearch = LocalVectorStore.load(embeddings, path=LOCAL_INDEX_PATH)
+else:
+    from langchain_pinecone import PineconeVectorStore
 
-# Load existing Pinecone index and bind to LangChain
-docsearch = PineconeVectorStore.from_existing_index(
-    index_name=index_name,
-    embedding=embeddings
-)
+    # Retrieve Pinecone API key from environment
+    PINECONE_API_KEY = os.environ.get('PINECONE_API_KEY')
+    os.environ["PINECONE_API_KEY"] = PINECONE_API_KEY  # Ensure it's set for downstream usage
 
-# Convert vector store to retriever
-retriever = docsearch.as_retriever(
-    search_type="similarity",
-    search_kwargs={"k": 3}
-)
+    # Define Pinecone index name
+    index_name = "medicalbot"
+
+    # Load existing Pinecone index and bind to LangChain
+    docsearch = PineconeVectorStore.from_existing_index(
+        index_name=index_name,
+        embedding=embeddings
+    )
 
-# Hardcoded Anthropic API key for Claude
-client = Anthropic(api_key="")
+# Convert vector store to retriever
+# With a BM25 index from store_index.py, dense and keyword search run in parallel and are fused with
+# reciprocal-rank fusion, so exact drug names, dosages and codes are found even when embeddings miss them
+if os.environ.get("RETRIEVAL_MODE", "hybrid").lower() == "hybrid" and os.path.exists(os.path.join(BM25_INDEX_PATH, "segments.json")):
+    retriever = HybridRetriever(
+        dense_retriever=docsearch.as_retriever(search_type="similarity", search_kwargs={"k": CANDIDATES}),
+        bm25_index=BM25Index(BM25_INDEX_PATH),
+        k=3,
+    )
+else:
+    retriever = docsearch.as_retriever(
+        search_type="similarity",
+        search_kwargs={"k": 3}
+    )
 
 # Define prompt structure
 prompt = ChatPromptTemplate.from_messages([
@@ -46,25 +60,36 @@ prompt = ChatPromptTemplate.from_messages([
     ("human", "{input}"),
 ])
 
-# Claude-compatible wrapper for LangChain's LLM interface
-def claude_llm(input_prompt):
-    if hasattr(input_prompt, "to_string"):
-        input_text = input_prompt.to_string()
-    else:
-        input_text = str(input_prompt)
-
-    response = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=1024,
-        messages=[{"role": "user", "content": input_text}]
-    )
-    return response.content[0].text
+# Claude-compatible wrapper for LangChain's LLM interface; it also streams tokens for /stream
+# LLM_BACKEND=fake swaps in a local fake model for tests and offline runs
+if os.environ.get("LLM_BACKEND", "claude").lower() == "fake":
+    claude_llm = FakeLLM()
+else:
+    # Hardcoded Anthropic API key for Claude; one sync and one async client, each with its own connection pool
+    client = Anthropic(api_key="")
+    async_client = AsyncAnthropic(api_key="")
+    claude_llm = ClaudeLLM(client, async_client=async_client)
+
+# Cache of recent answers, matched on question similarity; emptied when store_index.py re-indexes
+response_cache = SemanticCache(
+    threshold=float(os.environ.get("CACHE_SIMILARITY", 0.95)),
+    ttl=float(os.environ.get("CACHE_TTL_SECONDS", 24 * 60 * 60)),
+)
 
-# Create document combination chain
-question_answer_chain = create_stuff_documents_chain(llm=claude_llm, prompt=prompt)
+# Async request handling: one event loop shared by all request threads runs retrieval and generation,
+# with per-upstream concurrency limits and timeouts, and identical in-flight questions answered once
+chat_service = ChatService(
+    embeddings, retriever, prompt, claude_llm, response_cache=response_cache,
+    retrieval_concurrency=int(os.environ.get("RETRIEVAL_CONCURRENCY", 16)),
+    retrieval_timeout=float(os.environ.get("RETRIEVAL_TIMEOUT", 10)),
+    llm_concurrency=int(os.environ.get("LLM_CONCURRENCY", 8)),
+    llm_timeout=float(os.environ.get("LLM_TIMEOUT", 60)),
+)
+event_loop = BackgroundLoop()
 
-# Create full RAG chain
-rag_chain = create_retrieval_chain(retriever, question_answer_chain)
+# Function to answer a question, reusing the answer to an almost identical earlier question
+def answer_question(msg):
+    return event_loop.run(chat_service.answer(msg))
 
 # Route for chatbot UI
 @app.route("/")
@@ -76,10 +101,44 @@ def index():
 def chat():
     msg = request.form["msg"]
     print("User input:", msg)
-    response = rag_chain.invoke({"input": msg})
-    print("Response:", response["answer"])
-    return str(response["answer"])
+    try:
+        answer, sources = answer_question(msg)
+    except UpstreamTimeout as exc:
+        print("Timeout:", exc)
+        return "Sorry, the assistant is taking too long to respond. Please try again.", 504
+    print("Response:", answer)
+    return str(answer)
+
+# Route that streams the answer as Server-Sent Events while Claude generates it
+# Each event carries {"token": ...}; a final "done" event carries the sources
+# Retrieval and generation run on the shared event loop, under the same limits and timeouts as /get
+@app.route("/stream", methods=["GET", "POST"])
+def chat_stream():
+    msg = request.values["msg"]
+    print("User input (stream):", msg)
+
+    def generate():
+        # Forward every piece of text as soon as it arrives
+        parts = []
+        try:
+            for kind, value in event_loop.iterate(chat_service.stream(msg)):
+                if kind == "token":
+                    parts.append(value)
+                    yield sse_event({"token": value})
+                else:
+                    print("Response:", "".join(parts))
+                    yield sse_event({"sources": value}, event="done")
+        except UpstreamTimeout as exc:
+            print("Timeout:", exc)
+            yield sse_event({"error": "The assistant is taking too long to respond. Please try again."}, event="error")
+        except Exception as exc:
+            print("Streaming error:", exc)
+            yield sse_event({"error": "The answer could not be generated."}, event="error")
+
+    # Disable proxy buffering so tokens reach the browser immediately
+    return Response(stream_with_context(generate()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 # Run Flask app
 if __name__ == '__main__':
-    app.run(host="0.0.0.0", port=8080, debug=True)
+    app.run(host="0.0.0.0", port=8080, debug=True, threaded=True)
@@ -0,0 +1,297 @@
+# Import standard libraries for the on-disk layout, tokenization, atomic writes and parallel retrieval
+import asyncio
+import json
+import os
+import re
+import shutil
+import threading
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+# Import NumPy for memory-mapped postings and vectorized scoring
+import numpy as np
+
+# Import LangChain's document and retriever interfaces, so the hybrid retriever plugs into ChatService like any retriever
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+
+# Directory of the local BM25 index
+BM25_INDEX_PATH = os.environ.get('BM25_INDEX_PATH', '.bm25_index')
+
+# BM25 parameters (the usual defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Segments are merged into one once there are more than this many
+MAX_SEGMENTS = 8
+
+# Times a reload re-reads segments.json when a writer removes the segments it lists while they are opened
+RELOAD_ATTEMPTS = 3
+
+# Reciprocal-rank fusion constant and candidates taken from each retriever before fusing
+RRF_K = 60
+CANDIDATES = 20
+
+# Words, numbers and compound terms such as drug codes, dosages and ICD codes ("e11.9", "5-mg", "co-amoxiclav")
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[.\-/][a-z0-9]+)*")
+
+# Threads that run BM25 next to the dense query
+_SEARCH_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="bm25")
+
+
+# Function to split text into lowercase terms
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+# One immutable batch of documents: a term dictionary plus postings and term frequencies in .npy files
+# The arrays are loaded with mmap_mode='r', so opening an index reads only the pages a query touches
+class Segment:
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(path)
+        with open(os.path.join(path, 'terms.json')) as f:
+            self.terms = json.load(f)
+        with open(os.path.join(path, 'docs.json')) as f:
+            docs = json.load(f)
+        self.ids, self.texts, self.metadatas = docs['ids'], docs['texts'], docs['metadatas']
+        self.postings = np.load(os.path.join(path, 'postings.npy'), mmap_mode='r')
+        self.freqs = np.load(os.path.join(path, 'freqs.npy'), mmap_mode='r')
+        self.lengths = np.load(os.path.join(path, 'lengths.npy'))
+
+    def __len__(self):
+        return len(self.ids)
+
+    # Function to write a segment for a batch of documents
+    @staticmethod
+    def write(path, ids, texts, metadatas):
+        postings = {}
+        lengths = np.zeros(len(texts), dtype=np.int32)
+        for doc, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            lengths[doc] = sum(counts.values())
+            for term, count in counts.items():
+                postings.setdefault(term, []).append((doc, count))
+
+        # Postings of all terms back to back; the dictionary maps a term to [offset, document frequency]
+        terms, doc_ids, freqs, offset = {}, [], [], 0
+        for term in sorted(postings):
+            entries = postings[term]
+            terms[term] = [offset, len(entries)]
+            doc_ids += [doc for doc, _ in entries]
+            freqs += [count for _, count in entries]
+            offset += len(entries)
+
+        tmp_path = f"{path}.tmp"
+        os.makedirs(tmp_path, exist_ok=True)
+        np.save(os.path.join(tmp_path, 'postings.npy'), np.asarray(doc_ids, dtype=np.int32))
+        np.save(os.path.join(tmp_path, 'freqs.npy'), np.minimum(np.asarray(freqs, dtype=np.int64), 65535).astype(np.uint16))
+        np.save(os.path.join(tmp_path, 'lengths.npy'), lengths)
+        with open(os.path.join(tmp_path, 'terms.json'), 'w') as f:
+            json.dump(terms, f)
+        with open(os.path.join(tmp_path, 'docs.json'), 'w') as f:
+            json.dump({'ids': ids, 'texts': texts, 'metadatas': metadatas}, f)
+        os.rename(tmp_path, path)
+        return Segment(path)
+
+
+# BM25 index over the same chunks as the vector index, built incrementally
+# Every add_documents call writes a new segment; deletes and replaced IDs are recorded as tombstones.
+# segments.json lists the live segments and tombstones and is replaced atomically after every change.
+class BM25Index:
+    def __init__(self, path=BM25_INDEX_PATH, k1=BM25_K1, b=BM25_B, max_segments=MAX_SEGMENTS):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.max_segments = max_segments
+        self.segments = []
+        self.deleted = {}
+        self._lock = threading.Lock()
+        self._state_mtime = None
+        self.reload()
+
+    def __len__(self):
+        return sum(len(segment) for segment in self.segments) - sum(len(docs) for docs in self.deleted.values())
+
+    # Function to pick up changes written by another process (e.g. store_index.py while the app runs)
+    def reload(self):
+        state_file = os.path.join(self.path, 'segments.json')
+        with self._lock:
+            for _ in range(RELOAD_ATTEMPTS):
+                try:
+                    mtime = os.stat(state_file).st_mtime_ns
+                except OSError:
+                    return
+                if mtime == self._state_mtime:
+                    return
+                try:
+                    with open(state_file) as f:
+                        state = json.load(f)
+                    loaded = {segment.name: segment for segment in self.segments}
+                    segments = [loaded.get(name) or Segment(os.path.join(self.path, name)) for name in state['segments']]
+                except FileNotFoundError:
+                    # A merge or rebuild replaced this state and removed its segments; read the newer state
+                    continue
+                self.segments = segments
+                self.deleted = {name: set(docs) for name, docs in state['deleted'].items()}
+                self._state_mtime = mtime
+                return
+
+    # Function to persist the segment list and tombstones, then remove segments no longer listed
+    def _save_state(self):
+        os.makedirs(self.path, exist_ok=True)
+        state = {'segments': [segment.name for segment in self.segments],
+                 'deleted': {name: sorted(docs) for name, docs in self.deleted.items() if docs}}
+        tmp_path = os.path.join(self.path, 'segments.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, os.path.join(self.path, 'segments.json'))
+        self._state_mtime = os.stat(os.path.join(self.path, 'segments.json')).st_mtime_ns
+
+        live = set(state['segments'])
+        for name in os.listdir(self.path):
+            if name.startswith('seg-') and name not in live:
+                shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+
+    # Function to mark every live copy of the given IDs as deleted
+    def _tombstone(self, ids):
+        ids = set(ids)
+        for segment in self.segments:
+            dead = self.deleted.setdefault(segment.name, set())
+            dead.update(doc for doc, vector_id in enumerate(segment.ids) if vector_id in ids)
+
+    # Function to merge all segments into one, dropping deleted documents
+    def _merge(self):
+        ids, texts, metadatas = [], [], []
+        for segment in self.segments:
+            dead = self.deleted.get(segment.name, set())
+            for doc in range(len(segment)):
+                if doc not in dead:
+                    ids.append(segment.ids[doc])
+                    texts.append(segment.texts[doc])
+                    metadatas.append(segment.metadatas[doc])
+        merged = Segment.write(os.path.join(self.path, f"seg-{uuid.uuid4().hex}"), ids, texts, metadatas)
+        self.segments = [merged]
+        self.deleted = {}
+
+    # Function to return the IDs of every live (not deleted) document
+    def ids(self):
+        self.reload()
+        with self._lock:
+            return {segment.ids[doc] for segment in self.segments
+                    for doc in range(len(segment)) if doc not in self.deleted.get(segment.name, ())}
+
+    # Function to replace the whole index with the given documents, written as one segment
+    def rebuild(self, documents, ids):
+        documents, ids = list(documents), list(ids)
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            segment = Segment.write(os.path.join(self.path, f"seg-{uuid.uuid4().hex}"), ids,
+                                    [doc.page_content for doc in documents],
+                                    [dict(doc.metadata) for doc in documents])
+            self.segments = [segment]
+            self.deleted = {}
+            self._save_state()
+        return ids
+
+    # Function to index documents (existing IDs are replaced); same signature as a LangChain vector store
+    def add_documents(self, documents, ids=None, **kwargs):
+        documents = list(documents)
+        if not documents:
+            return []
+        ids = list(ids) if ids is not None else [uuid.uuid4().hex for _ in documents]
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            self._tombstone(ids)
+            segment = Segment.write(os.path.join(self.path, f"seg-{uuid.uuid4().hex}"), ids,
+                                    [doc.page_content for doc in documents],
+                                    [dict(doc.metadata) for doc in documents])
+            self.segments.append(segment)
+            if len(self.segments) > self.max_segments:
+                self._merge()
+            self._save_state()
+        return ids
+
+    # Function to delete documents by ID
+    def delete(self, ids=None, **kwargs):
+        if not ids:
+            return False
+        with self._lock:
+            self._tombstone(ids)
+            self._save_state()
+        return True
+
+    # Function to return the k best (Document, BM25 score) pairs for a query
+    def search(self, query, k=CANDIDATES):
+        terms = list(dict.fromkeys(tokenize(query)))
+        self.reload()
+        with self._lock:
+            segments, deleted = list(self.segments), {name: set(docs) for name, docs in self.deleted.items()}
+        n_docs = sum(len(segment) for segment in segments)
+        if not terms or n_docs == 0:
+            return []
+
+        # Collection statistics across segments (tombstoned documents still count, as in Lucene)
+        # Documents without a single token give an average length of 0; use 1 so the length norm stays finite
+        avg_length = sum(int(segment.lengths.sum()) for segment in segments) / n_docs or 1.0
+        df = {term: sum(segment.terms[term][1] for segment in segments if term in segment.terms) for term in terms}
+        idf = {term: np.log(1 + (n_docs - df[term] + 0.5) / (df[term] + 0.5)) for term in terms if df[term]}
+
+        results = []
+        for segment in segments:
+            scores = np.zeros(len(segment), dtype=np.float64)
+            norm = self.k1 * (1 - self.b + self.b * segment.lengths / avg_length)
+            for term, weight in idf.items():
+                entry = segment.terms.get(term)
+                if entry is None:
+                    continue
+                offset, count = entry
+                docs = np.asarray(segment.postings[offset:offset + count])
+                tf = np.asarray(segment.freqs[offset:offset + count], dtype=np.float64)
+                scores[docs] += weight * tf * (self.k1 + 1) / (tf + norm[docs])
+
+            dead = deleted.get(segment.name)
+            if dead:
+                scores[list(dead)] = 0.0
+            hits = np.flatnonzero(scores)
+            if len(hits) > k:
+                hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+            results += [(float(scores[doc]), segment, int(doc)) for doc in hits]
+
+        results.sort(key=lambda item: -item[0])
+        return [(Document(page_content=segment.texts[doc], metadata=segment.metadatas[doc], id=segment.ids[doc]), score)
+                for score, segment, doc in results[:k]]
+
+
+# Function to fuse ranked lists with reciprocal-rank fusion; documents are matched on their text
+def reciprocal_rank_fusion(rankings, k=RRF_K):
+    scores, documents = {}, {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking):
+            scores[doc.page_content] = scores.get(doc.page_content, 0.0) + 1.0 / (k + rank + 1)
+            documents.setdefault(doc.page_content, doc)
+    order = sorted(scores, key=lambda key: -scores[key])
+    return [documents[key] for key in order]
+
+
+# Retriever that runs the dense retriever and BM25 in parallel and returns the top k after RRF
+# The dense retriever should return 'candidates' results (e.g. docsearch.as_retriever(search_kwargs={"k": 20}))
+class HybridRetriever(BaseRetriever):
+    dense_retriever: BaseRetriever
+    bm25_index: object
+    k: int = 3
+    candidates: int = CANDIDATES
+    rrf_k: int = RRF_K
+
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        # BM25 runs in a pool thread while this thread waits on the dense query
+        sparse = _SEARCH_EXECUTOR.submit(self.bm25_index.search, query, self.candidates)
+        rankings = [self.dense_retriever.invoke(query), [doc for doc, _ in sparse.result()]]
+        return reciprocal_rank_fusion(rankings, self.rrf_k)[:self.k]
+
+    async def _aget_relevant_documents(self, query, *, run_manager=None):
+        dense, sparse = await asyncio.gather(self.dense_retriever.ainvoke(query),
+                                             asyncio.to_thread(self.bm25_index.search, query, self.candidates))
+        return reciprocal_rank_fusion([dense, [doc for doc, _ in sparse]], self.rrf_k)[:self.k]
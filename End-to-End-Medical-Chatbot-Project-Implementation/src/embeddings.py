@@ -0,0 +1,225 @@
+# Import standard libraries for content hashing, cache files and cross-process locking
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are still serialized within one process
+    fcntl = None
+
+# Import NumPy for the memory-mapped vector store
+import numpy as np
+
+# Import the LangChain embeddings interface, so the cache is a drop-in replacement for HuggingFaceEmbeddings
+from langchain_core.embeddings import Embeddings
+
+
+# Default model, batch size and cache location
+MODEL_NAME = 'sentence-transformers/all-MiniLM-L6-v2'
+BATCH_SIZE = 64
+CACHE_DIR = '.embedding_cache'
+
+# Query embeddings kept in memory (most recently used first); queries are never written to disk
+QUERY_CACHE_SIZE = 1024
+
+# Supported storage types for cached vectors (int8 uses one float32 scale per vector)
+STORAGE_DTYPES = ('float32', 'float16', 'int8')
+
+# Bytes of the SHA-256 digest used as cache key
+KEY_BYTES = 16
+
+
+# Function to compute the cache key of a text for a given model
+def content_key(model_name, text):
+    return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).digest()[:KEY_BYTES]
+
+
+# Persistent, content-addressed store of embedding vectors in a single append-only file
+# Each record holds the key, a scale (int8 only) and the vector; the file is read through np.memmap
+class EmbeddingCache:
+    def __init__(self, path, dim, storage='float32'):
+        if storage not in STORAGE_DTYPES:
+            raise ValueError(f"storage must be one of {STORAGE_DTYPES}, got {storage!r}")
+        self.path = path
+        self.dim = dim
+        self.storage = storage
+        self.record = np.dtype([('key', f'S{KEY_BYTES}'), ('scale', 'f4'), ('vector', storage, (dim,))])
+        self._lock = threading.Lock()
+        self._index = {}
+        self._rows = 0
+        self._data = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Header next to the data file, so a cache is never read with the wrong layout
+        header_path = f"{path}.json"
+        header = {'dim': dim, 'storage': storage, 'record_bytes': self.record.itemsize}
+        if os.path.exists(header_path):
+            with open(header_path) as f:
+                if json.load(f) != header:
+                    raise ValueError(f"Embedding cache {path} was written with a different layout")
+        else:
+            with open(f"{header_path}.tmp", "w") as f:
+                json.dump(header, f)
+            os.replace(f"{header_path}.tmp", header_path)
+        self.refresh()
+
+    def __len__(self):
+        return self._rows
+
+    # Function to pick up records appended since the last call (also by other processes)
+    def refresh(self):
+        with self._lock:
+            size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+            # A partially written trailing record (interrupted run) is ignored
+            rows = size // self.record.itemsize
+            if rows == self._rows:
+                return
+            self._data = np.memmap(self.path, dtype=self.record, mode='r', shape=(rows,))
+            for row, key in enumerate(self._data['key'][self._rows:], start=self._rows):
+                self._index.setdefault(bytes(key), row)
+            self._rows = rows
+
+    # Function to look up many keys; returns float32 vectors and the positions that were not cached
+    def get_many(self, keys):
+        out = np.zeros((len(keys), self.dim), dtype=np.float32)
+        rows = [self._index.get(key) for key in keys]
+        hit = [i for i, row in enumerate(rows) if row is not None]
+        missing = [i for i, row in enumerate(rows) if row is None]
+        if hit:
+            records = self._data[[rows[i] for i in hit]]
+            vectors = records['vector'].astype(np.float32)
+            if self.storage == 'int8':
+                vectors *= records['scale'][:, None]
+            out[hit] = vectors
+        return out, missing
+
+    # Function to append new vectors; keys already present are skipped
+    def put_many(self, keys, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        fresh = [i for i, key in enumerate(keys) if key not in self._index]
+        if not fresh:
+            return
+        records = np.zeros(len(fresh), dtype=self.record)
+        records['key'] = [keys[i] for i in fresh]
+        if self.storage == 'int8':
+            # Symmetric per-vector quantization: largest magnitude maps to 127
+            scale = np.abs(vectors[fresh]).max(axis=1) / 127.0
+            scale[scale == 0] = 1.0
+            records['scale'] = scale
+            records['vector'] = np.round(vectors[fresh] / scale[:, None]).astype(np.int8)
+        else:
+            records['scale'] = 1.0
+            records['vector'] = vectors[fresh]
+
+        # Whole records are appended under an exclusive lock, so concurrent indexers never interleave
+        with self._lock, open(self.path, 'ab') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.write(records.tobytes())
+                f.flush()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+        self.refresh()
+
+
+# Embeddings wrapper that batches inference on CPU and serves repeated texts from the cache
+# Corpus chunks go to the persistent cache; user questions only to a bounded in-memory LRU, so they never reach disk
+# The model is loaded only on the first cache miss, so a warm replica starts without loading it
+class CachedEmbeddings(Embeddings):
+    def __init__(self, model_name=MODEL_NAME, batch_size=BATCH_SIZE, num_threads=None,
+                 cache_dir=CACHE_DIR, storage='float32', device='cpu', query_cache_size=QUERY_CACHE_SIZE):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.num_threads = num_threads
+        self.cache_dir = cache_dir
+        self.storage = storage
+        self.device = device
+        self.query_cache_size = query_cache_size
+        self._model = None
+        self._cache = None
+        self._lock = threading.Lock()
+        self._queries = OrderedDict()
+        self._query_lock = threading.Lock()
+
+    # Function to load the HuggingFace model on first use
+    def _get_model(self):
+        with self._lock:
+            if self._model is None:
+                if self.num_threads:
+                    # Intra-op threads used by PyTorch for CPU inference
+                    import torch
+                    torch.set_num_threads(self.num_threads)
+                from langchain.embeddings import HuggingFaceEmbeddings
+                self._model = HuggingFaceEmbeddings(model_name=self.model_name,
+                                                    model_kwargs={'device': self.device},
+                                                    encode_kwargs={'batch_size': self.batch_size})
+            return self._model
+
+    # Function to open the cache file once the embedding size is known
+    def _get_cache(self, dim=None):
+        if self._cache is None and self.cache_dir:
+            slug = self.model_name.replace('/', '--')
+            path = os.path.join(self.cache_dir, f"{slug}-{self.storage}.bin")
+            if dim is None:
+                if not os.path.exists(f"{path}.json"):
+                    return None
+                with open(f"{path}.json") as f:
+                    dim = json.load(f)['dim']
+            self._cache = EmbeddingCache(path, dim, self.storage)
+        return self._cache
+
+    # Function to embed a list of texts, computing only the ones not in the cache
+    def embed_documents(self, texts):
+        texts = list(texts)
+        if not texts:
+            return []
+
+        # Identical texts in one call are embedded once
+        unique = list(dict.fromkeys(texts))
+        keys = [content_key(self.model_name, text) for text in unique]
+
+        cache = self._get_cache()
+        if cache is not None:
+            cache.refresh()
+            vectors, missing = cache.get_many(keys)
+        else:
+            vectors, missing = None, list(range(len(unique)))
+
+        if missing:
+            computed = np.asarray(self._get_model().embed_documents([unique[i] for i in missing]), dtype=np.float32)
+            if vectors is None:
+                vectors = np.zeros((len(unique), computed.shape[1]), dtype=np.float32)
+            cache = self._get_cache(dim=computed.shape[1])
+            if cache is not None:
+                cache.put_many([keys[i] for i in missing], computed)
+                # Return what the cache will serve next time, so cached and fresh results agree
+                computed, _ = cache.get_many([keys[i] for i in missing])
+            vectors[missing] = computed
+
+        position = {text: i for i, text in enumerate(unique)}
+        return [vectors[position[text]].tolist() for text in texts]
+
+    # Function to embed a single query; repeated questions are served from the in-memory LRU
+    def embed_query(self, text):
+        with self._query_lock:
+            vector = self._queries.get(text)
+            if vector is not None:
+                self._queries.move_to_end(text)
+                return list(vector)
+
+        vector = tuple(np.asarray(self._get_model().embed_query(text), dtype=np.float32).tolist())
+        with self._query_lock:
+            self._queries[text] = vector
+            self._queries.move_to_end(text)
+            while len(self._queries) > self.query_cache_size:
+                self._queries.popitem(last=False)
+        return list(vector)
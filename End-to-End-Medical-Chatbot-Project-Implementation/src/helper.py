@@ -4,8 +4,8 @@ from langchain.document_loaders import PyPDFLoader, DirectoryLoader
 # Import a text splitter that recursively breaks documents into manageable chunks
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
-# Import HuggingFace embedding model wrapper for vector representation of text
-from langchain.embeddings import HuggingFaceEmbeddings
+# Import the batched, disk-cached wrapper around the HuggingFace embedding model
+from src.embeddings import CachedEmbeddings, BATCH_SIZE, CACHE_DIR
 
 
 # Function to extract data from all PDF files in a given directory
@@ -38,9 +38,16 @@ def text_split(extracted_data):
 
 
 # Function to download and initialize a HuggingFace embedding model
-def download_hugging_face_embeddings():
+# Embeddings are computed in batches of 'batch_size' on 'num_threads' CPU threads and cached on disk in 'cache_dir'
+# (keyed by a hash of the text), so re-indexing and new replicas mostly read vectors instead of running the model.
+# 'storage' can be 'float16' or 'int8' to halve or quarter the cache size; pass cache_dir=None to disable the cache.
+def download_hugging_face_embeddings(batch_size=BATCH_SIZE, num_threads=None, cache_dir=CACHE_DIR, storage='float32'):
     # Load the 'all-MiniLM-L6-v2' model from HuggingFace, which produces 384-dimensional embeddings
-    embeddings = HuggingFaceEmbeddings(model_name='sentence-transformers/all-MiniLM-L6-v2')
+    embeddings = CachedEmbeddings(model_name='sentence-transformers/all-MiniLM-L6-v2',
+                                  batch_size=batch_size,
+                                  num_threads=num_threads,
+                                  cache_dir=cache_dir,
+                                  storage=storage)
 
     # Return the initialized embedding model
     return embeddings
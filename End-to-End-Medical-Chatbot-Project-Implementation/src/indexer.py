@@ -0,0 +1,190 @@
+# Import standard libraries for chunk IDs, retries with jitter, timing and the upsert worker pool
+import hashlib
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Defaults: chunks per embedding/upsert batch, concurrent upsert requests, and batches allowed in flight
+BATCH_SIZE = 100
+CONCURRENCY = 4
+MAX_PENDING = 8
+
+# Retry policy for failed upserts: attempts and base delay of the exponential backoff (seconds)
+MAX_RETRIES = 5
+RETRY_BACKOFF = 0.5
+
+# Seconds between progress lines
+REPORT_EVERY = 5.0
+
+# Metadata key under which the chunk text is stored (the key PineconeVectorStore reads back)
+TEXT_KEY = "text"
+
+
+# Function to build a deterministic ID from a chunk's content, so re-indexing the same chunk overwrites it
+def chunk_id(document):
+    source = document.metadata.get("source", "")
+    return hashlib.sha256(f"{source}\0{document.page_content}".encode("utf-8")).hexdigest()[:32]
+
+
+# Writes vectors to a Pinecone index (the gRPC client multiplexes concurrent requests over its channel)
+class PineconeSink:
+    def __init__(self, index, namespace=None):
+        self.index = index
+        self.namespace = namespace
+
+    def upsert(self, ids, vectors, metadatas):
+        records = [{"id": vector_id, "values": list(vector), "metadata": metadata}
+                   for vector_id, vector, metadata in zip(ids, vectors, metadatas)]
+        self.index.upsert(vectors=records, namespace=self.namespace)
+
+    def delete(self, ids):
+        self.index.delete(ids=list(ids), namespace=self.namespace)
+
+
+# Local stand-in for a vector index, for tests and dry runs
+# It can simulate request latency and fail the first 'fail_first' upserts to exercise the retry path
+class InMemoryIndex:
+    def __init__(self, latency=0.0, fail_first=0):
+        self.latency = latency
+        self.fail_first = fail_first
+        self.vectors = {}
+        self.upsert_calls = 0
+        self.max_concurrent = 0
+        self._concurrent = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def upsert(self, ids, vectors, metadatas):
+        with self._lock:
+            self.upsert_calls += 1
+            failing = self.upsert_calls <= self.fail_first
+            self._concurrent += 1
+            self.max_concurrent = max(self.max_concurrent, self._concurrent)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            if failing:
+                raise ConnectionError("simulated upsert failure")
+            with self._lock:
+                for vector_id, vector, metadata in zip(ids, vectors, metadatas):
+                    self.vectors[vector_id] = (list(vector), dict(metadata))
+        finally:
+            with self._lock:
+                self._concurrent -= 1
+
+    def delete(self, ids):
+        with self._lock:
+            for vector_id in ids:
+                self.vectors.pop(vector_id, None)
+
+
+# Tracks indexed chunks and prints progress and throughput at most every 'report_every' seconds
+class IndexProgress:
+    def __init__(self, total, report_every=REPORT_EVERY, log=print):
+        self.total = total
+        self.report_every = report_every
+        self.log = log
+        self.done = 0
+        self.retries = 0
+        self.start = time.perf_counter()
+        self._last_report = self.start
+        self._lock = threading.Lock()
+
+    def add(self, n):
+        with self._lock:
+            self.done += n
+            now = time.perf_counter()
+            if now - self._last_report >= self.report_every and self.done < self.total:
+                self._last_report = now
+                self.log(self.line(now))
+
+    def line(self, now=None):
+        elapsed = (now or time.perf_counter()) - self.start
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        eta = (self.total - self.done) / rate if rate > 0 else float("inf")
+        return (f"Indexed {self.done}/{self.total} chunks ({100 * self.done / max(self.total, 1):.0f}%), "
+                f"{rate:.0f} chunks/s, ETA {eta:.0f}s, {self.retries} retries")
+
+
+# Embeds chunks in batches and upserts them concurrently into a sink (PineconeSink, InMemoryIndex, ...)
+# The calling thread embeds the next batch while up to 'concurrency' upserts run; at most 'max_pending'
+# batches are embedded but not yet written, so memory stays bounded when the index is slower than the model.
+# It implements add_documents/delete, so it can be passed to src.ingest.ingest in place of a vector store.
+class Indexer:
+    def __init__(self, sink, embeddings, batch_size=BATCH_SIZE, concurrency=CONCURRENCY, max_pending=MAX_PENDING,
+                 max_retries=MAX_RETRIES, retry_backoff=RETRY_BACKOFF, report_every=REPORT_EVERY, log=print):
+        self.sink = sink
+        self.embeddings = embeddings
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_pending = max(max_pending, concurrency)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.report_every = report_every
+        self.log = log
+
+    # Function to call the sink, retrying with exponential backoff and jitter
+    def _with_retries(self, func, args, progress):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return func(*args)
+            except Exception as exc:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.retry_backoff * 2 ** attempt * (0.5 + random.random())
+                with progress._lock:
+                    progress.retries += 1
+                self.log(f"{func.__name__} failed ({exc!r}); retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+
+    # Function to embed and upsert documents; returns their IDs
+    def add_documents(self, documents, ids=None, **kwargs):
+        documents = list(documents)
+        ids = list(ids) if ids is not None else [chunk_id(doc) for doc in documents]
+        if len(ids) != len(documents):
+            raise ValueError("ids must have one entry per document")
+
+        progress = IndexProgress(len(documents), self.report_every, self.log)
+        pending = threading.BoundedSemaphore(self.max_pending)
+        futures = []
+
+        def upsert(batch_ids, vectors, metadatas):
+            try:
+                self._with_retries(self.sink.upsert, (batch_ids, vectors, metadatas), progress)
+                progress.add(len(batch_ids))
+            finally:
+                pending.release()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="upsert") as executor:
+            for start in range(0, len(documents), self.batch_size):
+                batch = documents[start:start + self.batch_size]
+                batch_ids = ids[start:start + self.batch_size]
+                vectors = self.embeddings.embed_documents([doc.page_content for doc in batch])
+                metadatas = [dict(doc.metadata, **{TEXT_KEY: doc.page_content}) for doc in batch]
+
+                # Back-pressure: wait for a slot before queueing another embedded batch
+                pending.acquire()
+                futures.append(executor.submit(upsert, batch_ids, vectors, metadatas))
+
+                # Stop early if a batch has already failed for good
+                failed = next((f for f in futures if f.done() and f.exception()), None)
+                if failed is not None:
+                    failed.result()
+
+        # Surface the first failure after all workers have finished
+        for future in futures:
+            future.result()
+        self.log(progress.line())
+        return ids
+
+    # Function to delete vectors by ID, in batches
+    def delete(self, ids=None, **kwargs):
+        ids = list(ids or [])
+        progress = IndexProgress(len(ids), self.report_every, self.log)
+        for start in range(0, len(ids), 1000):
+            self._with_retries(self.sink.delete, (ids[start:start + 1000],), progress)
+        return True
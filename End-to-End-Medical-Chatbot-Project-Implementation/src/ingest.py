@@ -0,0 +1,197 @@
+# Import standard libraries for hashing, manifest files and parallel parsing
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Import the PDF loader used for every file (one page per Document)
+from langchain.document_loaders import PyPDFLoader
+
+# Import the chunking helper shared with the rest of the project
+from src.helper import text_split
+
+
+# Default location of the ingestion manifest (file hashes, page hashes and vector IDs)
+MANIFEST_PATH = os.path.join(".ingest", "manifest.json")
+
+# Read size used when hashing files
+HASH_BLOCK_SIZE = 1 << 20
+
+
+# Function to compute the SHA-256 of a file without reading it into memory at once
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Function to compute the SHA-256 of a page's text
+def page_sha256(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+# Function to load the manifest of the previous run (empty on the first run)
+def load_manifest(manifest_path=MANIFEST_PATH):
+    if not os.path.exists(manifest_path):
+        return {"files": {}}
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+# Function to write the manifest atomically, so an interrupted run never leaves a corrupt file
+def save_manifest(manifest, manifest_path=MANIFEST_PATH):
+    directory = os.path.dirname(manifest_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+# Function to list the PDFs under a directory (recursively), as paths relative to it
+def list_pdfs(data_dir):
+    paths = []
+    for root, _, files in os.walk(data_dir):
+        for name in files:
+            if name.lower().endswith(".pdf"):
+                paths.append(os.path.relpath(os.path.join(root, name), data_dir))
+    return sorted(paths)
+
+
+# Function to compare the files on disk with the manifest
+# Size and mtime are checked first, so unchanged files are not even re-hashed
+def scan_changes(data_dir, manifest):
+    changed = {}
+    present = set()
+    for rel_path in list_pdfs(data_dir):
+        present.add(rel_path)
+        path = os.path.join(data_dir, rel_path)
+        stat = os.stat(path)
+        entry = manifest["files"].get(rel_path)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            continue
+
+        # Touched but identical content: only refresh the stat fields
+        sha256 = file_sha256(path)
+        if entry and entry["sha256"] == sha256:
+            entry["size"], entry["mtime_ns"] = stat.st_size, stat.st_mtime_ns
+            continue
+        changed[rel_path] = {"sha256": sha256, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    deleted = sorted(set(manifest["files"]) - present)
+    return changed, deleted
+
+
+# Function run in worker processes: parse one PDF into page Documents
+def parse_pdf(path):
+    return PyPDFLoader(path).load()
+
+
+# Function to parse many PDFs in a process pool (parsing is CPU-bound pure Python)
+def parse_pdfs(paths, max_workers=None):
+    if not paths:
+        return []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(parse_pdf, paths, chunksize=1))
+
+
+# Function to build deterministic vector IDs for the chunks of one page
+# Identical pages (also across files) get identical IDs, so they are stored only once
+def chunk_ids(page_hash, n_chunks):
+    return [f"{page_hash[:32]}-{i}" for i in range(n_chunks)]
+
+
+# Function to list every vector ID recorded in the manifest (identical pages share their IDs)
+def manifest_ids(manifest):
+    return {vector_id for entry in manifest["files"].values() for page in entry["pages"] for vector_id in page["ids"]}
+
+
+# Function to re-chunk every file in the manifest; chunk IDs come from the page hashes, so they match the stored ones
+def load_chunks(data_dir, manifest, max_workers=None):
+    parsed = parse_pdfs([os.path.join(data_dir, rel_path) for rel_path in sorted(manifest["files"])],
+                        max_workers=max_workers)
+    chunks, ids, seen = [], [], set()
+    for pages in parsed:
+        for page in pages:
+            page_chunks = text_split([page])
+            for vector_id, chunk in zip(chunk_ids(page_sha256(page.page_content), len(page_chunks)), page_chunks):
+                if vector_id not in seen:
+                    seen.add(vector_id)
+                    chunks.append(chunk)
+                    ids.append(vector_id)
+    return chunks, ids
+
+
+# Function to rebuild an index that supports ids()/rebuild() (e.g. BM25) from every chunk when it is out of step
+# with the manifest: missing (built before the index existed, or deleted) or holding other IDs than recorded
+def backfill(data_dir, index, manifest_path=MANIFEST_PATH, max_workers=None):
+    expected = manifest_ids(load_manifest(manifest_path))
+    if index.ids() == expected:
+        return False
+    start = time.perf_counter()
+    chunks, ids = load_chunks(data_dir, load_manifest(manifest_path), max_workers=max_workers)
+    index.rebuild(chunks, ids)
+    print(f"Backfill: rebuilt {type(index).__name__} from {len(ids)} chunk(s) "
+          f"in {time.perf_counter() - start:.1f}s")
+    return True
+
+
+# Function to bring a vector store (or a list of stores kept in sync, e.g. vectors and BM25) in line with the PDFs on disk
+# Only new or changed pages are chunked and embedded; vectors of removed pages and files are deleted
+def ingest(data_dir, vector_store, manifest_path=MANIFEST_PATH, max_workers=None):
+    stores = vector_store if isinstance(vector_store, (list, tuple)) else [vector_store]
+    start = time.perf_counter()
+    manifest = load_manifest(manifest_path)
+    changed, deleted = scan_changes(data_dir, manifest)
+    print(f"Ingest: {len(changed)} new or changed file(s), {len(deleted)} deleted file(s)")
+
+    # Parse every changed file in parallel
+    paths = [os.path.join(data_dir, rel_path) for rel_path in changed]
+    parsed = parse_pdfs(paths, max_workers=max_workers)
+
+    # IDs still referenced by files that are not being replaced or removed
+    untouched = set(manifest["files"]) - set(changed) - set(deleted)
+    keep_ids = {vector_id for rel_path in untouched for page in manifest["files"][rel_path]["pages"]
+                for vector_id in page["ids"]}
+
+    # IDs recorded for the files being replaced or removed
+    old_ids = {vector_id for rel_path in list(changed) + deleted if rel_path in manifest["files"]
+               for page in manifest["files"][rel_path]["pages"] for vector_id in page["ids"]}
+
+    # Chunk only pages whose content has not been embedded before
+    new_chunks, new_ids = [], []
+    for rel_path, pages in zip(changed, parsed):
+        entry = dict(changed[rel_path], pages=[])
+        for page in pages:
+            page_hash = page_sha256(page.page_content)
+            chunks = text_split([page])
+            ids = chunk_ids(page_hash, len(chunks))
+            entry["pages"].append({"sha256": page_hash, "ids": ids})
+            # Pages already stored (unchanged pages of an edited file, or duplicates) are skipped
+            fresh = [i for i, vector_id in enumerate(ids) if vector_id not in keep_ids and vector_id not in old_ids]
+            keep_ids.update(ids)
+            new_chunks += [chunks[i] for i in fresh]
+            new_ids += [ids[i] for i in fresh]
+        manifest["files"][rel_path] = entry
+
+    # Vectors of replaced or deleted files that no remaining page still uses
+    stale_ids = sorted(old_ids - keep_ids)
+    for rel_path in deleted:
+        del manifest["files"][rel_path]
+
+    # Upsert before deleting, so a query never sees a document with no vectors at all
+    for store in stores:
+        if new_chunks:
+            store.add_documents(new_chunks, ids=new_ids)
+        if stale_ids:
+            store.delete(ids=stale_ids)
+
+    # Record the new state only after the vector store has been updated
+    save_manifest(manifest, manifest_path)
+    print(f"Ingest: {len(new_ids)} chunk(s) upserted, {len(stale_ids)} removed "
+          f"in {time.perf_counter() - start:.1f}s")
+    return new_ids, stale_ids
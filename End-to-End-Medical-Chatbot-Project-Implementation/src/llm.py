@@ -0,0 +1,129 @@
+# Import standard libraries for async calls, the fake model's pacing and SSE encoding
+import asyncio
+import json
+import time
+
+
+# Claude model and answer length used by the chatbot
+CLAUDE_MODEL = "claude-sonnet-4-20250514"
+MAX_TOKENS = 1024
+
+
+# Function to turn a LangChain prompt value (or anything else) into the text sent to the model
+def prompt_to_text(input_prompt):
+    if hasattr(input_prompt, "to_string"):
+        return input_prompt.to_string()
+    return str(input_prompt)
+
+
+# Function to format one Server-Sent Event; data is JSON so newlines in tokens survive the framing
+def sse_event(data, event=None):
+    lines = [f"event: {event}"] if event else []
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+# Claude wrapper usable as a blocking LangChain LLM (called with a prompt), as a token stream and asynchronously
+# Create the clients once and share them: each keeps a pool of HTTP connections to the API
+class ClaudeLLM:
+    def __init__(self, client, model=CLAUDE_MODEL, max_tokens=MAX_TOKENS, async_client=None):
+        self.client = client
+        self.async_client = async_client
+        self.model = model
+        self.max_tokens = max_tokens
+
+    # Function to return the whole answer at once (blocking callers, and acall without an async client)
+    def __call__(self, input_prompt):
+        response = self.client.messages.create(
+            model=self.model,
+            max_tokens=self.max_tokens,
+            messages=[{"role": "user", "content": prompt_to_text(input_prompt)}]
+        )
+        return response.content[0].text
+
+    # Function to return the whole answer without blocking the event loop (used by the async ChatService)
+    async def acall(self, input_prompt):
+        if self.async_client is None:
+            return await asyncio.to_thread(self, input_prompt)
+        response = await self.async_client.messages.create(
+            model=self.model,
+            max_tokens=self.max_tokens,
+            messages=[{"role": "user", "content": prompt_to_text(input_prompt)}]
+        )
+        return response.content[0].text
+
+    # Function to yield the answer text piece by piece as the Messages streaming API produces it
+    def stream(self, input_prompt):
+        with self.client.messages.stream(
+            model=self.model,
+            max_tokens=self.max_tokens,
+            messages=[{"role": "user", "content": prompt_to_text(input_prompt)}]
+        ) as stream:
+            for text in stream.text_stream:
+                yield text
+
+    # Function to stream the answer without blocking the event loop (used by the async ChatService)
+    async def astream(self, input_prompt):
+        if self.async_client is None:
+            # Step the blocking stream in a worker thread, one piece at a time
+            pieces = self.stream(input_prompt)
+            end = object()
+            while True:
+                text = await asyncio.to_thread(next, pieces, end)
+                if text is end:
+                    return
+                yield text
+        async with self.async_client.messages.stream(
+            model=self.model,
+            max_tokens=self.max_tokens,
+            messages=[{"role": "user", "content": prompt_to_text(input_prompt)}]
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
+
+
+# Local stand-in for ClaudeLLM, for tests and offline runs (LLM_BACKEND=fake): no network and no API key
+# It answers with a fixed reply (or the end of the question) word by word, optionally pausing between words
+class FakeLLM:
+    def __init__(self, reply=None, delay=0.0):
+        self.reply = reply
+        self.delay = delay
+        self.calls = []
+
+    def _answer(self, text):
+        if self.reply is not None:
+            return self.reply
+        question = text.strip().splitlines()[-1] if text.strip() else ""
+        question = question.split(": ", 1)[-1] if question.startswith("Human: ") else question
+        return f"This is a test answer to: {question}"
+
+    def __call__(self, input_prompt):
+        text = prompt_to_text(input_prompt)
+        self.calls.append(text)
+        return self._answer(text)
+
+    async def acall(self, input_prompt):
+        text = prompt_to_text(input_prompt)
+        self.calls.append(text)
+        answer = self._answer(text)
+        if self.delay:
+            await asyncio.sleep(self.delay * len(answer.split(" ")))
+        return answer
+
+    def stream(self, input_prompt):
+        text = prompt_to_text(input_prompt)
+        self.calls.append(text)
+        words = self._answer(text).split(" ")
+        for i, word in enumerate(words):
+            if self.delay:
+                time.sleep(self.delay)
+            yield word if i == len(words) - 1 else word + " "
+
+    async def astream(self, input_prompt):
+        text = prompt_to_text(input_prompt)
+        self.calls.append(text)
+        words = self._answer(text).split(" ")
+        for i, word in enumerate(words):
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            yield word if i == len(words) - 1 else word + " "
@@ -0,0 +1,168 @@
+# Import standard libraries for the LRU order, timestamps, the version stamp and thread safety
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+# Import NumPy for the similarity lookup over all cached question embeddings at once
+import numpy as np
+
+
+# File that store_index.py rewrites after every re-index; a new stamp empties every response cache
+INDEX_VERSION_PATH = os.environ.get('INDEX_VERSION_PATH', '.index_version')
+
+# Defaults: how similar a question must be to reuse an answer, and how much may be kept
+SIMILARITY_THRESHOLD = 0.95
+MAX_ENTRIES = 2048
+MAX_BYTES = 64 * 1024 * 1024
+TTL_SECONDS = 24 * 60 * 60
+
+# Seconds between checks of the index version stamp
+VERSION_CHECK_INTERVAL = 1.0
+
+
+# Function to record that the index changed (called by store_index.py after re-indexing)
+def write_index_version(path=INDEX_VERSION_PATH):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(uuid.uuid4().hex)
+    os.replace(tmp_path, path)
+
+
+# Function to read the current index version stamp (None if the index was never stamped)
+def read_index_version(path=INDEX_VERSION_PATH):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+# One cached answer and what it costs to keep
+class CacheEntry:
+    __slots__ = ('question', 'answer', 'sources', 'created', 'nbytes')
+
+    def __init__(self, question, answer, sources, created, nbytes):
+        self.question = question
+        self.answer = answer
+        self.sources = sources
+        self.created = created
+        self.nbytes = nbytes
+
+
+# Cache of chatbot answers keyed on the question embedding
+# A question hits when its cosine similarity to a cached question reaches 'threshold'.
+# Entries expire after 'ttl' seconds and the least recently used ones are evicted beyond
+# 'max_entries' or 'max_bytes'. Everything is dropped when the index version stamp changes.
+class SemanticCache:
+    def __init__(self, threshold=SIMILARITY_THRESHOLD, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES,
+                 ttl=TTL_SECONDS, version_path=INDEX_VERSION_PATH):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.version_path = version_path
+        self.hits = 0
+        self.misses = 0
+
+        # Unit question vectors live in one preallocated matrix; 'slot' is an entry's row
+        self._vectors = None
+        self._occupied = np.zeros(max_entries, dtype=bool)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._version = read_index_version(version_path)
+        self._version_checked = time.monotonic()
+
+    def __len__(self):
+        return len(self._entries)
+
+    # Function to empty the cache
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._occupied[:] = False
+            self._bytes = 0
+
+    # Function to drop everything once store_index.py has written a new version stamp
+    def _check_version(self, now):
+        if now - self._version_checked < VERSION_CHECK_INTERVAL:
+            return
+        self._version_checked = now
+        version = read_index_version(self.version_path)
+        if version != self._version:
+            self._version = version
+            self._entries.clear()
+            self._occupied[:] = False
+            self._bytes = 0
+
+    def _remove(self, slot):
+        entry = self._entries.pop(slot)
+        self._occupied[slot] = False
+        self._bytes -= entry.nbytes
+
+    # Function to return (answer, sources) of the most similar cached question, or None
+    def lookup(self, embedding):
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        now = time.monotonic()
+        with self._lock:
+            self._check_version(now)
+            if not self._entries or self._vectors is None:
+                self.misses += 1
+                return None
+
+            # Similarity to every cached question in one matrix-vector product
+            scores = self._vectors @ query
+            scores[~self._occupied] = -np.inf
+            slot = int(np.argmax(scores))
+            if scores[slot] < self.threshold:
+                self.misses += 1
+                return None
+
+            entry = self._entries[slot]
+            if now - entry.created > self.ttl:
+                self._remove(slot)
+                self.misses += 1
+                return None
+
+            # Mark as most recently used
+            self._entries.move_to_end(slot)
+            self.hits += 1
+            return entry.answer, entry.sources
+
+    # Function to store an answer for a question embedding
+    def store(self, embedding, question, answer, sources=()):
+        vector = np.asarray(embedding, dtype=np.float32)
+        vector = vector / (np.linalg.norm(vector) or 1.0)
+        sources = list(sources)
+        nbytes = (vector.nbytes + sys.getsizeof(question) + sys.getsizeof(answer)
+                  + sum(sys.getsizeof(source) for source in sources))
+        if nbytes > self.max_bytes:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            self._check_version(now)
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+
+            # Drop expired entries first, then least recently used ones, until the new entry fits
+            for slot in [slot for slot, entry in self._entries.items() if now - entry.created > self.ttl]:
+                self._remove(slot)
+            while self._entries and (len(self._entries) >= self.max_entries or self._bytes + nbytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+
+            slot = int(np.argmin(self._occupied))
+            self._vectors[slot] = vector
+            self._occupied[slot] = True
+            self._entries[slot] = CacheEntry(question, answer, sources, now, nbytes)
+            self._bytes += nbytes
+
+    # Function to report the cache state, e.g. for logging
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._bytes,
+                    'hits': self.hits, 'misses': self.misses}
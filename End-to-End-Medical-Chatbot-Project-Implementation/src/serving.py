@@ -0,0 +1,204 @@
+# Import standard libraries for the event loop, its thread and the pool for blocking calls
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Default concurrency limits and timeouts (seconds) per upstream service
+RETRIEVAL_CONCURRENCY = 16
+RETRIEVAL_TIMEOUT = 10.0
+LLM_CONCURRENCY = 8
+LLM_TIMEOUT = 60.0
+
+# Threads for blocking work (embedding, sync clients) started from the event loop
+BLOCKING_THREADS = 16
+
+
+# Raised when an upstream call does not finish within its timeout
+class UpstreamTimeout(Exception):
+    pass
+
+
+# Collapses concurrent calls with the same key into one: the first caller runs it, the others await its result
+class SingleFlight:
+    def __init__(self):
+        self._inflight = {}
+        self.coalesced = 0
+
+    async def do(self, key, make_coroutine):
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            # shield: one waiter giving up must not cancel the call for everybody else
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(make_coroutine())
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+
+# One upstream service (vector index, LLM): at most 'limit' calls in flight, each bounded by 'timeout'
+class Upstream:
+    def __init__(self, name, limit, timeout, executor=None):
+        self.name = name
+        self.limit = limit
+        self.timeout = timeout
+        self.executor = executor
+        self._semaphore = None
+        self.in_flight = 0
+        self.timeouts = 0
+
+    # Function to run a coroutine function, or a blocking function in the thread pool, under the limits
+    async def call(self, func, *args):
+        # Created lazily so it binds to the loop that actually runs the calls
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.limit)
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                if asyncio.iscoroutinefunction(func):
+                    awaitable = func(*args)
+                else:
+                    awaitable = asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+                return await asyncio.wait_for(awaitable, self.timeout)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                raise UpstreamTimeout(f"{self.name} did not respond within {self.timeout:g}s") from None
+            finally:
+                self.in_flight -= 1
+
+    # Function to stream from an async generator function under the limits; the whole stream holds one slot
+    # and must finish within 'timeout' of its start
+    async def stream(self, func, *args):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.limit)
+        async with self._semaphore:
+            self.in_flight += 1
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.timeout
+            iterator = func(*args)
+            try:
+                while True:
+                    try:
+                        item = await asyncio.wait_for(iterator.__anext__(), deadline - loop.time())
+                    except StopAsyncIteration:
+                        return
+                    yield item
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                raise UpstreamTimeout(f"{self.name} did not finish within {self.timeout:g}s") from None
+            finally:
+                self.in_flight -= 1
+                await iterator.aclose()
+
+    def stats(self):
+        return {'limit': self.limit, 'in_flight': self.in_flight, 'timeouts': self.timeouts}
+
+
+# A single asyncio event loop in a daemon thread, shared by every request thread of the WSGI server
+# Request threads only wait on results; all upstream I/O overlaps on this loop
+class BackgroundLoop:
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="chat-event-loop", daemon=True)
+        self._thread.start()
+
+    # Function to run a coroutine on the loop from any thread and wait for its result
+    def run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    # Function to iterate an async generator on the loop from any thread, one item at a time
+    # Closing the returned generator early (a client disconnect) also closes the async one on the loop
+    def iterate(self, async_generator):
+        try:
+            while True:
+                try:
+                    yield self.run(async_generator.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            self.run(async_generator.aclose())
+
+
+# Function to normalize a question for coalescing (case and whitespace do not change the answer)
+def question_key(question):
+    return " ".join(question.lower().split())
+
+
+# Answers questions concurrently: embedding and retrieval, then generation, each through its own Upstream.
+# Identical in-flight questions share one pipeline run, and the semantic response cache is consulted first.
+class ChatService:
+    def __init__(self, embeddings, retriever, prompt, llm, response_cache=None,
+                 retrieval_concurrency=RETRIEVAL_CONCURRENCY, retrieval_timeout=RETRIEVAL_TIMEOUT,
+                 llm_concurrency=LLM_CONCURRENCY, llm_timeout=LLM_TIMEOUT):
+        self.embeddings = embeddings
+        self.retriever = retriever
+        self.prompt = prompt
+        self.llm = llm
+        self.response_cache = response_cache
+        self.executor = ThreadPoolExecutor(max_workers=BLOCKING_THREADS, thread_name_prefix="chat-blocking")
+        self.retrieval = Upstream("retrieval", retrieval_concurrency, retrieval_timeout, self.executor)
+        self.generation = Upstream("llm", llm_concurrency, llm_timeout, self.executor)
+        self.single_flight = SingleFlight()
+
+    # Function to answer one question; returns (answer, sources)
+    async def answer(self, question):
+        return await self.single_flight.do(question_key(question), lambda: self._answer(question))
+
+    async def _answer(self, question):
+        query_embedding, cached = await self._lookup(question)
+        if cached is not None:
+            return cached
+
+        docs = await self.retrieval.call(self.retriever.ainvoke, question)
+        prompt_value = self._prompt(question, docs)
+
+        # Use the model's native async call when it has one (pooled async HTTP client)
+        generate = getattr(self.llm, "acall", None) or self.llm
+        answer = await self.generation.call(generate, prompt_value)
+
+        sources = [doc.metadata.get("source") for doc in docs]
+        if self.response_cache is not None:
+            self.response_cache.store(query_embedding, question, answer, sources)
+        return answer, sources
+
+    # Function to stream one answer as ("token", text) pairs followed by one ("sources", sources) pair
+    # Concurrent identical questions share retrieval; each stream is generated under the LLM limit and timeout
+    async def stream(self, question):
+        query_embedding, cached = await self._lookup(question)
+        if cached is not None:
+            answer, sources = cached
+            yield "token", answer
+            yield "sources", sources
+            return
+
+        docs = await self.single_flight.do(("retrieve", question_key(question)),
+                                           lambda: self.retrieval.call(self.retriever.ainvoke, question))
+        parts = []
+        async for token in self.generation.stream(self.llm.astream, self._prompt(question, docs)):
+            parts.append(token)
+            yield "token", token
+
+        answer = "".join(parts)
+        sources = [doc.metadata.get("source") for doc in docs]
+        if self.response_cache is not None:
+            self.response_cache.store(query_embedding, question, answer, sources)
+        yield "sources", sources
+
+    # Function to embed a question and look it up in the response cache; returns (embedding, cached or None)
+    async def _lookup(self, question):
+        # Embedding is CPU work (or a cache read), kept off the event loop
+        loop = asyncio.get_running_loop()
+        query_embedding = await loop.run_in_executor(self.executor, self.embeddings.embed_query, question)
+        if self.response_cache is None:
+            return query_embedding, None
+        return query_embedding, self.response_cache.lookup(query_embedding)
+
+    # Function to build the same prompt the stuff-documents chain would
+    def _prompt(self, question, docs):
+        return self.prompt.invoke({"input": question, "context": "\n\n".join(doc.page_content for doc in docs)})
+
+    def stats(self):
+        return {'retrieval': self.retrieval.stats(), 'llm': self.generation.stats(),
+                'coalesced': self.single_flight.coalesced}
@@ -0,0 +1,381 @@
+# Import standard libraries for the on-disk layout, atomic writes and thread safety
+import json
+import os
+import threading
+import uuid
+
+# Import NumPy for the memory-mapped float32 matrices and the similarity search
+import numpy as np
+
+# Import LangChain's document and vector store interfaces, so the local index is used exactly like Pinecone
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+
+# Retrieval backend used by store_index.py and app.py: 'pinecone' (default) or 'local'
+VECTOR_BACKEND = os.environ.get('VECTOR_BACKEND', 'pinecone').lower()
+
+# Directory of the local index
+LOCAL_INDEX_PATH = os.environ.get('LOCAL_INDEX_PATH', '.vector_index')
+
+# Below this many vectors an exact scan is faster than IVF; above it vectors are clustered into inverted lists
+# (IVF is only dropped again below half of it, so an index near the limit does not retrain on every change)
+IVF_MIN_ROWS = 20000
+
+# Number of inverted lists scanned per query when IVF is used
+NPROBE = 8
+
+# Rows per block when assigning vectors to centroids, to bound memory
+ASSIGN_BLOCK_ROWS = 65536
+
+# Rows added or deleted since the lists were trained, as a fraction of the rows they were trained on,
+# above which the index is compacted and k-means retrained; below it new rows join the existing lists
+DRIFT_THRESHOLD = 0.2
+
+# Parts are compacted into one (keeping the trained lists) once there are more than this many
+MAX_PARTS = 8
+
+
+# Function to scale rows to unit length, so the dot product is the cosine similarity
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+# Function to assign every vector to its most similar centroid, block by block
+def assign_lists(vectors, centroids):
+    assignment = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), ASSIGN_BLOCK_ROWS):
+        block = vectors[start:start + ASSIGN_BLOCK_ROWS]
+        assignment[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return assignment
+
+
+# Function to cluster unit vectors with spherical k-means (trained on a sample for speed)
+def train_centroids(vectors, n_lists, iterations=10, seed=0):
+    rng = np.random.default_rng(seed)
+    sample = vectors[rng.choice(len(vectors), size=min(len(vectors), 256 * n_lists), replace=False)]
+    centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = assign_lists(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+
+        # Empty lists keep their previous centroid
+        empty = np.bincount(assignment, minlength=n_lists) == 0
+        sums[empty] = centroids[empty]
+        centroids = normalize(sums)
+    return centroids
+
+
+# One immutable batch of rows: unit vectors, their inverted-list numbers (with IVF) and the documents
+# Rows are ordered by list, so the rows of one list are a contiguous range of the matrix
+class Part:
+    def __init__(self, name, vectors, lists, ids, texts, metadatas):
+        self.name = name
+        self.vectors = vectors
+        self.lists = lists
+        self.ids, self.texts, self.metadatas = ids, texts, metadatas
+
+    def __len__(self):
+        return len(self.ids)
+
+    # Function to build a part from new rows, ordering them by list
+    @classmethod
+    def create(cls, vectors, lists, ids, texts, metadatas):
+        if lists is not None:
+            order = np.argsort(lists, kind='stable')
+            vectors, lists = vectors[order], lists[order]
+            ids, texts, metadatas = [ids[i] for i in order], [texts[i] for i in order], [metadatas[i] for i in order]
+        return cls(uuid.uuid4().hex, np.ascontiguousarray(vectors, dtype=np.float32), lists, ids, texts, metadatas)
+
+    # Function to open a saved part; the matrix is loaded with mmap_mode='r', so pages are read on first use
+    @classmethod
+    def open(cls, path, name):
+        with open(os.path.join(path, f'docs-{name}.json')) as f:
+            docs = json.load(f)
+        vectors = np.load(os.path.join(path, f'vectors-{name}.npy'), mmap_mode='r')
+        lists = np.load(os.path.join(path, f'lists-{name}.npy')) if docs['lists'] else None
+        return cls(name, vectors, lists, docs['ids'], docs['texts'], docs['metadatas'])
+
+    # Function to write the part once; its files never change afterwards
+    def write(self, path):
+        docs_file = os.path.join(path, f'docs-{self.name}.json')
+        if os.path.exists(docs_file):
+            return
+        np.save(os.path.join(path, f'vectors-{self.name}.npy'), np.asarray(self.vectors))
+        if self.lists is not None:
+            np.save(os.path.join(path, f'lists-{self.name}.npy'), self.lists)
+
+        # The documents file is written last and marks the part as complete
+        with open(f"{docs_file}.tmp", 'w') as f:
+            json.dump({'ids': self.ids, 'texts': self.texts, 'metadatas': self.metadatas,
+                       'lists': self.lists is not None}, f)
+        os.replace(f"{docs_file}.tmp", docs_file)
+
+    # Function to score the rows of the given lists (all rows without IVF); returns (rows, scores)
+    def scan(self, query, probe=None):
+        if probe is None or self.lists is None:
+            return None, np.asarray(self.vectors @ query)
+        starts = np.searchsorted(self.lists, probe, side='left')
+        ends = np.searchsorted(self.lists, probe, side='right')
+        rows = np.concatenate([np.arange(lo, hi) for lo, hi in zip(starts, ends)])
+        scores = np.concatenate([self.vectors[lo:hi] @ query for lo, hi in zip(starts, ends)])
+        return rows, scores
+
+
+# Vector store kept in process, with the same incremental layout as the BM25 index
+# Each add writes a new part whose rows join the trained inverted lists; deleted and replaced rows are tombstones.
+# index.json lists the live parts, tombstones and centroids and is replaced atomically after every change,
+# and readers (app.py) pick up a new version on their next query. Parts are compacted, and k-means retrained,
+# only once the rows changed since training exceed DRIFT_THRESHOLD, so small updates never rewrite the matrix.
+class LocalVectorStore(VectorStore):
+    def __init__(self, embedding, path=None, ivf_min_rows=IVF_MIN_ROWS, nprobe=NPROBE,
+                 drift_threshold=DRIFT_THRESHOLD, max_parts=MAX_PARTS):
+        self._embedding = embedding
+        self.path = path
+        self.ivf_min_rows = ivf_min_rows
+        self.nprobe = nprobe
+        self.drift_threshold = drift_threshold
+        self.max_parts = max_parts
+        self.version = None
+        self._parts = []
+        self._deleted = {}
+        self._centroids = None
+        self._centroids_name = None
+        self._trained_rows = 0
+        self._changed_rows = 0
+        self._lock = threading.Lock()
+        self._state_mtime = None
+
+    @property
+    def embeddings(self):
+        return self._embedding
+
+    def __len__(self):
+        return sum(len(part) for part in self._parts) - sum(len(rows) for rows in self._deleted.values())
+
+    # Function to open a saved index (or an empty one if nothing was saved yet)
+    @classmethod
+    def load(cls, embedding, path=LOCAL_INDEX_PATH, **kwargs):
+        store = cls(embedding, path=path, **kwargs)
+        store.reload()
+        return store
+
+    # Function to pick up a version written by another process (e.g. store_index.py while the app runs)
+    # Costs one stat() call when nothing changed
+    def reload(self):
+        if not self.path:
+            return
+        index_file = os.path.join(self.path, 'index.json')
+        try:
+            mtime = os.stat(index_file).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._state_mtime:
+            return
+
+        # Open the new files outside the lock, so queries keep running on the current version meanwhile
+        try:
+            with open(index_file) as f:
+                index = json.load(f)
+            loaded = {part.name: part for part in self._parts}
+            parts = [loaded.get(name) or Part.open(self.path, name) for name in index['parts']]
+            centroids = np.load(os.path.join(self.path, index['centroids'])) if index['centroids'] else None
+        except FileNotFoundError:
+            # A newer version replaced this one while it was read; the next call loads that one
+            return
+
+        with self._lock:
+            self._parts = parts
+            self._deleted = {name: frozenset(rows) for name, rows in index['deleted'].items()}
+            self._centroids, self._centroids_name = centroids, index['centroids']
+            self._trained_rows, self._changed_rows = index['trained_rows'], index['changed_rows']
+            self.version = index['version']
+            self._state_mtime = mtime
+
+    # Function to write the index; index.json is replaced last, so readers always see a complete version
+    def save(self, path=None):
+        path = path or self.path
+        os.makedirs(path, exist_ok=True)
+        for part in self._parts:
+            part.write(path)
+        if self._centroids is not None and not os.path.exists(os.path.join(path, self._centroids_name)):
+            np.save(os.path.join(path, self._centroids_name), self._centroids)
+
+        version = uuid.uuid4().hex
+        index = {'version': version, 'parts': [part.name for part in self._parts],
+                 'centroids': self._centroids_name if self._centroids is not None else None,
+                 'deleted': {name: sorted(rows) for name, rows in self._deleted.items() if rows},
+                 'trained_rows': self._trained_rows, 'changed_rows': self._changed_rows}
+        tmp_path = os.path.join(path, 'index.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, os.path.join(path, 'index.json'))
+        self.version = version
+        if path == self.path:
+            self._state_mtime = os.stat(os.path.join(path, 'index.json')).st_mtime_ns
+
+        # Remove files no longer listed (processes that still map them keep their copy until they reload)
+        live = {part.name for part in self._parts}
+        for name in os.listdir(path):
+            if name.startswith('centroids-'):
+                if name != index['centroids']:
+                    os.remove(os.path.join(path, name))
+            elif name.startswith(('vectors-', 'lists-', 'docs-')):
+                if name.split('-', 1)[1].split('.', 1)[0] not in live:
+                    os.remove(os.path.join(path, name))
+
+    # Function to mark every live row with one of the given IDs as deleted; returns the number of rows
+    def _tombstone(self, ids):
+        ids, removed = set(ids), 0
+        for part in self._parts:
+            dead = self._deleted.get(part.name, frozenset())
+            rows = {row for row, vector_id in enumerate(part.ids) if vector_id in ids and row not in dead}
+            if rows:
+                # New sets rather than in-place updates, so a query's snapshot never changes under it
+                self._deleted = dict(self._deleted, **{part.name: dead | rows})
+                removed += len(rows)
+        return removed
+
+    # Function to merge all parts into one without deleted rows, retraining the lists if asked to
+    def _compact(self, retrain):
+        vectors, lists, ids, texts, metadatas = [], [], [], [], []
+        for part in self._parts:
+            dead = self._deleted.get(part.name, frozenset())
+            live = [row for row in range(len(part)) if row not in dead]
+            vectors.append(np.asarray(part.vectors)[live])
+            if part.lists is not None:
+                lists.append(part.lists[live])
+            ids += [part.ids[row] for row in live]
+            texts += [part.texts[row] for row in live]
+            metadatas += [part.metadatas[row] for row in live]
+        vectors = np.concatenate(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+
+        if retrain:
+            use_ivf = self._wants_ivf(len(ids))
+            self._centroids = self._centroids_name = lists = None
+            if use_ivf:
+                self._centroids = train_centroids(vectors, int(np.sqrt(len(ids))))
+                self._centroids_name = f'centroids-{uuid.uuid4().hex}.npy'
+                lists = assign_lists(vectors, self._centroids)
+            self._trained_rows, self._changed_rows = len(ids), 0
+        else:
+            lists = np.concatenate(lists) if self._centroids is not None else None
+
+        self._parts = [Part.create(vectors, lists, ids, texts, metadatas)] if ids else []
+        self._deleted = {}
+
+    # Function to decide whether an index of n rows should use IVF (switched off only below half the limit)
+    def _wants_ivf(self, n):
+        return n >= self.ivf_min_rows or (self._centroids is not None and n >= self.ivf_min_rows // 2)
+
+    # Function to compact after a change when the lists have drifted, IVF should be switched, or parts piled up
+    def _maintain(self):
+        switch = self._wants_ivf(len(self)) != (self._centroids is not None)
+        if switch or self._changed_rows > self.drift_threshold * self._trained_rows:
+            self._compact(retrain=True)
+        elif len(self._parts) > self.max_parts:
+            self._compact(retrain=False)
+
+    # Function to add (or replace, for existing IDs) texts; persisted immediately when the store has a path
+    def add_texts(self, texts, metadatas=None, ids=None, **kwargs):
+        texts = list(texts)
+        metadatas = list(metadatas) if metadatas is not None else [{} for _ in texts]
+        ids = list(ids) if ids is not None else [uuid.uuid4().hex for _ in texts]
+        if not texts:
+            return []
+        vectors = normalize(self._embedding.embed_documents(texts))
+
+        with self._lock:
+            replaced = self._tombstone(ids)
+            # New rows join the trained lists; only _maintain decides whether k-means runs again
+            lists = assign_lists(vectors, self._centroids) if self._centroids is not None else None
+            self._parts = self._parts + [Part.create(vectors, lists, ids, texts, metadatas)]
+            self._changed_rows += len(ids) + replaced
+            self._maintain()
+            if self.path:
+                self.save()
+        return ids
+
+    # Function to remove vectors by ID
+    def delete(self, ids=None, **kwargs):
+        if not ids:
+            return False
+        with self._lock:
+            self._changed_rows += self._tombstone(ids)
+            self._maintain()
+            if self.path:
+                self.save()
+        return True
+
+    # Function to find the k best rows over all parts; returns (part, row, score) triples
+    def _search(self, parts, deleted, centroids, query, k):
+        query = normalize(np.asarray(query, dtype=np.float32).reshape(1, -1))[0]
+        probe = None
+        if centroids is not None:
+            probe = np.sort(np.argsort(centroids @ query)[::-1][:self.nprobe])
+
+        candidates = []
+        for part in parts:
+            if len(part) == 0:
+                continue
+            rows, scores = part.scan(query, probe)
+            dead = deleted.get(part.name)
+            if dead:
+                dead = np.fromiter(dead, dtype=np.int64, count=len(dead))
+                scores = np.where(np.isin(np.arange(len(scores)) if rows is None else rows, dead), -np.inf, scores)
+            candidates.append((part, rows, scores))
+
+        # Too few rows in the probed lists: fall back to an exact scan
+        if probe is not None and sum(np.isfinite(scores).sum() for _, _, scores in candidates) < k:
+            return self._search(parts, deleted, None, query, k)
+        if not candidates:
+            return []
+
+        scores = np.concatenate([scores for _, _, scores in candidates])
+        owners = np.concatenate([np.full(len(part_scores), i) for i, (_, _, part_scores) in enumerate(candidates)])
+        positions = np.concatenate([np.arange(len(part_scores)) for _, _, part_scores in candidates])
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        results = []
+        for i in top:
+            part, rows, _ = candidates[owners[i]]
+            row = positions[i] if rows is None else rows[positions[i]]
+            results.append((part, int(row), float(scores[i])))
+        return results
+
+    # Function to return (Document, cosine similarity) pairs for a query vector
+    def similarity_search_with_score_by_vector(self, embedding, k=4, **kwargs):
+        self.reload()
+        # Take a consistent view, so a concurrent add or delete never mixes rows of two versions
+        with self._lock:
+            parts, deleted, centroids = self._parts, self._deleted, self._centroids
+        return [(Document(page_content=part.texts[row], metadata=part.metadatas[row], id=part.ids[row]), score)
+                for part, row, score in self._search(parts, deleted, centroids, embedding, k)]
+
+    def similarity_search_by_vector(self, embedding, k=4, **kwargs):
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k)]
+
+    def similarity_search_with_score(self, query, k=4, **kwargs):
+        return self.similarity_search_with_score_by_vector(self._embedding.embed_query(query), k)
+
+    def similarity_search(self, query, k=4, **kwargs):
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    # Cosine similarity is already a relevance score (higher is more relevant)
+    def _select_relevance_score_fn(self):
+        return lambda score: score
+
+    # Function to build a store from texts (LangChain's standard constructor)
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, ids=None, path=None, **kwargs):
+        store = cls(embedding, path=path, **kwargs)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
@@ -1,14 +1,17 @@
-# Import helper functions for PDF loading, text chunking, and embedding initialization
-from src.helper import load_pdf_file, text_split, download_hugging_face_embeddings
+# Import the embedding initialization helper
+from src.helper import download_hugging_face_embeddings
 
-# Import Pinecone's gRPC client for fast vector indexing
-from pinecone.grpc import PineconeGRPC as Pinecone
+# Import incremental ingestion (only new or changed PDF pages are embedded) and the full rebuild of secondary indexes
+from src.ingest import ingest, backfill
 
-# Import configuration class to specify serverless deployment details
-from pinecone import ServerlessSpec
+# Import the index version stamp that invalidates the chatbot's response cache
+from src.response_cache import write_index_version
 
-# Import LangChain wrapper to connect document chunks to Pinecone index
-from langchain_pinecone import PineconeVectorStore
+# Import the BM25 keyword index kept next to the vector index for hybrid retrieval
+from src.bm25 import BM25Index, BM25_INDEX_PATH
+
+# Import the local vector index and the backend selection ('pinecone' or 'local', from VECTOR_BACKEND)
+from src.vector_index import LocalVectorStore, VECTOR_BACKEND, LOCAL_INDEX_PATH
 
 # Load environment variables from a .env file (e.g., API keys)
 from dotenv import load_dotenv
@@ -19,41 +22,69 @@ import os
 # Load variables from .env into the current environment
 load_dotenv()
 
-# Retrieve Pinecone API key from environment
-PINECONE_API_KEY = os.environ.get('PINECONE_API_KEY')
+# Download and initialize the HuggingFace embedding model ('all-MiniLM-L6-v2')
+embeddings = download_hugging_face_embeddings()
+
+if VECTOR_BACKEND == "local":
+    # Open (or start) the on-disk index; it is saved after every change
+    docsearch = LocalVectorStore.load(embeddings, path=LOCAL_INDEX_PATH)
 
-# Explicitly set the API key in the environment (ensures compatibility with downstream libraries)
-os.environ["PINECONE_API_KEY"] = PINECONE_API_KEY
+    # Keep the ingestion manifest with the index, so deleting the index also forces a full rebuild
+    manifest_path = os.path.join(LOCAL_INDEX_PATH, "manifest.json")
+else:
+    # Import Pinecone's gRPC client for fast vector indexing
+    from pinecone.grpc import PineconeGRPC as Pinecone
 
-# Load all PDF files from the 'Data/' directory using PyPDFLoader
-extracted_data = load_pdf_file(data='Data/')
+    # Import configuration class to specify serverless deployment details
+    from pinecone import ServerlessSpec
 
-# Split the loaded documents into smaller text chunks for embedding and retrieval
-text_chunks = text_split(extracted_data)
+    # Import the batched, concurrent indexer that writes to Pinecone
+    from src.indexer import Indexer, PineconeSink
 
-# Download and initialize the HuggingFace embedding model ('all-MiniLM-L6-v2')
-embeddings = download_hugging_face_embeddings()
+    # Retrieve Pinecone API key from environment
+    PINECONE_API_KEY = os.environ.get('PINECONE_API_KEY')
 
-# Initialize Pinecone client using the API key
-pc = Pinecone(api_key=PINECONE_API_KEY)
+    # Explicitly set the API key in the environment (ensures compatibility with downstream libraries)
+    os.environ["PINECONE_API_KEY"] = PINECONE_API_KEY
 
-# Define the name of the Pinecone index to be created or used
-index_name = "medicalbot"
+    # Initialize Pinecone client using the API key
+    pc = Pinecone(api_key=PINECONE_API_KEY)
 
-# Create a new Pinecone index with 384-dimensional vectors and cosine similarity
-pc.create_index(
-    name=index_name,          # Index name
-    dimension=384,            # Embedding size from MiniLM model
-    metric="cosine",          # Similarity metric for vector search
-    spec=ServerlessSpec(      # Serverless deployment configuration
-        cloud="aws",          # Cloud provider
-        region="us-east-1"    # Deployment region
+    # Define the name of the Pinecone index to be created or used
+    index_name = "medicalbot"
+
+    # Create the Pinecone index with 384-dimensional vectors and cosine similarity, unless it already exists
+    if index_name not in pc.list_indexes().names():
+        pc.create_index(
+            name=index_name,          # Index name
+            dimension=384,            # Embedding size from MiniLM model
+            metric="cosine",          # Similarity metric for vector search
+            spec=ServerlessSpec(      # Serverless deployment configuration
+                cloud="aws",          # Cloud provider
+                region="us-east-1"    # Deployment region
+            )
+        )
+
+    # Embed in batches and upsert them over concurrent gRPC requests, with back-pressure and retries.
+    # Chunk text is stored under the 'text' metadata key, where PineconeVectorStore in app.py reads it.
+    docsearch = Indexer(
+        PineconeSink(pc.Index(index_name)),                          # Target index
+        embeddings,                                                  # Embedding model used to vectorize the chunks
+        batch_size=int(os.environ.get("INDEX_BATCH_SIZE", 100)),     # Chunks per embedding and upsert request
+        concurrency=int(os.environ.get("INDEX_CONCURRENCY", 4)),     # Upsert requests in flight
     )
-)
-
-# Convert text chunks into embeddings and upsert them into the Pinecone index
-docsearch = PineconeVectorStore.from_documents(
-    documents=text_chunks,    # List of chunked documents
-    index_name=index_name,    # Target index name
-    embedding=embeddings,     # Embedding model used to vectorize the chunks
-)
+    manifest_path = os.path.join(".ingest", "manifest.json")
+
+# Parse PDFs in parallel and upsert only new or changed pages; vectors of removed pages are deleted.
+# The manifest records what is already indexed, so re-running is cheap.
+# The BM25 index is updated from the same chunks and IDs, so both retrievers always cover the same corpus.
+bm25_index = BM25Index(BM25_INDEX_PATH)
+upserted, removed = ingest('Data/', [docsearch, bm25_index], manifest_path=manifest_path)
+
+# A BM25 index that is missing (e.g. the vectors were built before BM25 was added) or holds other chunks
+# than the manifest records is rebuilt from every chunk; otherwise this is one comparison of ID sets
+rebuilt = backfill('Data/', bm25_index, manifest_path=manifest_path)
+
+# Cached chatbot answers may cite removed or outdated chunks, so tell running apps to drop them
+if upserted or removed or rebuilt:
+    write_index_version()
@@ -0,0 +1,60 @@
+# Tests for the streaming chat pieces; they use local fakes, so no API key or network is needed
+# Run with: python -m pytest test.py
+import asyncio
+
+from src.llm import ClaudeLLM, FakeLLM, sse_event
+
+
+# Minimal stand-in for the Anthropic client's messages.stream context manager
+class FakeStream:
+    def __init__(self, pieces):
+        self.text_stream = iter(pieces)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeMessages:
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.kwargs = None
+
+    def stream(self, **kwargs):
+        self.kwargs = kwargs
+        return FakeStream(self.pieces)
+
+
+class FakeClient:
+    def __init__(self, pieces):
+        self.messages = FakeMessages(pieces)
+
+
+def test_fake_llm_stream_matches_blocking_answer():
+    llm = FakeLLM(reply="Rest and drink plenty of fluids.")
+    assert "".join(llm.stream("What helps with a cold?")) == llm("What helps with a cold?")
+
+
+def test_claude_llm_forwards_stream_pieces():
+    client = FakeClient(["Hel", "lo", "!"])
+    llm = ClaudeLLM(client)
+    assert list(llm.stream("Hi")) == ["Hel", "lo", "!"]
+    assert client.messages.kwargs["messages"] == [{"role": "user", "content": "Hi"}]
+
+
+def test_claude_llm_async_stream_without_async_client_steps_the_blocking_stream():
+    llm = ClaudeLLM(FakeClient(["Hel", "lo", "!"]))
+
+    async def collect():
+        return [text async for text in llm.astream("Hi")]
+
+    assert asyncio.run(collect()) == ["Hel", "lo", "!"]
+
+
+def test_sse_event_keeps_newlines_inside_one_event():
+    event = sse_event({"token": "line one\nline two"})
+    assert event == 'data: {"token": "line one\\nline two"}\n\n'
+    assert sse_event({"sources": []}, event="done").startswith("event: done\n")
+
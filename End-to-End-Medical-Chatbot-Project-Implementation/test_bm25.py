@@ -0,0 +1,69 @@
+# Tests for the BM25 keyword index; they only need NumPy and langchain_core
+# Run with: python -m pytest test_bm25.py
+import warnings
+
+from langchain_core.documents import Document
+
+from src import bm25
+from src.bm25 import BM25Index
+
+
+def make_documents(texts):
+    return [Document(page_content=text, metadata={"source": "Data/book.pdf"}) for text in texts]
+
+
+def test_search_finds_exact_drug_codes_and_dosages(tmp_path):
+    index = BM25Index(str(tmp_path / "bm25"))
+    index.add_documents(make_documents(["Take metformin 500-mg twice daily for E11.9",
+                                        "Rest and fluids for a common cold",
+                                        "Ibuprofen helps with a headache"]), ids=["a", "b", "c"])
+    results = index.search("metformin 500-mg", k=2)
+    assert [doc.id for doc, _ in results] == ["a"]
+
+
+def test_documents_without_tokens_do_not_produce_nan_scores(tmp_path):
+    index = BM25Index(str(tmp_path / "bm25"))
+    index.add_documents(make_documents(["---", "!!"]), ids=["a", "b"])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert index.search("fever") == []
+
+
+def test_rebuild_replaces_every_segment_and_tombstone(tmp_path):
+    index = BM25Index(str(tmp_path / "bm25"))
+    index.add_documents(make_documents(["old fever note", "old cough note"]), ids=["a", "b"])
+    index.add_documents(make_documents(["another segment"]), ids=["c"])
+    index.delete(ids=["b"])
+    assert index.ids() == {"a", "c"}
+
+    index.rebuild(make_documents(["fever and chills", "persistent cough"]), ["x", "y"])
+    assert index.ids() == {"x", "y"}
+    assert len(index.segments) == 1
+    assert [doc.id for doc, _ in index.search("cough")] == ["y"]
+
+    # A second process opening the index sees the rebuilt state, and the old segments are gone
+    reopened = BM25Index(str(tmp_path / "bm25"))
+    assert reopened.ids() == {"x", "y"}
+    assert sorted(name for name in (tmp_path / "bm25").iterdir() if name.name.startswith("seg-")) == \
+        [tmp_path / "bm25" / index.segments[0].name]
+
+
+def test_reload_reads_the_newer_state_when_a_writer_removes_the_listed_segments(tmp_path, monkeypatch):
+    writer = BM25Index(str(tmp_path / "bm25"))
+    writer.add_documents(make_documents(["old fever note"]), ids=["a"])
+    reader = BM25Index(str(tmp_path / "bm25"))
+    writer.add_documents(make_documents(["old cough note"]), ids=["b"])
+
+    # The reader sees the two-segment state, but a rebuild removes its segments before they are opened
+    raced = []
+
+    class RacingSegment(bm25.Segment):
+        def __init__(self, path):
+            if not raced:
+                raced.append(path)
+                writer.rebuild(make_documents(["fever and chills"]), ["x"])
+            super().__init__(path)
+
+    monkeypatch.setattr(bm25, "Segment", RacingSegment)
+    assert [doc.id for doc, _ in reader.search("fever")] == ["x"]
+    assert raced and reader.ids() == {"x"}
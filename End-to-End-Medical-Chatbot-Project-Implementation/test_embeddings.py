@@ -0,0 +1,65 @@
+# Tests for the embedding cache; a fake model stands in for HuggingFace, so nothing is downloaded
+# Run with: python -m pytest test_embeddings.py
+import os
+
+from src.embeddings import CachedEmbeddings
+
+
+class FakeModel:
+    def __init__(self):
+        self.documents = 0
+        self.queries = 0
+
+    def embed_documents(self, texts):
+        self.documents += len(texts)
+        return [[float(len(text)), 1.0, 0.5] for text in texts]
+
+    def embed_query(self, text):
+        self.queries += 1
+        return [float(len(text)), 1.0, 0.5]
+
+
+def make_embeddings(tmp_path, **kwargs):
+    embeddings = CachedEmbeddings(cache_dir=str(tmp_path / "cache"), **kwargs)
+    embeddings._model = FakeModel()
+    return embeddings
+
+
+def cache_bytes(tmp_path):
+    directory = tmp_path / "cache"
+    if not directory.exists():
+        return 0
+    return sum(os.path.getsize(path) for path in directory.glob("*.bin"))
+
+
+def test_documents_are_persisted_and_reused(tmp_path):
+    embeddings = make_embeddings(tmp_path)
+    first = embeddings.embed_documents(["chunk one", "chunk two"])
+    assert cache_bytes(tmp_path) > 0
+
+    # A new replica reads the vectors from disk instead of running the model
+    fresh = make_embeddings(tmp_path)
+    assert fresh.embed_documents(["chunk one", "chunk two"]) == first
+    assert fresh._model.documents == 0
+
+
+def test_queries_are_never_written_to_disk(tmp_path):
+    embeddings = make_embeddings(tmp_path)
+    embeddings.embed_query("what are the symptoms of flu?")
+    assert cache_bytes(tmp_path) == 0
+    assert not (tmp_path / "cache").exists() or not list((tmp_path / "cache").iterdir())
+
+
+def test_repeated_queries_are_served_from_memory(tmp_path):
+    embeddings = make_embeddings(tmp_path, query_cache_size=2)
+    first = embeddings.embed_query("fever")
+    assert embeddings.embed_query("fever") == first
+    assert embeddings._model.queries == 1
+
+    # The least recently used question is evicted beyond query_cache_size
+    embeddings.embed_query("cough")
+    embeddings.embed_query("fever")
+    embeddings.embed_query("rash")
+    assert list(embeddings._queries) == ["fever", "rash"]
+    embeddings.embed_query("cough")
+    assert embeddings._model.queries == 4
@@ -0,0 +1,55 @@
+# Tests for the concurrent indexer; they use the in-memory stand-in for Pinecone, so no API key or network is needed
+# Run with: python -m pytest test_indexer.py
+from langchain_core.documents import Document
+
+from src.indexer import Indexer, InMemoryIndex, chunk_id
+
+
+class CountingEmbeddings:
+    def __init__(self):
+        self.texts = 0
+
+    def embed_documents(self, texts):
+        self.texts += len(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+def make_documents(n):
+    return [Document(page_content=f"chunk {i}", metadata={"source": "Data/book.pdf"}) for i in range(n)]
+
+
+def test_indexer_upserts_every_chunk_concurrently_in_batches():
+    index = InMemoryIndex(latency=0.01)
+    indexer = Indexer(index, CountingEmbeddings(), batch_size=10, concurrency=4, log=lambda line: None)
+    ids = indexer.add_documents(make_documents(95))
+    assert len(index) == 95
+    assert index.upsert_calls == 10
+    assert index.max_concurrent > 1
+    assert index.vectors[ids[0]][1]["text"] == "chunk 0"
+
+
+def test_indexer_is_idempotent_with_chunk_hash_ids():
+    index = InMemoryIndex()
+    indexer = Indexer(index, CountingEmbeddings(), batch_size=7, log=lambda line: None)
+    documents = make_documents(20)
+    first = indexer.add_documents(documents)
+    second = indexer.add_documents(documents)
+    assert first == second == [chunk_id(doc) for doc in documents]
+    assert len(index) == 20
+
+
+def test_indexer_retries_failed_upserts():
+    index = InMemoryIndex(fail_first=2)
+    indexer = Indexer(index, CountingEmbeddings(), batch_size=5, concurrency=1, retry_backoff=0.001,
+                      log=lambda line: None)
+    indexer.add_documents(make_documents(10))
+    assert len(index) == 10
+    assert index.upsert_calls == 4
+
+
+def test_indexer_deletes_by_id():
+    index = InMemoryIndex()
+    indexer = Indexer(index, CountingEmbeddings(), log=lambda line: None)
+    ids = indexer.add_documents(make_documents(3))
+    indexer.delete(ids=ids[:2])
+    assert list(index.vectors) == ids[2:]
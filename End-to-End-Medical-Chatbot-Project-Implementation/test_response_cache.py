@@ -0,0 +1,91 @@
+# Tests for the semantic response cache; they only need NumPy
+# Run with: python -m pytest test_response_cache.py
+import pytest
+
+from src import response_cache
+from src.response_cache import SemanticCache, write_index_version
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(response_cache, "time", clock)
+    monkeypatch.setattr(response_cache, "VERSION_CHECK_INTERVAL", 0)
+    return clock
+
+
+def make_cache(tmp_path, **kwargs):
+    return SemanticCache(version_path=str(tmp_path / ".index_version"), **kwargs)
+
+
+def test_similar_question_hits_and_dissimilar_one_misses(tmp_path, clock):
+    cache = make_cache(tmp_path, threshold=0.95)
+    cache.store([1.0, 0.0, 0.0], "What helps a cold?", "Rest and fluids.", ["Data/book.pdf"])
+
+    assert cache.lookup([0.99, 0.05, 0.0]) == ("Rest and fluids.", ["Data/book.pdf"])
+    assert cache.lookup([0.7, 0.7, 0.0]) is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_entries_expire_after_the_ttl(tmp_path, clock):
+    cache = make_cache(tmp_path, ttl=60)
+    cache.store([1.0, 0.0], "What helps a cold?", "Rest and fluids.")
+
+    clock.now += 59
+    assert cache.lookup([1.0, 0.0]) is not None
+    clock.now += 2
+    assert cache.lookup([1.0, 0.0]) is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted_beyond_max_entries(tmp_path, clock):
+    cache = make_cache(tmp_path, max_entries=2)
+    cache.store([1.0, 0.0, 0.0], "first", "one")
+    cache.store([0.0, 1.0, 0.0], "second", "two")
+
+    # Using the first entry makes the second the least recently used
+    assert cache.lookup([1.0, 0.0, 0.0]) == ("one", [])
+    cache.store([0.0, 0.0, 1.0], "third", "three")
+    assert len(cache) == 2
+    assert cache.lookup([0.0, 1.0, 0.0]) is None
+    assert cache.lookup([1.0, 0.0, 0.0]) == ("one", [])
+    assert cache.lookup([0.0, 0.0, 1.0]) == ("three", [])
+
+
+def test_entries_are_evicted_to_stay_under_max_bytes(tmp_path, clock):
+    probe = make_cache(tmp_path)
+    probe.store([1.0, 0.0], "q", "a" * 1000)
+    entry_bytes = probe.stats()["bytes"]
+
+    cache = make_cache(tmp_path, max_bytes=2 * entry_bytes + entry_bytes // 2)
+    for i, vector in enumerate(([1.0, 0.0], [0.0, 1.0], [-1.0, 0.0])):
+        cache.store(vector, "q", str(i) * 1000)
+    assert len(cache) == 2
+    assert cache.stats()["bytes"] <= cache.max_bytes
+    assert cache.lookup([1.0, 0.0]) is None
+
+    # An answer larger than the whole budget is never stored
+    cache.store([0.0, -1.0], "q", "x" * (3 * entry_bytes))
+    assert len(cache) == 2
+
+
+def test_new_index_version_empties_the_cache(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    cache.store([1.0, 0.0], "What helps a cold?", "Rest and fluids.")
+    assert cache.lookup([1.0, 0.0]) is not None
+
+    write_index_version(cache.version_path)
+    assert cache.lookup([1.0, 0.0]) is None
+    assert len(cache) == 0
+
+    # Answers stored against the new version are kept until the next re-index
+    cache.store([1.0, 0.0], "What helps a cold?", "Rest, fluids and sleep.")
+    assert cache.lookup([1.0, 0.0]) == ("Rest, fluids and sleep.", [])
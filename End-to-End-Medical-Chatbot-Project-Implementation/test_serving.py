@@ -0,0 +1,112 @@
+# Tests for the async request handling; they use FakeLLM and a fake retriever, so no API key or network is needed
+# Run with: python -m pytest test_serving.py
+import asyncio
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.prompts import ChatPromptTemplate
+
+from src.llm import FakeLLM
+from src.serving import BackgroundLoop, ChatService, Upstream, UpstreamTimeout
+
+
+class FakeEmbeddings:
+    def embed_query(self, text):
+        return [float(len(text)), 1.0]
+
+
+class FakeRetriever:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    async def ainvoke(self, question):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return [Document(page_content=f"Notes on {question}", metadata={"source": "Data/book.pdf"})]
+
+
+def make_service(llm, retriever=None, **kwargs):
+    prompt = ChatPromptTemplate.from_messages([("system", "Context: {context}"), ("human", "{input}")])
+    return ChatService(FakeEmbeddings(), retriever or FakeRetriever(), prompt, llm, **kwargs)
+
+
+def test_concurrent_identical_questions_make_one_llm_call():
+    llm = FakeLLM(reply="Rest and fluids.", delay=0.01)
+    service = make_service(llm)
+
+    async def ask_all():
+        questions = ["What helps a cold?", "what helps  a cold?", "What helps a cold?"]
+        return await asyncio.gather(*(service.answer(question) for question in questions))
+
+    results = asyncio.run(ask_all())
+    assert results == [("Rest and fluids.", ["Data/book.pdf"])] * 3
+    assert len(llm.calls) == 1
+    assert service.stats()["coalesced"] == 2
+
+
+def test_upstream_never_exceeds_its_concurrency_limit():
+    upstream = Upstream("llm", limit=3, timeout=5)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        peak = max(peak, upstream.in_flight)
+        await asyncio.sleep(0.01)
+        return upstream.in_flight
+
+    async def call_all():
+        return await asyncio.gather(*(upstream.call(call) for _ in range(20)))
+
+    assert max(asyncio.run(call_all())) <= 3
+    assert peak == 3
+    assert upstream.in_flight == 0
+
+
+def test_slow_upstream_raises_upstream_timeout():
+    service = make_service(FakeLLM(reply="Too slow to matter", delay=1.0), llm_timeout=0.05)
+    with pytest.raises(UpstreamTimeout, match="llm did not respond within 0.05s"):
+        asyncio.run(service.answer("What helps a cold?"))
+    assert service.generation.stats() == {"limit": 8, "in_flight": 0, "timeouts": 1}
+
+
+def test_stream_yields_tokens_then_sources_and_shares_retrieval():
+    llm = FakeLLM(reply="Rest and drink fluids.")
+    retriever = FakeRetriever(delay=0.01)
+    service = make_service(llm, retriever)
+
+    async def collect(question):
+        return [item async for item in service.stream(question)]
+
+    async def stream_all():
+        return await asyncio.gather(collect("What helps a cold?"), collect("what helps a cold?"))
+
+    for events in asyncio.run(stream_all()):
+        assert "".join(value for kind, value in events if kind == "token") == "Rest and drink fluids."
+        assert events[-1] == ("sources", ["Data/book.pdf"])
+    assert retriever.calls == 1
+    assert len(llm.calls) == 2
+
+
+def test_slow_stream_raises_upstream_timeout_and_frees_its_slot():
+    service = make_service(FakeLLM(reply="one two three four", delay=0.05), llm_timeout=0.08)
+
+    async def collect():
+        return [item async for item in service.stream("What helps a cold?")]
+
+    with pytest.raises(UpstreamTimeout):
+        asyncio.run(collect())
+    assert service.generation.stats() == {"limit": 8, "in_flight": 0, "timeouts": 1}
+
+
+def test_closing_a_stream_early_releases_the_llm_slot():
+    service = make_service(FakeLLM(reply="one two three four", delay=0.01))
+    loop = BackgroundLoop()
+
+    stream = loop.iterate(service.stream("What helps a cold?"))
+    assert next(stream) == ("token", "one ")
+    assert service.generation.in_flight == 1
+
+    # A client disconnect closes the request thread's generator
+    stream.close()
+    assert service.generation.in_flight == 0
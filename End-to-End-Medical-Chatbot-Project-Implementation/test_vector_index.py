@@ -0,0 +1,88 @@
+# Tests for the local vector index; random vectors stand in for the embedding model
+# Run with: python -m pytest test_vector_index.py
+import numpy as np
+
+from src.vector_index import LocalVectorStore
+
+
+class RandomEmbeddings:
+    # Every text gets a fixed random vector, and a query is embedded like the text it names
+    def __init__(self, dim=16, seed=0):
+        self.rng = np.random.default_rng(seed)
+        self.dim = dim
+        self.vectors = {}
+
+    def _vector(self, text):
+        if text not in self.vectors:
+            self.vectors[text] = self.rng.normal(size=self.dim).tolist()
+        return self.vectors[text]
+
+    def embed_documents(self, texts):
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._vector(text)
+
+
+def make_store(tmp_path, embeddings, n, **kwargs):
+    texts = [f"chunk {i}" for i in range(n)]
+    return LocalVectorStore.from_texts(texts, embeddings, ids=[f"id{i}" for i in range(n)],
+                                       path=str(tmp_path / "index"), **kwargs)
+
+
+def top_id(store, text):
+    return store.similarity_search(text, k=1)[0].id
+
+
+def test_ivf_search_finds_the_nearest_chunk(tmp_path):
+    store = make_store(tmp_path, RandomEmbeddings(), 600, ivf_min_rows=500, nprobe=4)
+    assert store._centroids is not None
+    assert all(top_id(store, f"chunk {i}") == f"id{i}" for i in range(0, 600, 37))
+
+
+def test_small_additions_join_the_trained_lists_without_retraining(tmp_path):
+    store = make_store(tmp_path, RandomEmbeddings(), 600, ivf_min_rows=500)
+    centroids, base = store._centroids, store._parts[0]
+
+    store.add_texts(["fresh chunk"], ids=["fresh"])
+    assert store._centroids is centroids
+    assert store._parts[0] is base and len(store._parts) == 2
+    assert top_id(store, "fresh chunk") == "fresh"
+
+
+def test_drift_past_the_threshold_retrains_and_compacts(tmp_path):
+    store = make_store(tmp_path, RandomEmbeddings(), 600, ivf_min_rows=500, drift_threshold=0.2)
+    centroids = store._centroids
+
+    store.add_texts([f"new {i}" for i in range(100)], ids=[f"new{i}" for i in range(100)])
+    assert store._centroids is centroids
+    store.add_texts([f"more {i}" for i in range(50)], ids=[f"more{i}" for i in range(50)])
+    assert store._centroids is not centroids
+    assert len(store._parts) == 1 and not store._deleted
+    assert len(store) == 750
+
+
+def test_deleted_and_replaced_chunks_are_not_returned(tmp_path):
+    embeddings = RandomEmbeddings()
+    store = make_store(tmp_path, embeddings, 50)
+    store.delete(ids=["id3"])
+    assert "id3" not in [doc.id for doc in store.similarity_search("chunk 3", k=5)]
+
+    store.add_texts(["chunk 4 rewritten"], ids=["id4"])
+    assert len(store) == 49
+    results = store.similarity_search("chunk 4 rewritten", k=50)
+    assert [doc.page_content for doc in results if doc.id == "id4"] == ["chunk 4 rewritten"]
+
+
+def test_reader_reloads_after_the_index_is_rewritten(tmp_path):
+    embeddings = RandomEmbeddings()
+    writer = make_store(tmp_path, embeddings, 600, ivf_min_rows=500)
+    reader = LocalVectorStore.load(embeddings, path=str(tmp_path / "index"), ivf_min_rows=500)
+    assert len(reader) == 600
+
+    # An incremental change, then one that compacts and removes the files the reader has open
+    writer.add_texts(["late chunk"], ids=["late"])
+    assert top_id(reader, "late chunk") == "late"
+    writer.add_texts([f"bulk {i}" for i in range(200)], ids=[f"bulk{i}" for i in range(200)])
+    assert top_id(reader, "bulk 7") == "bulk7"
+    assert len(reader) == 801